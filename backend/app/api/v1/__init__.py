@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from .endpoints import sources, items, summaries, crawl, chat
+from .endpoints import sources, items, summaries, crawl, chat, usage, jobs
 
 api_router = APIRouter()
 
@@ -9,3 +9,5 @@ api_router.include_router(items.router, prefix="/items", tags=["items"])
 api_router.include_router(summaries.router, prefix="/summaries", tags=["summaries"])
 api_router.include_router(crawl.router, prefix="/crawl", tags=["crawl"])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
+api_router.include_router(usage.router, prefix="/usage", tags=["usage"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -6,37 +6,77 @@
 
 from fastapi import APIRouter, Request, HTTPException, Header
 from fastapi.responses import StreamingResponse
-import json
+from starlette.background import BackgroundTask
+from typing import Any, AsyncIterator, Dict
+from app.core.concurrency import AdmissionLease, AdmissionRejected
+from app.core.config import get_settings
+from app.core.sse import sse_stream
 from app.services.chat_service import chat_service, ChatRequest
+from app.services.chat_rate_limit import chat_rate_limiter, describe
 from app.core.logging import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 
-@router.post("/stream")
-async def chat_stream_anonymous(
-    request: Request, chat_request: ChatRequest
+def _client_ip(request: Request) -> str:
+    # 部署在反向代理之后时需以 --proxy-headers 启动 uvicorn，否则所有请求都是代理的 IP
+    return request.client.host if request.client else "unknown"
+
+
+async def _admit() -> AdmissionLease:
+    """获取流式响应槽位，排队已满或超时返回 503 + Retry-After"""
+    try:
+        return await chat_service.admission.acquire()
+    except AdmissionRejected as e:
+        logger.warning(f"Chat stream rejected: {e.reason}")
+        raise HTTPException(
+            status_code=503,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+def _streaming_response(
+    events: AsyncIterator[Dict[str, Any]], lease: AdmissionLease
 ) -> StreamingResponse:
-    """匿名用户流式聊天接口（使用服务器API key + 全站限流）"""
+    """把服务层事件编码为 SSE 响应，结束或客户端断开时归还槽位"""
+    settings = get_settings()
 
     async def generate():
         try:
-            async for chunk in chat_service.stream_chat_anonymous(chat_request):
-                logger.info(f"chunk: {chunk}")
-                yield chunk
-        except Exception as e:
-            # 错误处理
-            error_data = json.dumps({"error": f"服务器错误: {str(e)}"})
-            yield f"data: {error_data}\n\n"
+            async for data in sse_stream(
+                events,
+                flush_interval=settings.chat_sse_flush_interval_seconds,
+                max_buffer_chars=settings.chat_sse_max_buffer_chars,
+                heartbeat_interval=settings.chat_sse_heartbeat_seconds,
+            ):
+                yield data
+        finally:
+            lease.release()
 
+    # 生成器未开始执行客户端就断开时由 background 归还槽位
     return StreamingResponse(
         generate(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # 禁止 nginx 缓冲，分块立即送达
         },
+        background=BackgroundTask(lease.release),
+    )
+
+
+@router.post("/stream")
+async def chat_stream_anonymous(
+    request: Request, chat_request: ChatRequest
+) -> StreamingResponse:
+    """匿名用户流式聊天接口（使用服务器API key + 多级限流）"""
+    client_ip = _client_ip(request)
+    lease = await _admit()
+    return _streaming_response(
+        chat_service.stream_chat_anonymous(chat_request, client_ip), lease
     )
 
 
@@ -50,32 +90,19 @@ async def chat_stream_with_user_key(
 
     if not x_api_key:
         raise HTTPException(status_code=400, detail="Missing X-API-Key header")
-
-    async def generate():
-        try:
-            async for chunk in chat_service.stream_chat_with_user_key(
-                chat_request, x_api_key
-            ):
-                yield chunk
-        except Exception as e:
-            # 错误处理
-            error_data = json.dumps({"error": f"服务器错误: {str(e)}"})
-            yield f"data: {error_data}\n\n"
-
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        },
+    lease = await _admit()
+    return _streaming_response(
+        chat_service.stream_chat_with_user_key(chat_request, x_api_key), lease
     )
 
 
 @router.get("/limits")
 async def get_rate_limits(request: Request):
-    """获取当前限流状态"""
-    # 简单返回限制信息
+    """获取调用方当前的剩余额度（全站和单 IP 两级，取自实时计数）"""
+    statuses = chat_rate_limiter.status(_client_ip(request))
     return {
-        "global_limit": "5 requests per 10 minutes",
+        "global_limit": describe(statuses),
+        "remaining": min(status.remaining for status in statuses),
+        "retry_after": max(status.to_dict()["retry_after"] for status in statuses),
+        "tiers": [status.to_dict() for status in statuses],
     }
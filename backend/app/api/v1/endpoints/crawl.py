@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import get_current_admin
 from app.schemas.common import APIResponse
+from app.tasks.job_manager import job_manager, job_to_dict
 from app.tasks.scheduler import task_scheduler
 
 router = APIRouter()
@@ -20,20 +21,22 @@ async def trigger_crawl(
     db: AsyncSession = Depends(get_db),
     _: str = Depends(get_current_admin),
 ) -> APIResponse[Dict[str, Any]]:
-    """手动触发爬取任务"""
+    """手动触发爬取任务（入队后由领导者执行，立即返回任务 ID，进度见 /jobs/{job_id}）"""
     request_id = getattr(request.state, "request_id", "unknown")
 
     try:
-        result = await task_scheduler.trigger_manual_crawl(source_id, limit)
-
-        if result["success"]:
-            return APIResponse(data=result, error=None, meta={"requestId": request_id})
-        else:
-            return APIResponse(
-                data=result,
-                error=result.get("error", "Unknown error"),
-                meta={"requestId": request_id},
-            )
+        # 同一数据源的爬取排队或运行中时合并到已有任务
+        job, created = await job_manager.submit(
+            "crawl",
+            f"crawl:{source_id or '*'}",
+            {"source_id": source_id, "limit": limit},
+        )
+
+        return APIResponse(
+            data={**job_to_dict(job), "created": created},
+            error=None,
+            meta={"requestId": request_id},
+        )
 
     except Exception as e:
         return APIResponse(
@@ -114,6 +114,7 @@ async def get_items(
                 source_internal_id=item.external_id,
                 created_at=item.created_at,
                 fetched_at=item.fetched_at,
+                cluster_id=item.cluster_id,
                 # 摘要信息（可能为None）
                 summary_content=summary.content if summary else None,
                 translated_title=summary.translated_title if summary else None,
@@ -186,6 +187,7 @@ async def get_item(
             source_internal_id=item.external_id,
             created_at=item.created_at,
             fetched_at=item.fetched_at,
+            cluster_id=item.cluster_id,
         )
 
         return APIResponse(
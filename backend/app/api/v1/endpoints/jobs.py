@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Request, Query
+
+from app.core.security import get_current_admin
+from app.schemas.common import APIResponse
+from app.tasks.job_manager import job_manager, job_to_dict
+
+router = APIRouter()
+
+
+@router.get("/", response_model=APIResponse[List[Dict[str, Any]]])
+async def list_jobs(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="返回的任务数"),
+    _: str = Depends(get_current_admin),
+) -> APIResponse[List[Dict[str, Any]]]:
+    """最近提交的后台任务（爬取、摘要生成）"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    data = [job_to_dict(job) for job in await job_manager.recent(limit)]
+
+    return APIResponse(data=data, error=None, meta={"requestId": request_id})
+
+
+@router.get("/{job_id}", response_model=APIResponse[Optional[Dict[str, Any]]])
+async def get_job(
+    request: Request, job_id: str, _: str = Depends(get_current_admin)
+) -> APIResponse[Optional[Dict[str, Any]]]:
+    """后台任务状态和进度计数"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    job = await job_manager.get(job_id)
+    if job is None:
+        return APIResponse(
+            data=None, error="Job not found", meta={"requestId": request_id}
+        )
+
+    return APIResponse(
+        data=job_to_dict(job), error=None, meta={"requestId": request_id}
+    )
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from fastapi import APIRouter, Depends, Request, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,7 +10,13 @@ from app.schemas.summary import SummaryResponse, SummaryCreate
 from app.models.summary import Summary, SummaryStatus
 from app.models.item import Item
 from app.tasks.summary_generator import summary_generator
-from app.tasks.scheduler import task_scheduler
+from app.tasks.backlog_processor import backlog_processor
+from app.models.background_job import BackgroundJob
+from app.tasks.job_manager import job_manager, job_to_dict
+from app.services.raw_response_store import raw_response_store
+from app.services.summary_cache import summary_cache
+from app.services.summary_priority import priority_for_item
+from app.services.summary_service import summary_service
 
 router = APIRouter()
 
@@ -36,12 +42,15 @@ async def get_summary(
             content=summary.content,
             translated_title=summary.translated_title,
             status=summary.status,
+            mode=summary.mode,
+            skip_reason=summary.skip_reason,
             retry_count=summary.retry_count,
             max_retries=summary.max_retries,
             created_at=summary.created_at,
             started_at=summary.started_at,
             completed_at=summary.completed_at,
             error_message=summary.error_message,
+            next_retry_at=summary.next_retry_at,
             generation_duration_ms=summary.generation_duration_ms,
             url_retrieval_status=summary.url_retrieval_status,
         )
@@ -78,6 +87,7 @@ async def create_summary(
         status=summary_data.status,
         retry_count=0,
         max_retries=summary_data.max_retries,
+        priority=priority_for_item(item),
     )
 
     db.add(summary)
@@ -92,12 +102,15 @@ async def create_summary(
         content=summary.content,
         translated_title=summary.translated_title,
         status=summary.status,
+        mode=summary.mode,
+        skip_reason=summary.skip_reason,
         retry_count=summary.retry_count,
         max_retries=summary.max_retries,
         created_at=summary.created_at,
         started_at=summary.started_at,
         completed_at=summary.completed_at,
         error_message=summary.error_message,
+        next_retry_at=summary.next_retry_at,
         generation_duration_ms=summary.generation_duration_ms,
         url_retrieval_status=summary.url_retrieval_status,
     )
@@ -137,12 +150,15 @@ async def list_summaries(
             content=summary.content,
             translated_title=summary.translated_title,
             status=summary.status,
+            mode=summary.mode,
+            skip_reason=summary.skip_reason,
             retry_count=summary.retry_count,
             max_retries=summary.max_retries,
             created_at=summary.created_at,
             started_at=summary.started_at,
             completed_at=summary.completed_at,
             error_message=summary.error_message,
+            next_retry_at=summary.next_retry_at,
             generation_duration_ms=summary.generation_duration_ms,
             url_retrieval_status=summary.url_retrieval_status,
         )
@@ -156,12 +172,21 @@ async def list_summaries(
 async def trigger_summary_generation(
     request: Request, _: str = Depends(get_current_admin)
 ) -> APIResponse[Dict[str, Any]]:
-    """手动触发摘要生成任务"""
+    """手动触发摘要生成任务（入队后由领导者执行，立即返回任务 ID，进度见 /jobs/{job_id}）"""
     request_id = getattr(request.state, "request_id", "unknown")
 
-    result = await task_scheduler.trigger_manual_summary_generation()
+    job, created = await _submit_summary_generation()
 
-    return APIResponse(data=result, error=None, meta={"requestId": request_id})
+    return APIResponse(
+        data={**job_to_dict(job), "created": created},
+        error=None,
+        meta={"requestId": request_id},
+    )
+
+
+async def _submit_summary_generation() -> Tuple[BackgroundJob, bool]:
+    """提交摘要生成任务，已有任务排队或运行中时合并到该任务"""
+    return await job_manager.submit("summaries", "summaries", {})
 
 
 @router.post("/batch-create", response_model=APIResponse[Dict[str, Any]])
@@ -202,14 +227,14 @@ async def batch_create_and_generate_summaries(
         source_id=source_id, model=model, lang=lang
     )
 
-    # 如果创建了新任务，立即触发生成
+    # 如果创建了新任务，立即在后台触发生成
     if create_result.get("created_count", 0) > 0:
-        generate_result = await task_scheduler.trigger_manual_summary_generation()
+        job, created = await _submit_summary_generation()
 
         return APIResponse(
             data={
                 "batch_create": create_result,
-                "generation_triggered": generate_result,
+                "generation_triggered": {**job_to_dict(job), "created": created},
             },
             error=None,
             meta={"requestId": request_id},
@@ -223,3 +248,106 @@ async def batch_create_and_generate_summaries(
             error=None,
             meta={"requestId": request_id},
         )
+
+
+@router.post("/backlog-batch", response_model=APIResponse[Dict[str, Any]])
+async def start_backlog_batch(
+    request: Request,
+    limit: Optional[int] = Query(
+        None, ge=1, description="本次提交的最大任务数，为空则使用配置值"
+    ),
+    _: str = Depends(get_current_admin),
+) -> APIResponse[Dict[str, Any]]:
+    """将积压的摘要任务导出为离线批处理任务（不占用实时配额）"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    # 批处理任务可能持续数小时，入队后由领导者进程执行并立即返回
+    job, created = await job_manager.submit("backlog", "backlog", {"limit": limit})
+
+    return APIResponse(
+        data={**job_to_dict(job), "created": created},
+        error=None if created else "Backlog batch already queued or running",
+        meta={"requestId": request_id},
+    )
+
+
+@router.get("/backlog-batch/status", response_model=APIResponse[Dict[str, Any]])
+async def get_backlog_batch_status(
+    request: Request, _: str = Depends(get_current_admin)
+) -> APIResponse[Dict[str, Any]]:
+    """获取离线批处理状态（执行状态来自本进程，另附最近一次提交的后台任务）"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    jobs = await job_manager.recent(1, kind="backlog")
+    data = {
+        **backlog_processor.get_status(),
+        "last_job": job_to_dict(jobs[0]) if jobs else None,
+    }
+
+    return APIResponse(data=data, error=None, meta={"requestId": request_id})
+
+
+@router.get("/{item_id}/raw", response_model=APIResponse[Optional[Dict[str, Any]]])
+async def get_summary_raw_response(
+    request: Request,
+    item_id: int,
+    db: AsyncSession = Depends(get_db),
+    _: str = Depends(get_current_admin),
+) -> APIResponse[Optional[Dict[str, Any]]]:
+    """获取指定文章摘要的 Gemini 原始响应元数据（按需解压）"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    summary_id = await db.scalar(select(Summary.id).where(Summary.item_id == item_id))
+    if summary_id is None:
+        return APIResponse(
+            data=None, error="Summary not found", meta={"requestId": request_id}
+        )
+
+    data = await raw_response_store.load(db, summary_id)
+    return APIResponse(
+        data=data,
+        error=None if data is not None else "Raw response not found",
+        meta={"requestId": request_id},
+    )
+
+
+@router.get("/raw/stats", response_model=APIResponse[Dict[str, Any]])
+async def get_raw_response_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    _: str = Depends(get_current_admin),
+) -> APIResponse[Dict[str, Any]]:
+    """获取原始响应存储的条数和压缩前后大小"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    stats = await raw_response_store.get_stats(db)
+
+    return APIResponse(data=stats, error=None, meta={"requestId": request_id})
+
+
+@router.get("/cache/stats", response_model=APIResponse[Dict[str, Any]])
+async def get_summary_cache_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    _: str = Depends(get_current_admin),
+) -> APIResponse[Dict[str, Any]]:
+    """获取摘要内容缓存的命中统计"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    stats = await summary_cache.get_stats(db)
+
+    return APIResponse(data=stats, error=None, meta={"requestId": request_id})
+
+
+@router.get("/metrics/responses", response_model=APIResponse[Dict[str, Any]])
+async def get_summary_response_metrics(
+    request: Request, _: str = Depends(get_current_admin)
+) -> APIResponse[Dict[str, Any]]:
+    """获取单篇摘要响应的格式错误率和每次成功消耗的 token（按解析方式区分）"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    return APIResponse(
+        data=summary_service.response_stats.snapshot(),
+        error=None,
+        meta={"requestId": request_id},
+    )
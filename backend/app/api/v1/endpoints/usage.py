@@ -0,0 +1,48 @@
+from typing import Dict, Any
+from fastapi import APIRouter, Depends, Request, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.security import get_current_admin
+from app.schemas.common import APIResponse
+from app.services.chat_cache import chat_response_cache
+from app.services.chat_history import chat_history_budget
+from app.services.chat_rate_limit import chat_rate_limiter
+from app.services.chat_service import chat_service
+from app.services.genai_client_pool import chat_client_pool
+from app.services.usage_stats import get_usage
+
+router = APIRouter()
+
+
+@router.get("/", response_model=APIResponse[Dict[str, Any]])
+async def get_token_usage(
+    request: Request,
+    days: int = Query(30, ge=1, le=365, description="统计最近多少天"),
+    db: AsyncSession = Depends(get_db),
+    _: str = Depends(get_current_admin),
+) -> APIResponse[Dict[str, Any]]:
+    """获取摘要和聊天按天、按模型汇总的 token 用量及耗时分位数"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    usage = await get_usage(db, days)
+
+    return APIResponse(data=usage, error=None, meta={"requestId": request_id})
+
+
+@router.get("/chat-clients", response_model=APIResponse[Dict[str, Any]])
+async def get_chat_client_pool_status(
+    request: Request, _: str = Depends(get_current_admin)
+) -> APIResponse[Dict[str, Any]]:
+    """获取聊天客户端池、对话历史摘要缓存、响应缓存、限流和准入控制的统计"""
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    data = {
+        **chat_client_pool.snapshot(),
+        "history_summaries": chat_history_budget.snapshot(),
+        "responses": chat_response_cache.snapshot(),
+        "rate_limits": chat_rate_limiter.snapshot(),
+        "admission": chat_service.admission.snapshot(),
+    }
+
+    return APIResponse(data=data, error=None, meta={"requestId": request_id})
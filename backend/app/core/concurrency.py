@@ -0,0 +1,262 @@
+"""
+并发控制
+
+- AIMD（加性增、乘性减）并发限制器：调用持续成功时每轮并发上限 +1，
+  遇到上游 429 / 配额错误时上限减半，始终保持在 [min_limit, max_limit] 之间。
+- 准入控制：固定并发上限 + 有界等待队列，队列已满时立即拒绝，
+  排队超时同样拒绝，并给出建议的重试时间。
+"""
+
+import asyncio
+import bisect
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class AIMDConcurrencyLimiter:
+    """AIMD 自适应并发限制器"""
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float = 0.5,
+        history_size: int = 50,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.decrease_factor = decrease_factor
+
+        self.in_flight = 0
+        self._successes = 0  # 当前上限下连续成功的次数
+        # 每次减小上限时递增，之前发出的请求再报告限流不会重复减小
+        self._epoch = 0
+        self._condition = asyncio.Condition()
+        self.history: deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._record_change("initial")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[int]:
+        """
+        占用一个并发槽位
+
+        Yields:
+            获取槽位时的 epoch，报告限流时传回
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+            epoch = self._epoch
+        try:
+            yield epoch
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    async def record_success(self) -> None:
+        """记录一次成功调用，连续成功达到当前上限次数后上限 +1"""
+        async with self._condition:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+                self._record_change("increase")
+                self._condition.notify_all()
+
+    async def record_throttle(self, epoch: int) -> None:
+        """记录一次限流，按比例减小上限（同一 epoch 内只减一次）"""
+        async with self._condition:
+            if epoch != self._epoch:
+                return
+            self._epoch += 1
+            self._successes = 0
+            new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+            if new_limit != self.limit:
+                self.limit = new_limit
+                self._record_change("decrease")
+                logger.warning(f"Upstream throttled, concurrency limit -> {self.limit}")
+
+    def _record_change(self, reason: str) -> None:
+        self.history.append(
+            {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "limit": self.limit,
+                "reason": reason,
+            }
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态（用于状态接口）"""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "history": list(self.history),
+        }
+
+
+class Histogram:
+    """固定分桶的累计直方图"""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets: Dict[str, int] = {}
+        cumulative = 0
+        for bound, count in zip([*self.bounds, math.inf], self.counts, strict=True):
+            cumulative += count
+            buckets[f"{bound:g}" if bound != math.inf else "+Inf"] = cumulative
+        return {"buckets": buckets, "count": self.count, "sum": round(self.total, 3)}
+
+
+class AdmissionRejected(Exception):
+    """准入控制拒绝了请求"""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionLease:
+    """已获得的并发槽位，release 可重复调用"""
+
+    def __init__(self, gate: "AdmissionGate") -> None:
+        self._gate = gate
+        self._released = False
+        self._acquired_at = time.monotonic()
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._gate._release(time.monotonic() - self._acquired_at)
+
+
+class AdmissionGate:
+    """
+    准入控制：最多 max_concurrent 个请求同时执行，最多 max_queue 个请求排队
+
+    队列按先进先出唤醒；队列已满时立即拒绝，排队超过 queue_timeout 秒也拒绝。
+    拒绝时根据平均占用时长估算建议的重试秒数。
+    """
+
+    WAIT_BOUNDS_MS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+    DEPTH_BOUNDS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    def __init__(
+        self, max_concurrent: int, max_queue: int, queue_timeout: float
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._avg_hold_seconds: Optional[float] = None  # 占用时长的指数移动平均
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.wait_ms = Histogram(self.WAIT_BOUNDS_MS)
+        self.queue_depth = Histogram(self.DEPTH_BOUNDS)  # 请求到达时的排队数
+
+    async def acquire(self) -> AdmissionLease:
+        """
+        获取一个槽位
+
+        Raises:
+            AdmissionRejected: 队列已满或排队超时
+        """
+        started_at = time.monotonic()
+        self.queue_depth.observe(len(self._waiters))
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return self._admit(started_at)
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("Server busy", self._retry_after())
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 超时的同时刚好被唤醒，槽位已转交给本请求，交还给下一个
+                self._release(None)
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected_timeout += 1
+            raise AdmissionRejected("Queue timeout", self._retry_after()) from None
+        return self._admit(started_at)
+
+    def _admit(self, started_at: float) -> AdmissionLease:
+        self.admitted += 1
+        self.wait_ms.observe((time.monotonic() - started_at) * 1000)
+        return AdmissionLease(self)
+
+    def _release(self, held_seconds: Optional[float]) -> None:
+        if held_seconds is not None:
+            if self._avg_hold_seconds is None:
+                self._avg_hold_seconds = held_seconds
+            else:
+                self._avg_hold_seconds += 0.2 * (held_seconds - self._avg_hold_seconds)
+        # 槽位直接转交给队首的请求，in_flight 不变
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _retry_after(self) -> int:
+        """按平均占用时长估算排在队尾的请求需要等待的秒数"""
+        hold = self._avg_hold_seconds or self.queue_timeout
+        rounds = (len(self._waiters) + 1) / self.max_concurrent
+        return max(1, math.ceil(hold * rounds))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态和直方图（用于状态接口）"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_hold_seconds": (
+                round(self._avg_hold_seconds, 3)
+                if self._avg_hold_seconds is not None
+                else None
+            ),
+            "wait_ms": self.wait_ms.snapshot(),
+            "queue_depth": self.queue_depth.snapshot(),
+        }
@@ -16,6 +16,8 @@ class Settings(BaseSettings):
     app_name: str = Field(default="Programmer Trending Backend")
     app_version: str = Field(default="0.1.0")
     debug: bool = Field(default=False)
+    # all: API 进程同时运行定时任务; api: 只提供 API, 定时任务由 worker.py 运行
+    app_mode: str = Field(default="all")
 
     # Database
     database_url: str = Field(default="sqlite+aiosqlite:///./programmer_trending.db")
@@ -36,10 +38,118 @@ class Settings(BaseSettings):
     ai_enable_rate_limiting: bool = Field(default=True)
     ai_rate_limit_retry_delay: int = Field(default=60)  # 达到限制后等待秒数
 
+    # Chat Rate Limiting (匿名聊天, GCRA 计数)
+    chat_rate_limit_global: int = Field(default=5)  # 全站每个窗口的请求数
+    chat_rate_limit_global_window_seconds: float = Field(default=600.0)
+    chat_rate_limit_per_ip: int = Field(default=5)  # 单 IP 每个窗口的请求数
+    chat_rate_limit_ip_window_seconds: float = Field(default=600.0)
+    chat_rate_limit_per_conversation: int = Field(default=3)  # 单会话每个窗口的请求数
+    chat_rate_limit_conversation_window_seconds: float = Field(default=60.0)
+    chat_rate_limit_max_keys: int = Field(default=10000)  # 跟踪的 IP / 会话数上限
+    chat_max_concurrent_streams: int = Field(default=32)  # 同时进行的流式响应数上限
+    chat_max_queued_streams: int = Field(default=64)  # 等待槽位的请求数上限
+    chat_queue_timeout_seconds: float = Field(default=10.0)  # 排队超时
+    chat_sse_flush_interval_seconds: float = Field(default=0.05)  # 文本分块合并窗口
+    chat_sse_max_buffer_chars: int = Field(default=512)  # 合并的文本达到该长度立即发送
+    chat_sse_heartbeat_seconds: float = Field(default=15.0)  # 空闲时的心跳间隔
+
     # Summary Generator
     summary_concurrency: int = Field(
         default=1
-    )  # 摘要生成并发度, 免费模型速率限制, 只能串行了
+    )  # 初始摘要生成并发度, 免费模型速率限制, 只能串行了
+    summary_concurrency_min: int = Field(default=1)  # 自适应并发下限
+    summary_concurrency_max: int = Field(
+        default=4
+    )  # 自适应并发上限, 连续成功时逐步增加, 遇到 429 时减半
+    summary_batch_enabled: bool = Field(
+        default=False
+    )  # 是否将多篇文章合并到一次请求中生成摘要
+    summary_batch_max_size: int = Field(default=10)  # 单批最多文章数 (不超过 20)
+    summary_batch_max_output_tokens: int = Field(
+        default=8192
+    )  # 单批输出 token 上限, 批大小据此自适应
+    summary_priority_source_weights: str = Field(
+        default=""
+    )  # 数据源权重, 如 "hackernews:1.0,reddit:0.8", 未配置的数据源为 1.0
+    summary_priority_comment_weight: float = Field(
+        default=0.5
+    )  # 评论数折算为分数的系数
+    summary_priority_decay_hours: float = Field(
+        default=12.5
+    )  # 每晚发布这么久, 需要热度高 10 倍才能排在同一位置
+    summary_quota_pacing_enabled: bool = Field(
+        default=True
+    )  # 把每日配额平摊到一天中, 每个调度间隔最多使用一份
+    summary_event_driven_enabled: bool = Field(
+        default=True
+    )  # 爬虫入库后立即触发摘要生成, 定时任务只作兜底
+    summary_event_debounce_seconds: float = Field(
+        default=5.0
+    )  # 合并短时间内多次入库通知的等待时间
+    summary_claim_timeout_minutes: int = Field(
+        default=30
+    )  # 进行中超过该时长视为进程中断遗留, 重新放回待处理队列
+
+    # Summary Filter (创建摘要任务时跳过或降级为只翻译标题)
+    summary_filter_enabled: bool = Field(default=True)
+    summary_skip_target_lang_titles: bool = Field(default=True)  # 标题已经是中文时跳过
+    summary_skip_domains: str = Field(default="")  # 直接跳过的域名, 逗号分隔
+    summary_title_only_domains: str = Field(
+        default="youtube.com,youtu.be,vimeo.com,wsj.com,ft.com,bloomberg.com,economist.com,nytimes.com"
+    )  # 视频、付费墙站点只翻译标题
+    summary_title_only_url_patterns: str = Field(
+        default=r"\.pdf($|\?),news\.ycombinator\.com/item"
+    )  # 只翻译标题的 URL 正则, 逗号分隔 (PDF, 没有外部链接的 HN 帖子)
+    summary_filter_head_check: bool = Field(
+        default=False
+    )  # 是否发送 HEAD 请求按 Content-Type 识别 PDF/视频等
+
+    # Near-duplicate Clustering (同一新闻的多篇帖子共享摘要)
+    dedup_enabled: bool = Field(default=True)
+    dedup_threshold: float = Field(default=0.6)  # 估算 Jaccard 相似度阈值
+    dedup_window_days: int = Field(default=7)  # 启动时加载多少天内的文章
+
+    # Summary Backlog (离线批处理, 不占用实时配额)
+    summary_backlog_backend: str = Field(default="gemini")  # "gemini" 或 "local"
+    summary_backlog_work_dir: str = Field(default="./data/batch_jobs")
+    summary_backlog_max_jobs: int = Field(default=1000)  # 单次提交最多任务数
+    summary_backlog_poll_interval_seconds: int = Field(default=60)
+    summary_backlog_timeout_hours: int = Field(default=24)  # Batch API 最长 24 小时
+    summary_backlog_import_chunk_size: int = Field(default=200)  # 每个事务写回条数
+
+    # Article Extraction (本地抓取正文, 替代 Gemini url_context 工具)
+    summary_local_fetch_enabled: bool = Field(default=False)
+    summary_article_token_budget: int = Field(
+        default=4000
+    )  # 正文在提示词中的 token 上限
+    article_cache_dir: str = Field(default="./data/article_cache")  # 压缩正文缓存目录
+    article_fetch_timeout_seconds: float = Field(default=15.0)
+    summary_structured_output_enabled: bool = Field(
+        default=False
+    )  # 本地抓取正文时用 response_schema 约束输出格式
+    article_max_bytes: int = Field(default=2_000_000)  # 单页面最大下载字节数
+    article_min_chars: int = Field(default=200)  # 正文过短时回退到 url_context
+
+    # Chat
+    chat_client_pool_size: int = Field(default=32)  # 按 API key 缓存的客户端数上限
+    chat_client_idle_ttl_seconds: float = Field(default=600.0)  # 客户端空闲回收时间
+    chat_article_token_budget: int = Field(
+        default=8000
+    )  # 按 item_id 注入的文章正文 token 上限
+    chat_article_miss_ttl_seconds: float = Field(
+        default=600.0
+    )  # 正文未缓存或抓取失败后，多久内不再后台抓取
+    chat_history_token_budget: int = Field(
+        default=6000
+    )  # 对话历史超过该 token 数时压缩较早的消息
+    chat_history_recent_tokens: int = Field(default=3000)  # 原样保留的最近消息 token 数
+    chat_history_min_recent_messages: int = Field(default=4)  # 至少原样保留的消息条数
+    chat_history_summary_max_tokens: int = Field(default=600)  # 滚动摘要的输出上限
+    chat_history_summary_cache_size: int = Field(default=512)  # 缓存的摘要条数
+    chat_cache_enabled: bool = Field(default=True)  # 缓存完全相同的聊天请求的响应
+    chat_cache_ttl_seconds: float = Field(default=3600.0)  # 响应缓存有效期
+    chat_cache_max_entries: int = Field(default=256)  # 缓存的响应条数
+    chat_cache_max_chars: int = Field(default=20000)  # 超过该长度的响应不缓存
 
     # Crawler
     crawl_interval_minutes: int = Field(default=120)
@@ -47,6 +157,18 @@ class Settings(BaseSettings):
     # Task Scheduler
     enable_crawl_scheduler: bool = Field(default=True)  # 是否启用定时爬虫任务
     enable_summary_scheduler: bool = Field(default=True)  # 是否启用定时AI摘要任务
+    job_poll_interval_seconds: float = Field(
+        default=2.0
+    )  # 领导者轮询手动提交的后台任务的间隔
+    job_stale_seconds: float = Field(
+        default=120.0
+    )  # 运行中的任务超过该时长没有心跳时视为执行进程已退出
+
+    # Leader Election (多进程部署时只有一个进程运行定时任务)
+    leader_election_enabled: bool = Field(default=True)
+    leader_lease_seconds: float = Field(
+        default=30.0
+    )  # SQLite 租约时长，每 1/3 续约一次
 
     # CORS Configuration
     cors_allow_origins: str = Field(
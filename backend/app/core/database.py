@@ -51,7 +51,7 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-async def init_db():
+async def init_db() -> None:
     """初始化数据库连接 (表结构由 Alembic 管理)"""
     # 注意: 数据库表结构应该通过 Alembic 迁移来管理
     # 不再使用 Base.metadata.create_all() 避免与 Alembic 冲突
@@ -72,6 +72,6 @@ async def init_db():
     )
 
 
-async def close_db():
+async def close_db() -> None:
     """关闭数据库连接"""
     await engine.dispose()
@@ -0,0 +1,56 @@
+"""
+进程内事件总线
+
+轻量的发布/订阅机制，用于模块之间的解耦通知（如爬虫入库后立即触发摘要生成）。
+每个订阅者拥有独立的有界队列，发布方不会被慢消费者阻塞。
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# 事件主题
+ITEMS_CREATED = "items.created"  # 新文章入库，payload 为文章ID列表
+
+
+class EventBus:
+    """进程内事件总线"""
+
+    def __init__(self, max_queue_size: int = 1000) -> None:
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[str, List[asyncio.Queue[Any]]] = defaultdict(list)
+
+    def subscribe(self, topic: str) -> "asyncio.Queue[Any]":
+        """订阅主题，返回接收事件的队列"""
+        queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers[topic].append(queue)
+        return queue
+
+    def unsubscribe(self, topic: str, queue: "asyncio.Queue[Any]") -> None:
+        """取消订阅"""
+        if queue in self._subscribers.get(topic, []):
+            self._subscribers[topic].remove(queue)
+
+    def publish(self, topic: str, payload: Any) -> int:
+        """
+        发布事件（不等待消费者）
+
+        Returns:
+            接收到事件的订阅者数量
+        """
+        delivered = 0
+        for queue in self._subscribers.get(topic, []):
+            try:
+                queue.put_nowait(payload)
+                delivered += 1
+            except asyncio.QueueFull:
+                logger.warning(f"Event queue for {topic} is full, dropping event")
+        return delivered
+
+
+# 全局事件总线实例
+event_bus = EventBus()
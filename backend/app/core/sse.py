@@ -0,0 +1,122 @@
+"""
+SSE 流式输出
+
+把服务层产生的事件（dict）编码为 Server-Sent Events：
+
+- 合并分块：连续的文本事件在 flush_interval 内或累计到 max_buffer_chars 前合并为一条，
+  减少 JSON 编码和写 socket 的次数；
+- 心跳：空闲超过 heartbeat_interval 时发送 SSE 注释行，避免代理因超时断开连接，
+  写入失败也能让服务器尽早发现客户端已断开；
+- 断开即取消：上游在独立任务中读取，响应被取消（客户端断开）时立即取消上游任务，
+  不再为无人接收的流消耗 token。
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+HEARTBEAT = ": ping\n\n"
+
+_END = object()  # 上游结束标记
+
+
+def encode_event(event: Dict[str, Any]) -> str:
+    """编码为一条 SSE data 事件"""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def _pump(
+    source: AsyncIterator[Dict[str, Any]], queue: "asyncio.Queue[Any]"
+) -> None:
+    """读取上游事件放入队列，异常也转交给消费方"""
+    try:
+        async for event in source:
+            await queue.put(event)
+        await queue.put(_END)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await queue.put(e)
+    finally:
+        # 被取消时上游可能停在 yield 处，显式关闭以释放上游连接
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def sse_stream(
+    source: AsyncIterator[Dict[str, Any]],
+    flush_interval: float,
+    max_buffer_chars: int,
+    heartbeat_interval: float,
+) -> AsyncIterator[str]:
+    """
+    将事件流编码为合并后的 SSE 文本
+
+    Args:
+        source: 服务层的事件流，文本事件形如 {"text": ...}
+        flush_interval: 文本最多缓冲的秒数（0 表示不合并）
+        max_buffer_chars: 缓冲文本达到该长度时立即发送
+        heartbeat_interval: 空闲多少秒发送一次心跳
+
+    Yields:
+        SSE 文本
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=64)
+    pump = asyncio.create_task(_pump(source, queue))
+    buffer: List[str] = []
+    buffered_chars = 0
+    flush_at: Optional[float] = None  # 缓冲中第一段文本的发送期限
+    last_sent = time.monotonic()
+
+    try:
+        while True:
+            now = time.monotonic()
+            if flush_at is not None:
+                timeout = flush_at - now
+            else:
+                timeout = last_sent + heartbeat_interval - now
+            try:
+                item = await asyncio.wait_for(queue.get(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                if buffer:
+                    yield encode_event({"text": "".join(buffer)})
+                    buffer, buffered_chars, flush_at = [], 0, None
+                else:
+                    yield HEARTBEAT
+                last_sent = time.monotonic()
+                continue
+
+            if isinstance(item, dict) and set(item) == {"text"}:
+                buffer.append(item["text"])
+                buffered_chars += len(item["text"])
+                if flush_at is None:
+                    flush_at = time.monotonic() + flush_interval
+                if buffered_chars < max_buffer_chars and flush_interval > 0:
+                    continue
+                item = None
+
+            # 非文本事件之前先把缓冲的文本发出去，保持顺序
+            if buffer:
+                yield encode_event({"text": "".join(buffer)})
+                buffer, buffered_chars, flush_at = [], 0, None
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                logger.error(f"Error in SSE source: {item}")
+                yield encode_event({"error": f"服务器错误: {str(item)}"})
+                break
+            if item is not None:
+                yield encode_event(item)
+            last_sent = time.monotonic()
+    finally:
+        # 客户端断开时 StreamingResponse 取消本生成器，这里同时取消上游
+        if not pump.done():
+            pump.cancel()
+            logger.info("SSE stream closed before completion, upstream cancelled")
+        await asyncio.gather(pump, return_exceptions=True)
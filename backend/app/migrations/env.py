@@ -10,7 +10,7 @@ from app.core.database import Base
 from app.core.config import get_settings
 
 # 确保所有模型都被导入，这样 Alembic 才能发现它们
-from app.models import Source, Item, Summary  # noqa: F401
+from app.models import Source, Item, Summary, SummaryCacheEntry  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
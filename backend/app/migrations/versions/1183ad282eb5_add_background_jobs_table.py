@@ -0,0 +1,60 @@
+"""Add background_jobs table
+
+Revision ID: 1183ad282eb5
+Revises: 74b3dd72286e
+Create Date: 2025-09-10 11:26:08.503917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "1183ad282eb5"
+down_revision: Union[str, Sequence[str], None] = "74b3dd72286e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("active_key", sa.String(), nullable=True),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("progress", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("coalesced", sa.Integer(), nullable=False),
+        sa.Column("holder_id", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("active_key"),
+    )
+    op.create_index(
+        op.f("ix_background_jobs_key"), "background_jobs", ["key"], unique=False
+    )
+    op.create_index(
+        op.f("ix_background_jobs_state"), "background_jobs", ["state"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_background_jobs_state"), table_name="background_jobs")
+    op.drop_index(op.f("ix_background_jobs_key"), table_name="background_jobs")
+    op.drop_table("background_jobs")
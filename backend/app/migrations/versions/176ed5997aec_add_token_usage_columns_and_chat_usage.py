@@ -0,0 +1,124 @@
+"""Add token usage columns to summaries and chat_usage table
+
+Revision ID: 176ed5997aec
+Revises: 1f665825d07e
+Create Date: 2025-09-06 16:05:52.174630
+
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "176ed5997aec"
+down_revision: Union[str, Sequence[str], None] = "1f665825d07e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+summaries = sa.table(
+    "summaries",
+    sa.column("id", sa.Integer),
+    sa.column("prompt_tokens", sa.Integer),
+    sa.column("output_tokens", sa.Integer),
+    sa.column("total_tokens", sa.Integer),
+)
+raw_responses = sa.table(
+    "summary_raw_responses",
+    sa.column("summary_id", sa.Integer),
+    sa.column("data", sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("summaries", sa.Column("prompt_tokens", sa.Integer(), nullable=True))
+    op.add_column("summaries", sa.Column("output_tokens", sa.Integer(), nullable=True))
+    op.add_column("summaries", sa.Column("total_tokens", sa.Integer(), nullable=True))
+    op.create_index(
+        op.f("ix_summaries_total_tokens"), "summaries", ["total_tokens"], unique=False
+    )
+    op.create_index(
+        "ix_summaries_completed_at_model",
+        "summaries",
+        ["completed_at", "model"],
+        unique=False,
+    )
+
+    op.create_table(
+        "chat_usage",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("user_key", sa.Boolean(), nullable=False),
+        sa.Column("success", sa.Boolean(), nullable=False),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=True),
+        sa.Column("output_tokens", sa.Integer(), nullable=True),
+        sa.Column("total_tokens", sa.Integer(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_chat_usage_created_at"), "chat_usage", ["created_at"], unique=False
+    )
+    op.create_index(
+        op.f("ix_chat_usage_total_tokens"), "chat_usage", ["total_tokens"], unique=False
+    )
+
+    # 从已保存的原始响应回填 token 用量（批量请求的用量已是整批的，按批大小平摊）
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(raw_responses.c.summary_id, raw_responses.c.data)
+            .where(raw_responses.c.summary_id > last_id)
+            .order_by(raw_responses.c.summary_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for summary_id, blob in rows:
+            data = json.loads(zlib.decompress(blob).decode("utf-8"))
+            usage = data.get("usage") if isinstance(data, dict) else None
+            if not usage:
+                continue
+            share = data.get("batch_size") or 1
+
+            def tokens(
+                name: str, usage: Dict[str, Any] = usage, share: int = share
+            ) -> Optional[int]:
+                value = usage.get(name)
+                return round(value / share) if value is not None else None
+
+            bind.execute(
+                summaries.update()
+                .where(summaries.c.id == summary_id)
+                .values(
+                    prompt_tokens=tokens("prompt_token_count"),
+                    output_tokens=tokens("candidates_token_count"),
+                    total_tokens=tokens("total_token_count"),
+                )
+            )
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_chat_usage_total_tokens"), table_name="chat_usage")
+    op.drop_index(op.f("ix_chat_usage_created_at"), table_name="chat_usage")
+    op.drop_table("chat_usage")
+    op.drop_index("ix_summaries_completed_at_model", table_name="summaries")
+    op.drop_index(op.f("ix_summaries_total_tokens"), table_name="summaries")
+    op.drop_column("summaries", "total_tokens")
+    op.drop_column("summaries", "output_tokens")
+    op.drop_column("summaries", "prompt_tokens")
@@ -0,0 +1,99 @@
+"""Move summaries.response_json to compressed summary_raw_responses table
+
+Revision ID: 1f665825d07e
+Revises: 9667407ac730
+Create Date: 2025-09-06 09:41:27.503118
+
+"""
+
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "1f665825d07e"
+down_revision: Union[str, Sequence[str], None] = "9667407ac730"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+summaries = sa.table(
+    "summaries", sa.column("id", sa.Integer), sa.column("response_json", sa.JSON)
+)
+raw_responses = sa.table(
+    "summary_raw_responses",
+    sa.column("summary_id", sa.Integer),
+    sa.column("data", sa.LargeBinary),
+    sa.column("raw_size", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "summary_raw_responses",
+        sa.Column("summary_id", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_size", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["summary_id"], ["summaries.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("summary_id"),
+    )
+
+    # 分批压缩回填已有的原始响应
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(summaries.c.id, summaries.c.response_json)
+            .where(summaries.c.id > last_id)
+            .where(summaries.c.response_json.is_not(None))
+            .order_by(summaries.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        values = []
+        for summary_id, data in rows:
+            if data is None:
+                continue
+            raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(
+                "utf-8"
+            )
+            values.append(
+                {
+                    "summary_id": summary_id,
+                    "data": zlib.compress(raw),
+                    "raw_size": len(raw),
+                }
+            )
+        if values:
+            bind.execute(raw_responses.insert(), values)
+        last_id = rows[-1][0]
+
+    op.drop_column("summaries", "response_json")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("summaries", sa.Column("response_json", sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(raw_responses.c.summary_id, raw_responses.c.data))
+    for summary_id, blob in rows.all():
+        bind.execute(
+            summaries.update()
+            .where(summaries.c.id == summary_id)
+            .values(response_json=json.loads(zlib.decompress(blob).decode("utf-8")))
+        )
+
+    op.drop_table("summary_raw_responses")
@@ -0,0 +1,97 @@
+"""Add priority to summary table
+
+Revision ID: 33ca4c4c3e5b
+Revises: 296b3a1f3abc
+Create Date: 2025-09-03 09:41:26.502117
+
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "33ca4c4c3e5b"
+down_revision: Union[str, Sequence[str], None] = "296b3a1f3abc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 回填使用迁移编写时的优先级公式快照（默认配置：数据源权重 1.0、评论系数 0.5、
+# 衰减 12.5 小时），不引用应用代码和运行时配置，以后修改公式不会影响这次迁移
+PRIORITY_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+COMMENT_WEIGHT = 0.5
+DECAY_SECONDS = 12.5 * 3600
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "summaries",
+        sa.Column("priority", sa.Float(), server_default="0", nullable=False),
+    )
+    op.create_index(
+        "ix_summaries_status_priority",
+        "summaries",
+        ["status", "priority"],
+        unique=False,
+    )
+
+    # 为已有的摘要任务回填优先级
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT summaries.id, items.score, items.comments_count, items.created_at "
+            "FROM summaries JOIN items ON summaries.item_id = items.id"
+        )
+    ).fetchall()
+    if rows:
+        summaries = sa.table(
+            "summaries", sa.column("id", sa.Integer), sa.column("priority", sa.Float)
+        )
+        stmt = (
+            summaries.update()
+            .where(summaries.c.id == sa.bindparam("summary_id"))
+            .values(priority=sa.bindparam("new_priority"))
+        )
+        bind.execute(
+            stmt,
+            [
+                {
+                    "summary_id": row.id,
+                    "new_priority": _priority(
+                        row.score, row.comments_count, _parse_datetime(row.created_at)
+                    ),
+                }
+                for row in rows
+            ],
+        )
+
+
+def _priority(
+    score: Optional[int], comments_count: Optional[int], created_at: Optional[datetime]
+) -> float:
+    engagement = max(score or 0, 0) + COMMENT_WEIGHT * max(comments_count or 0, 0)
+    if created_at is None:
+        created_at = datetime.now(timezone.utc)
+    elif created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age_term = (created_at - PRIORITY_EPOCH).total_seconds() / DECAY_SECONDS
+    return round(math.log10(1 + engagement) + age_term, 6)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    """SQLite 中的时间以字符串存储，其他数据库直接返回 datetime"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value
+    return None
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_summaries_status_priority", table_name="summaries")
+    op.drop_column("summaries", "priority")
@@ -0,0 +1,33 @@
+"""Add mode and skip_reason to summary table
+
+Revision ID: 34ab1a07c590
+Revises: 9484aec7aebe
+Create Date: 2025-09-04 11:05:52.160384
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "34ab1a07c590"
+down_revision: Union[str, Sequence[str], None] = "9484aec7aebe"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "summaries",
+        sa.Column("mode", sa.String(), server_default="full", nullable=False),
+    )
+    op.add_column("summaries", sa.Column("skip_reason", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("summaries", "skip_reason")
+    op.drop_column("summaries", "mode")
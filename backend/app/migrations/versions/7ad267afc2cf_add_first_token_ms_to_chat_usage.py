@@ -0,0 +1,32 @@
+"""Add first_token_ms and client_reused to chat_usage
+
+Revision ID: 7ad267afc2cf
+Revises: 176ed5997aec
+Create Date: 2025-09-07 11:22:08.691245
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7ad267afc2cf"
+down_revision: Union[str, Sequence[str], None] = "176ed5997aec"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "chat_usage", sa.Column("first_token_ms", sa.Integer(), nullable=True)
+    )
+    op.add_column("chat_usage", sa.Column("client_reused", sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("chat_usage", "client_reused")
+    op.drop_column("chat_usage", "first_token_ms")
@@ -0,0 +1,38 @@
+"""Add next_retry_at to summary table
+
+Revision ID: 9484aec7aebe
+Revises: 33ca4c4c3e5b
+Create Date: 2025-09-03 15:22:08.731940
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9484aec7aebe"
+down_revision: Union[str, Sequence[str], None] = "33ca4c4c3e5b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "summaries",
+        sa.Column("next_retry_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_summaries_next_retry_at"),
+        "summaries",
+        ["next_retry_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_summaries_next_retry_at"), table_name="summaries")
+    op.drop_column("summaries", "next_retry_at")
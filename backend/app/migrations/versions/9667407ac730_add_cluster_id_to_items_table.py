@@ -0,0 +1,30 @@
+"""Add cluster_id to items table
+
+Revision ID: 9667407ac730
+Revises: 34ab1a07c590
+Create Date: 2025-09-05 14:37:11.846023
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9667407ac730"
+down_revision: Union[str, Sequence[str], None] = "34ab1a07c590"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("items", sa.Column("cluster_id", sa.Integer(), nullable=True))
+    op.create_index(op.f("ix_items_cluster_id"), "items", ["cluster_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_items_cluster_id"), table_name="items")
+    op.drop_column("items", "cluster_id")
@@ -1,5 +1,21 @@
 from .source import Source
 from .item import Item
 from .summary import Summary
+from .summary_cache import SummaryCacheEntry
+from .summary_raw_response import SummaryRawResponse
+from .summary_batch_job import SummaryBatchJob
+from .background_job import BackgroundJob
+from .chat_usage import ChatUsage
+from .leader_lease import LeaderLease
 
-__all__ = ["Source", "Item", "Summary"]
+__all__ = [
+    "Source",
+    "Item",
+    "Summary",
+    "SummaryCacheEntry",
+    "SummaryRawResponse",
+    "SummaryBatchJob",
+    "BackgroundJob",
+    "ChatUsage",
+    "LeaderLease",
+]
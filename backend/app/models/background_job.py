@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import JSON, DateTime, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.database import Base
+
+
+class BackgroundJob(Base):
+    """手动提交的后台任务（爬取、摘要生成等），由领导者进程领取执行"""
+
+    __tablename__ = "background_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    kind: Mapped[str] = mapped_column(String)  # 任务类型，如 crawl / summaries
+    key: Mapped[str] = mapped_column(String, index=True)  # 合并键
+    active_key: Mapped[Optional[str]] = mapped_column(
+        String, unique=True
+    )  # 排队或运行中时等于 key，结束后置空；唯一约束保证同键只有一个未结束的任务
+    params: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    state: Mapped[str] = mapped_column(
+        String, index=True
+    )  # queued / running / succeeded / failed / cancelled
+    progress: Mapped[Dict[str, int]] = mapped_column(JSON, default=dict)
+    result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    coalesced: Mapped[int] = mapped_column(
+        Integer, default=0
+    )  # 被合并进来的重复提交次数
+    holder_id: Mapped[Optional[str]] = mapped_column(String)  # 执行任务的进程
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )  # 执行进程定期写入进度时更新，长时间未更新视为进程已退出
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.database import Base
+
+
+class ChatUsage(Base):
+    """单次聊天请求的 token 用量"""
+
+    __tablename__ = "chat_usage"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    model: Mapped[str] = mapped_column(String)  # AI 模型名称
+    user_key: Mapped[bool] = mapped_column(
+        Boolean, default=False
+    )  # 是否使用用户自己的 API key
+    success: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer)
+    output_tokens: Mapped[Optional[int]] = mapped_column(Integer)
+    total_tokens: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    duration_ms: Mapped[Optional[int]] = mapped_column(Integer)  # 整个流式响应的耗时
+    first_token_ms: Mapped[Optional[int]] = mapped_column(Integer)  # 首个分块的耗时
+    client_reused: Mapped[Optional[bool]] = mapped_column(
+        Boolean
+    )  # 是否复用了池中已有的客户端
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
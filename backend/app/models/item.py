@@ -36,6 +36,9 @@ class Item(Base):
     author: Mapped[Optional[str]] = mapped_column(String)
     comments_count: Mapped[Optional[int]] = mapped_column(Integer)  # 评论数
     tags: Mapped[List[str]] = mapped_column(JSON, default=list)  # 标签列表
+    cluster_id: Mapped[Optional[int]] = mapped_column(
+        Integer, index=True
+    )  # 近似重复簇ID（簇中第一篇文章的ID），同簇文章共享摘要
 
     # 时间戳
     created_at: Mapped[datetime] = mapped_column(
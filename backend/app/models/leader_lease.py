@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.database import Base
+
+
+class LeaderLease(Base):
+    """领导者租约（SQLite 下的选主，PostgreSQL 使用 advisory lock）"""
+
+    __tablename__ = "leader_leases"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)  # 选主的角色名
+    holder_id: Mapped[str] = mapped_column(String)  # 持有者（主机名:进程号:随机后缀）
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    acquired_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
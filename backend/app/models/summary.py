@@ -1,8 +1,18 @@
 from datetime import datetime
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 import enum
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, Enum, JSON, func
+from sqlalchemy import (
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    Enum,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..core.database import Base
@@ -22,6 +32,13 @@ class SummaryStatus(str, enum.Enum):
     SKIPPED = "skipped"
 
 
+class SummaryMode(str, enum.Enum):
+    """摘要生成方式"""
+
+    FULL = "full"  # 完整摘要
+    TITLE_ONLY = "title_only"  # 只翻译标题（PDF、视频、付费墙等无法摘要的内容）
+
+
 class Summary(Base):
     __tablename__ = "summaries"
 
@@ -45,6 +62,15 @@ class Summary(Base):
     )
     retry_count: Mapped[int] = mapped_column(Integer, default=0)
     max_retries: Mapped[int] = mapped_column(Integer, default=3)
+    mode: Mapped[str] = mapped_column(
+        String, default=SummaryMode.FULL.value, server_default=SummaryMode.FULL.value
+    )  # 生成方式，见 SummaryMode
+    skip_reason: Mapped[Optional[str]] = mapped_column(
+        String
+    )  # 被过滤规则跳过或降级为只翻译标题的原因
+    priority: Mapped[float] = mapped_column(
+        Float, default=0.0, server_default="0"
+    )  # 优先级分数（越大越优先），见 services/summary_priority.py
 
     # 时间追踪
     created_at: Mapped[datetime] = mapped_column(
@@ -53,21 +79,33 @@ class Summary(Base):
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     last_retry_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    next_retry_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), index=True
+    )  # 失败后按错误类型退避，到时间后才会重新处理
 
     # 错误信息
     error_message: Mapped[Optional[str]] = mapped_column(Text)
     error_type: Mapped[Optional[str]] = mapped_column(
         String
-    )  # "NETWORK_ERROR", "CONTENT_ERROR", "API_ERROR"
+    )  # "NETWORK_ERROR", "RATE_LIMIT_ERROR", "CONTENT_ERROR", "API_ERROR"
 
     # Gemini 特有的元数据
     generation_duration_ms: Mapped[Optional[int]] = mapped_column(
         Integer
     )  # 生成耗时(毫秒)
     url_retrieval_status: Mapped[Optional[str]] = mapped_column(String)  # URL检索状态
-    response_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(
-        JSON
-    )  # API原始响应内容
+    # token 用量（批量请求按条目平摊），用于按天、按模型统计
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer)
+    output_tokens: Mapped[Optional[int]] = mapped_column(Integer)
+    total_tokens: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    # API 原始响应压缩后存放在 summary_raw_responses 表，见 SummaryRawResponse
 
     # 关联关系
     item: Mapped["Item"] = relationship("Item", back_populates="summary")
+
+    __table_args__ = (
+        # 按状态筛选待处理任务并按优先级排序
+        Index("ix_summaries_status_priority", "status", "priority"),
+        # 用量统计按完成时间和模型聚合
+        Index("ix_summaries_completed_at_model", "completed_at", "model"),
+    )
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import JSON, DateTime, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.database import Base
+
+
+class SummaryBatchJob(Base):
+    """已提交的积压摘要离线批处理任务（进程重启后据此恢复轮询和导入）"""
+
+    __tablename__ = "summary_batch_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[str] = mapped_column(String, unique=True)  # 批处理后端的任务标识
+    backend: Mapped[str] = mapped_column(String)  # "gemini" 或 "local"
+    state: Mapped[str] = mapped_column(
+        String, index=True
+    )  # running / succeeded / failed / timed_out，见 BatchJobState
+    claimed: Mapped[Dict[str, str]] = mapped_column(
+        JSON
+    )  # 领取的摘要ID -> 领取前的状态，失败或结果缺失时据此恢复
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    submitted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.database import Base
+
+
+class SummaryCacheEntry(Base):
+    """按规范化 URL 哈希 + 模型 + 语言寻址的摘要缓存"""
+
+    __tablename__ = "summary_cache"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    url_hash: Mapped[str] = mapped_column(String(64))  # 规范化 URL 的 SHA-256
+    model: Mapped[str] = mapped_column(String)  # AI 模型名称
+    lang: Mapped[str] = mapped_column(String)  # 语言
+    canonical_url: Mapped[str] = mapped_column(String)  # 规范化后的 URL (便于排查)
+
+    # 缓存内容
+    content: Mapped[str] = mapped_column(Text)
+    translated_title: Mapped[Optional[str]] = mapped_column(String(500))
+    source_summary_id: Mapped[Optional[int]] = mapped_column(
+        Integer
+    )  # 首次生成该内容的摘要ID
+
+    # 命中统计
+    hit_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    last_hit_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        UniqueConstraint("url_hash", "model", "lang", name="uix_summary_cache_key"),
+    )
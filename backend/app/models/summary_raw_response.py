@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.database import Base
+
+
+class SummaryRawResponse(Base):
+    """Gemini 原始响应元数据，zlib 压缩后单独存放，只在管理员查看时加载"""
+
+    __tablename__ = "summary_raw_responses"
+
+    summary_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("summaries.id", ondelete="CASCADE"), primary_key=True
+    )
+    data: Mapped[bytes] = mapped_column(LargeBinary)  # zlib 压缩的 JSON
+    raw_size: Mapped[int] = mapped_column(Integer)  # 压缩前的字节数
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
@@ -30,6 +30,7 @@ class ItemResponse(ItemBase):
     id: int = Field(..., description="条目ID")
     created_at: datetime = Field(..., description="创建时间")
     fetched_at: datetime = Field(..., description="抓取时间")
+    cluster_id: Optional[int] = Field(None, description="近似重复簇ID")
 
     class Config:
         from_attributes = True
@@ -41,6 +42,7 @@ class ItemWithSummaryResponse(ItemBase):
     id: int = Field(..., description="条目ID")
     created_at: datetime = Field(..., description="创建时间")
     fetched_at: datetime = Field(..., description="抓取时间")
+    cluster_id: Optional[int] = Field(None, description="近似重复簇ID")
 
     # 摘要信息（可能为空）
     summary_content: Optional[str] = Field(None, description="AI摘要内容")
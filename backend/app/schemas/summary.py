@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional
 from pydantic import BaseModel, Field
 
 from app.models.summary import SummaryStatus
@@ -24,7 +24,6 @@ class SummaryUpdate(BaseModel):
     error_type: Optional[str] = None
     generation_duration_ms: Optional[int] = None
     url_retrieval_status: Optional[str] = None
-    response_json: Optional[Dict[str, Any]] = None
 
 
 class SummaryResponse(BaseModel):
@@ -35,12 +34,15 @@ class SummaryResponse(BaseModel):
     content: Optional[str] = Field(None, description="摘要内容")
     translated_title: Optional[str] = Field(None, description="翻译后的标题")
     status: SummaryStatus = Field(..., description="生成状态")
+    mode: str = Field("full", description="生成方式: full / title_only")
+    skip_reason: Optional[str] = Field(None, description="跳过或只翻译标题的原因")
     retry_count: int = Field(..., description="重试次数")
     max_retries: int = Field(..., description="最大重试次数")
     created_at: datetime = Field(..., description="创建时间")
     started_at: Optional[datetime] = Field(None, description="开始生成时间")
     completed_at: Optional[datetime] = Field(None, description="完成时间")
     error_message: Optional[str] = Field(None, description="错误信息")
+    next_retry_at: Optional[datetime] = Field(None, description="下次重试时间")
     generation_duration_ms: Optional[int] = Field(None, description="生成耗时")
     url_retrieval_status: Optional[str] = Field(None, description="URL检索状态")
 
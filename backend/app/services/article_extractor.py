@@ -0,0 +1,288 @@
+"""
+文章正文抓取与提取
+
+使用共享的 httpx 连接池抓取文章页面，提取正文文本并按 token 预算截断。
+提取结果以 zlib 压缩后按规范化 URL 哈希缓存在磁盘上，重试和重新生成摘要时直接复用。
+"""
+
+import asyncio
+import re
+import zlib
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from .summary_cache import hash_url
+
+logger = get_logger(__name__)
+
+# 不包含正文的标签
+SKIP_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "svg",
+    "iframe",
+    "button",
+    "select",
+}
+# 构成正文段落的块级标签
+BLOCK_TAGS = {
+    "p",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "li",
+    "pre",
+    "blockquote",
+    "td",
+    "dd",
+    "figcaption",
+}
+# 正文容器标签
+MAIN_TAGS = {"article", "main"}
+# 无法闭合的空元素
+VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr"}
+
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class _MainTextParser(HTMLParser):
+    """基于标签结构的轻量正文提取器"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.main_depth = 0
+        self.block_depth = 0
+        self.buffer: List[str] = []
+        self.main_blocks: List[str] = []
+        self.all_blocks: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if tag in VOID_TAGS:
+            return
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in MAIN_TAGS:
+            self.main_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self.block_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in MAIN_TAGS:
+            self._flush()
+            self.main_depth = max(0, self.main_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self.block_depth = max(0, self.block_depth - 1)
+
+    def handle_data(self, data: str) -> None:
+        if self.skip_depth == 0 and self.block_depth > 0:
+            self.buffer.append(data)
+
+    def _flush(self) -> None:
+        text = WHITESPACE_PATTERN.sub(" ", "".join(self.buffer)).strip()
+        self.buffer = []
+        if len(text) < 2:
+            return
+        self.all_blocks.append(text)
+        if self.main_depth > 0:
+            self.main_blocks.append(text)
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+
+def extract_main_text(html: str) -> str:
+    """从 HTML 中提取正文，优先使用 <article>/<main> 中的内容"""
+    parser = _MainTextParser()
+    parser.feed(html)
+    parser.close()
+
+    main_text = "\n\n".join(parser.main_blocks)
+    if len(main_text) >= 200:
+        return main_text
+    return "\n\n".join(parser.all_blocks)
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：CJK 字符按 1 个 token，其他按 4 个字符 1 个 token"""
+    cjk_count = len(CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+
+def truncate_to_token_budget(text: str, max_tokens: int) -> str:
+    """按段落截断文本，使估算 token 数不超过预算"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept: List[str] = []
+    used = 0
+    for paragraph in text.split("\n\n"):
+        cost = estimate_tokens(paragraph) + 1
+        if used + cost > max_tokens:
+            remaining = max_tokens - used
+            if remaining > 50:
+                # 按比例截取最后一个段落
+                ratio = remaining / cost
+                kept.append(paragraph[: int(len(paragraph) * ratio)].rstrip() + "…")
+            break
+        kept.append(paragraph)
+        used += cost
+
+    return "\n\n".join(kept)
+
+
+class ArticleExtractor:
+    """文章正文抓取器（共享连接池 + 压缩磁盘缓存）"""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.cache_dir = Path(self.settings.article_cache_dir)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共享的 httpx 客户端（复用连接）"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.settings.article_fetch_timeout_seconds,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                headers={
+                    "User-Agent": "Mozilla/5.0 (compatible; ProgrammerTrending/1.0)"
+                },
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _cache_path(self, url: str) -> Path:
+        key = hash_url(url)
+        return self.cache_dir / key[:2] / f"{key}.txt.z"
+
+    async def get_cached_text(self, url: str) -> Optional[str]:
+        """只读取磁盘缓存，不发起网络请求"""
+        path = self._cache_path(url)
+
+        def read() -> Optional[str]:
+            if not path.exists():
+                return None
+            return zlib.decompress(path.read_bytes()).decode("utf-8")
+
+        try:
+            return await asyncio.to_thread(read)
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Failed to read article cache for {url}: {e}")
+            return None
+
+    async def _write_cache(self, url: str, text: str) -> None:
+        path = self._cache_path(url)
+
+        def write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(zlib.compress(text.encode("utf-8"), level=6))
+            tmp_path.replace(path)
+
+        try:
+            await asyncio.to_thread(write)
+        except OSError as e:
+            logger.warning(f"Failed to write article cache for {url}: {e}")
+
+    async def get_article_text(self, url: str) -> Optional[str]:
+        """
+        获取文章正文（优先读取缓存）
+
+        Args:
+            url: 文章链接
+
+        Returns:
+            提取出的完整正文，无法获取或内容过短时返回 None
+        """
+        cached = await self.get_cached_text(url)
+        if cached is not None:
+            return cached
+
+        html = await self._fetch_html(url)
+        if html is None:
+            return None
+
+        # 解析大页面较耗 CPU，放到线程中执行避免阻塞事件循环
+        text = await asyncio.to_thread(extract_main_text, html)
+        if len(text) < self.settings.article_min_chars:
+            logger.info(f"Extracted text too short for {url} ({len(text)} chars)")
+            return None
+
+        await self._write_cache(url, text)
+        return text
+
+    async def _fetch_html(self, url: str) -> Optional[str]:
+        """抓取页面 HTML，非文本类型或超过大小限制时放弃"""
+        max_bytes = self.settings.article_max_bytes
+        try:
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "")
+                if "html" not in content_type and "text/plain" not in content_type:
+                    logger.info(f"Skipping non-HTML content for {url}: {content_type}")
+                    return None
+
+                chunks: List[bytes] = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= max_bytes:
+                        break
+
+                encoding = response.encoding or "utf-8"
+                return b"".join(chunks)[:max_bytes].decode(encoding, errors="replace")
+
+        except (httpx.HTTPError, LookupError) as e:
+            logger.warning(f"Failed to fetch article {url}: {e}")
+            return None
+
+    async def head_content_type(self, url: str) -> Optional[str]:
+        """通过 HEAD 请求获取页面的 Content-Type（失败时返回 None）"""
+        try:
+            response = await self.client.head(url)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.debug(f"HEAD request failed for {url}: {e}")
+            return None
+        content_type = response.headers.get("content-type", "")
+        return content_type.split(";")[0].strip().lower() or None
+
+    async def get_prompt_text(self, url: str, max_tokens: int) -> Optional[str]:
+        """获取按 token 预算截断后的正文，用于构建提示词"""
+        text = await self.get_article_text(url)
+        if text is None:
+            return None
+        return truncate_to_token_budget(text, max_tokens)
+
+
+# 全局正文抓取器实例
+article_extractor = ArticleExtractor()
@@ -0,0 +1,276 @@
+"""
+离线批处理后端
+
+将摘要任务导出为 JSONL 批处理文件提交给批处理后端，与实时请求的速率配额分离。
+每行格式: {"key": "...", "request": {...GenerateContentRequest...}}
+结果行格式: {"key": "...", "text": "...", "usage": {...}} 或 {"key": "...", "error": "..."}
+"""
+
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from google import genai
+from google.genai import types
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from .summary_service import summary_service
+
+logger = get_logger(__name__)
+
+
+class BatchJobState(str, Enum):
+    """批处理任务状态"""
+
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"  # 超过等待时限，远端任务已取消
+
+
+@dataclass
+class BatchResult:
+    """单个请求的批处理结果"""
+
+    key: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    usage: Dict[str, Any] = field(default_factory=dict)
+
+
+class BatchBackend(ABC):
+    """批处理后端基类"""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def submit(self, input_path: Path) -> str:
+        """
+        提交 JSONL 批处理文件
+
+        Args:
+            input_path: 导出的 JSONL 文件路径
+
+        Returns:
+            后端的任务标识
+        """
+        pass
+
+    @abstractmethod
+    async def poll(self, job_id: str) -> BatchJobState:
+        """查询任务状态"""
+        pass
+
+    @abstractmethod
+    async def fetch_results(self, job_id: str) -> List[BatchResult]:
+        """获取已完成任务的结果"""
+        pass
+
+    @abstractmethod
+    async def cancel(self, job_id: str) -> None:
+        """取消任务（超时放弃时调用，避免结果在任务被放回队列后才产生）"""
+        pass
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """
+    基于本地文件的批处理后端（用于测试和本地开发）
+
+    提交时将输入文件复制到工作目录；当 <job_id>.output.jsonl 出现时视为完成。
+    如果提供了 responder，则在轮询时用它逐行生成结果文件。
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        work_dir: Path,
+        responder: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ) -> None:
+        self.work_dir = work_dir
+        self.responder = responder
+
+    def _input_path(self, job_id: str) -> Path:
+        return self.work_dir / f"{job_id}.input.jsonl"
+
+    def _output_path(self, job_id: str) -> Path:
+        return self.work_dir / f"{job_id}.output.jsonl"
+
+    async def submit(self, input_path: Path) -> str:
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        self._input_path(job_id).write_bytes(input_path.read_bytes())
+        logger.info(f"Submitted local batch job {job_id}")
+        return job_id
+
+    async def poll(self, job_id: str) -> BatchJobState:
+        if self._output_path(job_id).exists():
+            return BatchJobState.SUCCEEDED
+        if not self._input_path(job_id).exists():
+            return BatchJobState.FAILED
+
+        if self.responder is not None:
+            lines: List[str] = []
+            with self._input_path(job_id).open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        lines.append(json.dumps(self.responder(json.loads(line))))
+            self._output_path(job_id).write_text("\n".join(lines), encoding="utf-8")
+            return BatchJobState.SUCCEEDED
+
+        return BatchJobState.RUNNING
+
+    async def fetch_results(self, job_id: str) -> List[BatchResult]:
+        results: List[BatchResult] = []
+        with self._output_path(job_id).open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                results.append(
+                    BatchResult(
+                        key=data["key"],
+                        text=data.get("text"),
+                        error=data.get("error"),
+                        usage=data.get("usage") or {},
+                    )
+                )
+        return results
+
+    async def cancel(self, job_id: str) -> None:
+        # 删除输入文件后轮询返回 FAILED
+        self._input_path(job_id).unlink(missing_ok=True)
+        logger.info(f"Cancelled local batch job {job_id}")
+
+
+class GeminiBatchBackend(BatchBackend):
+    """Gemini Batch API 后端（上传 JSONL 文件，异步执行，价格和配额独立于实时请求）"""
+
+    name = "gemini"
+
+    _TERMINAL_FAILURES = {
+        types.JobState.JOB_STATE_FAILED,
+        types.JobState.JOB_STATE_CANCELLED,
+        types.JobState.JOB_STATE_EXPIRED,
+    }
+
+    def __init__(
+        self,
+        model: str,
+        client_provider: Optional[Callable[[], Awaitable[genai.Client]]] = None,
+    ) -> None:
+        self.model = model
+        # 默认使用摘要服务管理的共享客户端，不单独创建连接池
+        self._client_provider = client_provider or summary_service.get_client
+
+    async def submit(self, input_path: Path) -> str:
+        client = await self._client_provider()
+        uploaded = await client.aio.files.upload(
+            file=str(input_path),
+            config=types.UploadFileConfig(
+                display_name=input_path.name, mime_type="jsonl"
+            ),
+        )
+        if not uploaded.name:
+            raise RuntimeError("Batch input upload returned no file name")
+
+        job = await client.aio.batches.create(
+            model=self.model,
+            src=uploaded.name,
+            config=types.CreateBatchJobConfig(display_name=input_path.stem),
+        )
+        if not job.name:
+            raise RuntimeError("Batch job creation returned no job name")
+
+        logger.info(f"Submitted Gemini batch job {job.name}")
+        return job.name
+
+    async def poll(self, job_id: str) -> BatchJobState:
+        client = await self._client_provider()
+        job = await client.aio.batches.get(name=job_id)
+        if job.state == types.JobState.JOB_STATE_SUCCEEDED:
+            return BatchJobState.SUCCEEDED
+        if job.state in self._TERMINAL_FAILURES:
+            logger.error(f"Gemini batch job {job_id} ended with {job.state}")
+            return BatchJobState.FAILED
+        return BatchJobState.RUNNING
+
+    async def fetch_results(self, job_id: str) -> List[BatchResult]:
+        client = await self._client_provider()
+        job = await client.aio.batches.get(name=job_id)
+        if not job.dest or not job.dest.file_name:
+            raise RuntimeError(f"Batch job {job_id} has no result file")
+
+        content = await client.aio.files.download(file=job.dest.file_name)
+        results: List[BatchResult] = []
+        for line in (content or b"").decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            results.append(self._parse_result_line(data))
+        return results
+
+    async def cancel(self, job_id: str) -> None:
+        client = await self._client_provider()
+        await client.aio.batches.cancel(name=job_id)
+        logger.info(f"Cancelled Gemini batch job {job_id}")
+
+    @staticmethod
+    def _parse_result_line(data: Dict[str, Any]) -> BatchResult:
+        """将 Batch API 的结果行转换为 BatchResult"""
+        key = data.get("key", "")
+        if data.get("error"):
+            return BatchResult(key=key, error=json.dumps(data["error"]))
+
+        response = data.get("response") or {}
+        candidates = response.get("candidates") or []
+        if not candidates:
+            return BatchResult(key=key, error="No candidates in response")
+
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        text = "".join(
+            part.get("text", "") for part in parts if not part.get("thought")
+        )
+        usage = response.get("usageMetadata") or {}
+        return BatchResult(
+            key=key,
+            text=text.strip() or None,
+            error=None if text.strip() else "Empty response content",
+            usage={
+                "prompt_token_count": usage.get("promptTokenCount", 0),
+                "candidates_token_count": usage.get("candidatesTokenCount", 0),
+                "total_token_count": usage.get("totalTokenCount", 0),
+            },
+        )
+
+
+def create_batch_backend(backend_name: str, model: str) -> BatchBackend:
+    """根据配置创建批处理后端"""
+    settings = get_settings()
+    if backend_name == "local":
+        return LocalFileBatchBackend(Path(settings.summary_backlog_work_dir) / "local")
+    if backend_name == "gemini":
+        return GeminiBatchBackend(model)
+    raise ValueError(f"Unknown batch backend: {backend_name}")
+
+
+async def wait_for_batch(
+    backend: BatchBackend, job_id: str, poll_interval: float, timeout: float
+) -> BatchJobState:
+    """轮询直到任务结束或超时（超时返回 TIMED_OUT，由调用方取消任务）"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        state = await backend.poll(job_id)
+        if state != BatchJobState.RUNNING:
+            return state
+        if loop.time() >= deadline:
+            logger.error(f"Batch job {job_id} timed out after {timeout} seconds")
+            return BatchJobState.TIMED_OUT
+        await asyncio.sleep(poll_interval)
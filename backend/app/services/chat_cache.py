@@ -0,0 +1,95 @@
+"""
+聊天响应缓存
+
+匿名用户经常围绕同一篇热门文章问相同的第一个问题。按规范化后的
+(模型, 文章, 消息, 生成参数) 哈希缓存完整的流式响应，命中时直接回放，
+不调用模型，也不占用全站限流名额。
+"""
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_content(content: str) -> str:
+    """去掉首尾空白并合并连续空白"""
+    return WHITESPACE_PATTERN.sub(" ", content).strip()
+
+
+class ChatResponseCache:
+    """聊天流式响应缓存（TTL + 条数上限，按最近使用淘汰）"""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        # 缓存键 -> (过期时间, 文本分块列表)
+        self._entries: OrderedDict[str, tuple[float, List[str]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def make_key(self, request: Any, model: str) -> str:
+        """规范化请求并计算缓存键"""
+        payload = {
+            "model": model,
+            "item_id": request.item_id,
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens,
+            "messages": [
+                [message.role, normalize_content(message.content)]
+                for message in request.messages
+            ],
+        }
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """读取未过期的缓存分块"""
+        if not self.settings.chat_cache_enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, chunks: List[str]) -> None:
+        """缓存一次完整的响应（过长的响应不缓存）"""
+        if not self.settings.chat_cache_enabled or not chunks:
+            return
+        if sum(len(chunk) for chunk in chunks) > self.settings.chat_cache_max_chars:
+            return
+        expires_at = time.monotonic() + self.settings.chat_cache_ttl_seconds
+        self._entries[key] = (expires_at, list(chunks))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.settings.chat_cache_max_entries:
+            self._entries.popitem(last=False)
+        self.stores += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 全局聊天响应缓存实例
+chat_response_cache = ChatResponseCache()
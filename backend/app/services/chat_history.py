@@ -0,0 +1,195 @@
+"""
+聊天历史 token 预算
+
+前端每轮都会发送完整的对话历史。历史超过预算时，最近的若干轮原样保留，
+更早的消息压缩为一段滚动摘要放入系统指令。
+
+摘要按对话前缀的链式哈希缓存在服务端：同一会话的下一轮请求前缀不变，直接命中；
+前缀变长时从最长的已缓存前缀出发，只把新移出窗口的消息合并进摘要，不必从头重新生成。
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from google.genai import types
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from .article_extractor import estimate_tokens
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PreparedHistory:
+    """按预算处理后的对话历史"""
+
+    messages: List[Any]  # 原样保留的最近消息
+    summary: Optional[str] = None  # 更早消息的滚动摘要
+    summarized_count: int = 0  # 被压缩的消息数
+
+
+def prefix_hashes(messages: Sequence[Any]) -> List[str]:
+    """各长度前缀的链式哈希，第 i 项对应 messages[:i + 1]"""
+    hashes: List[str] = []
+    previous = ""
+    for message in messages:
+        digest = hashlib.sha256()
+        digest.update(previous.encode("utf-8"))
+        digest.update(message.role.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(message.content.encode("utf-8"))
+        previous = digest.hexdigest()
+        hashes.append(previous)
+    return hashes
+
+
+class ChatHistoryBudget:
+    """对话历史 token 预算管理（带滚动摘要缓存）"""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self._summaries: OrderedDict[str, str] = OrderedDict()  # 前缀哈希 -> 摘要
+        self.hits = 0
+        self.misses = 0
+
+    def _split_point(self, messages: Sequence[Any]) -> int:
+        """
+        计算压缩边界：messages[:split] 压缩为摘要，其余原样保留
+
+        从最后一条向前累计，保留不超过 chat_history_recent_tokens 的消息（至少保留
+        chat_history_min_recent_messages 条），并让保留部分从用户消息开始。
+        """
+        budget = self.settings.chat_history_recent_tokens
+        min_recent = max(1, self.settings.chat_history_min_recent_messages)
+        used = 0
+        split = len(messages)
+        while split > 0:
+            cost = estimate_tokens(messages[split - 1].content)
+            kept = len(messages) - split
+            if kept >= min_recent and used + cost > budget:
+                break
+            used += cost
+            split -= 1
+        while split > 0 and messages[split].role != "user":
+            split -= 1
+        return split
+
+    def _cached_summary(self, hashes: Sequence[str], split: int) -> Tuple[int, str]:
+        """
+        查找 messages[:split] 最长的已缓存前缀摘要
+
+        Returns:
+            (已被摘要覆盖的消息数, 摘要)，没有缓存时为 (0, "")
+        """
+        for length in range(split, 0, -1):
+            summary = self._summaries.get(hashes[length - 1])
+            if summary is not None:
+                self._summaries.move_to_end(hashes[length - 1])
+                return length, summary
+        return 0, ""
+
+    def _store(self, key: str, summary: str) -> None:
+        self._summaries[key] = summary
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.settings.chat_history_summary_cache_size:
+            self._summaries.popitem(last=False)
+
+    async def _summarize(
+        self,
+        client: Any,
+        model: str,
+        previous_summary: str,
+        messages: Sequence[Any],
+    ) -> str:
+        """将新移出窗口的消息合并进已有摘要"""
+        transcript = "\n".join(
+            f"{'User' if m.role == 'user' else 'Assistant'}: {m.content}"
+            for m in messages
+        )
+        prompt = (
+            "Update the running summary of a conversation between a user and an "
+            "assistant. Keep facts, decisions, open questions and anything the user "
+            "asked to remember; drop pleasantries. Write the summary in the language "
+            "of the conversation and return only the summary text."
+            f"\n\nCurrent summary:\n{previous_summary or '(empty)'}"
+            f"\n\nNew messages:\n{transcript}"
+        )
+        config = types.GenerateContentConfig(
+            temperature=0.2,
+            max_output_tokens=self.settings.chat_history_summary_max_tokens,
+            thinking_config=types.ThinkingConfig(
+                thinking_budget=0, include_thoughts=False
+            ),
+        )
+        response = await client.aio.models.generate_content(
+            model=model, contents=prompt, config=config
+        )
+        return (getattr(response, "text", None) or "").strip()
+
+    async def prepare(
+        self, messages: Sequence[Any], client: Any, model: str
+    ) -> PreparedHistory:
+        """
+        按 token 预算处理对话历史
+
+        Args:
+            messages: 完整的对话历史（最后一条为当前用户消息）
+            client: 用于生成摘要的 genai 客户端
+            model: 模型名称
+
+        Returns:
+            保留的最近消息和更早消息的摘要
+        """
+        total = sum(estimate_tokens(m.content) for m in messages)
+        if total <= self.settings.chat_history_token_budget:
+            return PreparedHistory(messages=list(messages))
+
+        split = self._split_point(messages)
+        if split == 0:
+            return PreparedHistory(messages=list(messages))
+
+        hashes = prefix_hashes(messages[:split])
+        covered, summary = self._cached_summary(hashes, split)
+        if covered == split:
+            self.hits += 1
+        else:
+            self.misses += 1
+            try:
+                summary = await self._summarize(
+                    client, model, summary, messages[covered:split]
+                )
+            except Exception as e:
+                # 摘要失败时只保留最近的消息，不阻塞本轮对话
+                logger.warning(f"Failed to summarize chat history: {e}")
+                return PreparedHistory(
+                    messages=list(messages[split:]), summarized_count=split
+                )
+            if summary:
+                self._store(hashes[split - 1], summary)
+
+        logger.info(
+            f"Chat history compressed: {split} of {len(messages)} messages summarized "
+            f"(~{total} tokens before)"
+        )
+        return PreparedHistory(
+            messages=list(messages[split:]),
+            summary=summary or None,
+            summarized_count=split,
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        """摘要缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "cached_summaries": len(self._summaries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 全局聊天历史预算管理实例
+chat_history_budget = ChatHistoryBudget()
@@ -0,0 +1,192 @@
+"""
+聊天多级限流
+
+全站、单 IP、单会话三级限流，每级都是 GCRA（通用信元速率算法）：每个键只保存一个
+“理论到达时间”（TAT），判断和扣减都是 O(1)，效果等价于平滑的滑动窗口——窗口内最多
+limit 次请求，额度按 window / limit 的间隔匀速恢复。
+
+请求必须通过所有层级才会扣减额度，某一级拒绝时其他层级不受影响，
+避免被单 IP 限流拒绝的请求继续消耗全站名额。
+"""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import get_settings
+
+GLOBAL_KEY = "*"
+
+
+@dataclass
+class LimitStatus:
+    """某一级限流对某个键的当前状态"""
+
+    tier: str
+    limit: int
+    window_seconds: float
+    remaining: int
+    retry_after: float  # 距离下一次可用额度的秒数，有剩余额度时为 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tier": self.tier,
+            "limit": self.limit,
+            "window_seconds": self.window_seconds,
+            "remaining": self.remaining,
+            "retry_after": math.ceil(self.retry_after),
+        }
+
+
+class GCRALimiter:
+    """单级 GCRA 限流器（按键保存 TAT，过期的键按最近使用顺序清理）"""
+
+    def __init__(
+        self, tier: str, limit: int, window_seconds: float, max_keys: int
+    ) -> None:
+        self.tier = tier
+        self.limit = max(1, limit)
+        self.window_seconds = window_seconds
+        self.interval = window_seconds / self.limit  # 每次请求占用的时间
+        self.max_keys = max(1, max_keys)
+        self._tats: OrderedDict[str, float] = OrderedDict()
+
+    def _tat(self, key: str, now: float) -> float:
+        return max(self._tats.get(key, now), now)
+
+    def status(self, key: str, now: float) -> LimitStatus:
+        """查询剩余额度（不扣减）"""
+        tat = self._tat(key, now)
+        remaining = int((now + self.window_seconds - tat) // self.interval)
+        retry_after = 0.0
+        if remaining <= 0:
+            remaining = 0
+            retry_after = tat + self.interval - self.window_seconds - now
+        return LimitStatus(
+            self.tier, self.limit, self.window_seconds, remaining, retry_after
+        )
+
+    def consume(self, key: str, now: float) -> None:
+        """扣减一次额度（调用前应已确认 status 有剩余额度）"""
+        self._tats[key] = self._tat(key, now) + self.interval
+        self._tats.move_to_end(key)
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        # TAT 已过去的键与从未出现过的键等价，可以直接丢弃
+        while self._tats:
+            key, tat = next(iter(self._tats.items()))
+            if tat > now and len(self._tats) <= self.max_keys:
+                break
+            del self._tats[key]
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+def conversation_key(client_ip: str, item_id: Optional[int], first_message: str) -> str:
+    """会话标识：同一 IP、同一文章、相同首条消息的请求视为同一会话"""
+    raw = f"{client_ip}\0{item_id}\0{first_message}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ChatRateLimiter:
+    """匿名聊天的多级限流器"""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        max_keys = settings.chat_rate_limit_max_keys
+        self.global_tier = GCRALimiter(
+            "global",
+            settings.chat_rate_limit_global,
+            settings.chat_rate_limit_global_window_seconds,
+            1,
+        )
+        self.ip_tier = GCRALimiter(
+            "ip",
+            settings.chat_rate_limit_per_ip,
+            settings.chat_rate_limit_ip_window_seconds,
+            max_keys,
+        )
+        self.conversation_tier = GCRALimiter(
+            "conversation",
+            settings.chat_rate_limit_per_conversation,
+            settings.chat_rate_limit_conversation_window_seconds,
+            max_keys,
+        )
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {"global": 0, "ip": 0, "conversation": 0}
+
+    def _tiers(
+        self, client_ip: str, conversation: Optional[str]
+    ) -> List[Tuple[GCRALimiter, str]]:
+        tiers = [(self.global_tier, GLOBAL_KEY), (self.ip_tier, client_ip)]
+        if conversation is not None:
+            tiers.append((self.conversation_tier, conversation))
+        return tiers
+
+    def check(
+        self, client_ip: str, conversation: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        检查并扣减额度
+
+        Returns:
+            {"allowed": True} 或 {"allowed": False, "reason", "tier", "retry_after"}
+        """
+        now = time.monotonic()
+        tiers = self._tiers(client_ip, conversation)
+        for limiter, key in tiers:
+            status = limiter.status(key, now)
+            if status.remaining == 0:
+                self.rejected[limiter.tier] += 1
+                return {
+                    "allowed": False,
+                    "reason": f"{limiter.tier.capitalize()} rate limit exceeded",
+                    "tier": limiter.tier,
+                    "retry_after": math.ceil(status.retry_after),
+                }
+        for limiter, key in tiers:
+            limiter.consume(key, now)
+        self.allowed += 1
+        return {"allowed": True}
+
+    def status(
+        self, client_ip: str, conversation: Optional[str] = None
+    ) -> List[LimitStatus]:
+        """调用方在各级的剩余额度"""
+        now = time.monotonic()
+        return [
+            limiter.status(key, now)
+            for limiter, key in self._tiers(client_ip, conversation)
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """限流统计"""
+        return {
+            "allowed": self.allowed,
+            "rejected": dict(self.rejected),
+            "tracked_ips": len(self.ip_tier),
+            "tracked_conversations": len(self.conversation_tier),
+        }
+
+
+def describe(statuses: Sequence[LimitStatus]) -> str:
+    """可读的限额说明，例如 "5 requests per 10 minutes per IP" """
+    labels = {"global": "", "ip": " per IP", "conversation": " per conversation"}
+    parts = []
+    for status in statuses:
+        minutes = status.window_seconds / 60
+        if minutes >= 1:
+            window = f"{minutes:g} minutes"
+        else:
+            window = f"{status.window_seconds:g} seconds"
+        parts.append(f"{status.limit} requests per {window}{labels[status.tier]}")
+    return ", ".join(parts)
+
+
+# 全局聊天限流器实例
+chat_rate_limiter = ChatRateLimiter()
@@ -4,16 +4,27 @@ Google Gemini 流式聊天服务
 使用官方 google-genai SDK 的流式 API 处理实时聊天对话
 """
 
-import json
+import asyncio
 import time
-from typing import AsyncGenerator, Dict, Any, List, Optional, Literal
+from typing import AsyncGenerator, Coroutine, Dict, Any, List, Optional, Literal
 
-from google import genai
 from google.genai import types
 from pydantic import BaseModel
+from sqlalchemy import select
 
+from ..core.concurrency import AdmissionGate
 from ..core.config import get_settings
+from ..core.database import AsyncSessionLocal
 from ..core.logging import get_logger
+from ..models.chat_usage import ChatUsage
+from ..models.item import Item
+from ..models.summary import Summary
+from .article_extractor import article_extractor, truncate_to_token_budget
+from .chat_cache import chat_response_cache
+from .chat_history import chat_history_budget
+from .chat_rate_limit import chat_rate_limiter, conversation_key
+from .genai_client_pool import chat_client_pool
+from .summary_service import usage_tokens
 
 logger = get_logger(__name__)
 
@@ -31,80 +42,157 @@ class ChatRequest(BaseModel):
     messages: List[ChatMessage]
     temperature: Optional[float] = None
     max_tokens: Optional[int] = None
-
-
-class RateLimiter:
-    """全站速率限制器"""
-
-    def __init__(self):
-        # 全站限制：每10分钟5条消息
-        # 开发阶段不考虑单IP限制，为全站共享
-        self.global_limit = 5
-        self.global_window = 600  # 10分钟
-        self.global_requests: list[float] = []
-
-    def check_global_limit(self) -> bool:
-        """检查全站限制"""
-        now = time.time()
-        # 清理过期请求
-        self.global_requests = [
-            req_time
-            for req_time in self.global_requests
-            if now - req_time < self.global_window
-        ]
-
-        if len(self.global_requests) >= self.global_limit:
-            return False
-
-        self.global_requests.append(now)
-        return True
-
-    def can_make_request(self) -> Dict[str, Any]:
-        """检查是否可以发起请求"""
-        if not self.check_global_limit():
-            return {
-                "allowed": False,
-                "reason": "Global rate limit exceeded",
-                "retry_after": self.global_window,
-            }
-
-        return {"allowed": True}
+    item_id: Optional[int] = None  # 围绕某篇文章讨论时由服务端注入文章上下文
 
 
 class ChatService:
     """流式聊天服务（基于 Google Gen AI SDK）"""
 
-    def __init__(self):
+    def __init__(self) -> None:
         self.settings = get_settings()
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = chat_rate_limiter
+        # 正文未缓存的 URL -> 下次允许抓取的时间（monotonic）
+        self._article_misses: Dict[str, float] = {}
+        self._prefetch_tasks: set[asyncio.Task[None]] = set()
+        self._usage_tasks: set[asyncio.Task[None]] = set()  # 后台写入的用量记录
+        # 同时进行的流式响应数上限（两种模式共用）
+        self.admission = AdmissionGate(
+            self.settings.chat_max_concurrent_streams,
+            self.settings.chat_max_queued_streams,
+            self.settings.chat_queue_timeout_seconds,
+        )
 
-    def _build_chat_config(self) -> types.GenerateContentConfig:
-        """构建聊天配置"""
+    def _build_chat_config(
+        self,
+        item_context: Optional[Dict[str, Any]] = None,
+        history_summary: Optional[str] = None,
+    ) -> types.GenerateContentConfig:
+        """构建聊天配置（文章上下文和较早对话的摘要放入系统指令）"""
         config = types.GenerateContentConfig(
             tools=[{"url_context": {}}],  # URL 上下文工具
             temperature=0.7,  # 对话更灵活一些
             top_p=0.95,
             top_k=40,
         )
+        instructions: list[str] = []
+        if item_context:
+            instructions.append(item_context["instruction"])
+            # 有文章正文时不再让 Gemini 每轮访问页面
+            if item_context["has_article_text"]:
+                config.tools = None
+        if history_summary:
+            instructions.append(
+                f"Summary of the earlier part of this conversation:\n{history_summary}"
+            )
+        if instructions:
+            config.system_instruction = "\n\n".join(instructions)
 
         return config
 
+    async def _load_item_context(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """
+        读取文章标题、已生成的摘要和缓存的正文，构建系统指令
+
+        Returns:
+            {"instruction": 系统指令, "has_article_text": 是否包含正文}，文章不存在时返回 None
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Item, Summary)
+                .outerjoin(Summary, Summary.item_id == Item.id)
+                .where(Item.id == item_id)
+            )
+            row = result.first()
+        if row is None:
+            return None
+        item, summary = row
+
+        article_text = await self._cached_article_text(item.url)
+
+        parts = [
+            "You are discussing the following article with the user. Answer based on "
+            "the article content below; say so when the article does not cover the "
+            "question.",
+            f"Title: {item.title}",
+            f"Link: {item.url}",
+        ]
+        if summary is not None and summary.translated_title:
+            parts.append(f"Translated title: {summary.translated_title}")
+        if summary is not None and summary.content:
+            parts.append(f"Summary:\n{summary.content}")
+        if article_text:
+            parts.append(f"Article content:\n{article_text}")
+
+        return {
+            "instruction": "\n\n".join(parts),
+            "has_article_text": article_text is not None,
+        }
+
+    async def _cached_article_text(self, url: str) -> Optional[str]:
+        """
+        读取本地缓存的正文，不在请求路径上抓取页面
+
+        未缓存时在后台抓取一次，后续轮次即可使用；未命中的 URL 在 TTL 内不再抓取，
+        无法访问的页面不会每轮都重试。
+        """
+        text = await article_extractor.get_cached_text(url)
+        if text is not None:
+            return truncate_to_token_budget(
+                text, self.settings.chat_article_token_budget
+            )
+
+        now = time.monotonic()
+        if self._article_misses.get(url, 0.0) > now:
+            return None
+        self._article_misses = {
+            key: until for key, until in self._article_misses.items() if until > now
+        }
+        self._article_misses[url] = now + self.settings.chat_article_miss_ttl_seconds
+        task = asyncio.create_task(self._prefetch_article(url))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+        return None
+
+    async def _prefetch_article(self, url: str) -> None:
+        """后台抓取正文写入缓存（失败时保留未命中记录，等待 TTL 过期）"""
+        try:
+            if await article_extractor.get_article_text(url) is not None:
+                self._article_misses.pop(url, None)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch article text for {url}: {e}")
+
     async def stream_chat_anonymous(
         self,
         request: ChatRequest,
-    ) -> AsyncGenerator[str, None]:
-        """匿名用户流式聊天（使用服务器API key + 限流）"""
+        client_ip: str = "unknown",
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """匿名用户流式聊天（使用服务器API key + 全站 / 单 IP / 单会话限流）"""
+
+        # 命中响应缓存时直接回放，不占用限流名额
+        cached = self._replay_cached(request)
+        if cached is not None:
+            for chunk in cached:
+                yield chunk
+            return
 
         # 检查速率限制
-        rate_check = self.rate_limiter.can_make_request()
+        first_message = request.messages[0].content if request.messages else ""
+        rate_check = self.rate_limiter.check(
+            client_ip, conversation_key(client_ip, request.item_id, first_message)
+        )
         if not rate_check["allowed"]:
-            yield f"data: {json.dumps({'error': rate_check['reason'], 'retry_after': rate_check['retry_after']})}\n\n"
+            yield {
+                "error": rate_check["reason"],
+                "code": "RATE_LIMIT",
+                "tier": rate_check["tier"],
+                "retry_after": rate_check["retry_after"],
+            }
             return
 
         # 使用服务器API key
         api_key = self.settings.google_api_key
         if not api_key:
-            yield f"data: {json.dumps({'error': '服务器配置错误'})}\n\n"
+            yield {"error": "服务器配置错误"}
             return
 
         async for chunk in self._stream_gemini_response_sdk(request, api_key):
@@ -112,54 +200,183 @@ class ChatService:
 
     async def stream_chat_with_user_key(
         self, request: ChatRequest, user_api_key: str
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[Dict[str, Any], None]:
         """用户自己API key的流式聊天（无限流）"""
-        async for chunk in self._stream_gemini_response_sdk(request, user_api_key):
+        cached = self._replay_cached(request)
+        if cached is not None:
+            for chunk in cached:
+                yield chunk
+            return
+
+        async for chunk in self._stream_gemini_response_sdk(
+            request, user_api_key, user_key=True
+        ):
             yield chunk
 
-    async def _stream_gemini_response_sdk(
-        self, request: ChatRequest, api_key: str
-    ) -> AsyncGenerator[str, None]:
-        """使用 Google Gen AI SDK 的核心流式响应处理"""
+    def _model_name(self) -> str:
+        return self.settings.gemini_model or "gemini-2.5-flash"
+
+    def _replay_cached(self, request: ChatRequest) -> Optional[List[Dict[str, Any]]]:
+        """缓存命中时返回要回放的事件，未命中返回 None"""
+        texts = chat_response_cache.get(
+            chat_response_cache.make_key(request, self._model_name())
+        )
+        if texts is None:
+            return None
+        logger.info(f"Chat response cache hit ({len(texts)} chunks)")
+        events: List[Dict[str, Any]] = [{"text": text} for text in texts]
+        events.append({"done": True, "cached": True})
+        return events
+
+    async def _record_usage(
+        self,
+        model: str,
+        usage: Any,
+        started_at: float,
+        user_key: bool,
+        success: bool,
+        first_token_at: Optional[float],
+        client_reused: bool,
+        finished_at: Optional[float] = None,
+    ) -> None:
+        """记录一次聊天请求的 token 用量（失败不影响响应）"""
+        if finished_at is None:
+            finished_at = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as session:
+                session.add(
+                    ChatUsage(
+                        model=model,
+                        user_key=user_key,
+                        success=success,
+                        duration_ms=int((finished_at - started_at) * 1000),
+                        first_token_ms=(
+                            int((first_token_at - started_at) * 1000)
+                            if first_token_at is not None
+                            else None
+                        ),
+                        client_reused=client_reused,
+                        **usage_tokens(usage),
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to record chat usage: {e}")
 
+    def _record_usage_in_background(self, record: Coroutine[Any, Any, None]) -> None:
+        """在后台写入用量记录，保留任务引用直到完成"""
+        task = asyncio.create_task(record)
+        self._usage_tasks.add(task)
+        task.add_done_callback(self._usage_tasks.discard)
+
+    async def _stream_gemini_response_sdk(
+        self, request: ChatRequest, api_key: str, user_key: bool = False
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """使用 Google Gen AI SDK 的核心流式响应处理（产生事件，由接口层编码为 SSE）"""
+
+        model = self._model_name()
+        started_at = time.monotonic()  # 文章上下文加载完成后重新计时
+        usage = None  # 流式响应的最后一个分块带有完整的 usage_metadata
+        first_token_at: Optional[float] = None
+        client_reused = chat_client_pool.is_cached(api_key)
+        texts: list[str] = []  # 完整响应，成功结束后写入缓存
+        usage_recorded = False  # 结束标记之后客户端断开时不再重复记录
         try:
-            # 创建客户端
-            client = genai.Client(api_key=api_key)
-
-            # 构建消息历史（Gemini 格式）
-            contents: list[types.ContentDict] = []
-            for msg in request.messages:
-                contents.append({"role": msg.role, "parts": [{"text": msg.content}]})
-
-            # 构建配置（支持用户自定义参数）
-            config = self._build_chat_config()
-            if request.temperature is not None:
-                config.temperature = request.temperature
-            if request.max_tokens is not None:
-                config.max_output_tokens = request.max_tokens
-
-            model = self.settings.gemini_model or "gemini-2.5-flash"
-
-            logger.info(f"Starting streaming chat with model: {model}")
-            logger.info(f"Messages count: {len(request.messages)}")
-            logger.info(f"Last message: {request.messages[-1].content[:100]}...")
-
-            # 使用 SDK 的异步流式方法
-            async for chunk in await client.aio.models.generate_content_stream(
-                model=model, contents=contents, config=config
-            ):
-                if hasattr(chunk, "text") and chunk.text:
-                    text_content = chunk.text
-                    logger.debug(f"Received chunk: {text_content[:50]}...")
-                    yield f"data: {json.dumps({'text': text_content})}\n\n"
+            item_context = None
+            if request.item_id is not None:
+                item_context = await self._load_item_context(request.item_id)
+                if item_context is None:
+                    yield {"error": "文章不存在", "code": "NOT_FOUND"}
+                    return
+            # 耗时和首个分块耗时只统计模型调用，不含读取文章上下文
+            started_at = time.monotonic()
+
+            # 按 API key 复用客户端，同一会话的多轮消息共享连接
+            async with chat_client_pool.client(api_key) as client:
+                # 超出 token 预算时较早的消息压缩为摘要
+                history = await chat_history_budget.prepare(
+                    request.messages, client, model
+                )
+
+                # 构建消息历史（Gemini 格式）
+                contents: list[types.ContentDict] = []
+                for msg in history.messages:
+                    contents.append(
+                        {"role": msg.role, "parts": [{"text": msg.content}]}
+                    )
+
+                # 构建配置（支持用户自定义参数）
+                config = self._build_chat_config(item_context, history.summary)
+                if request.temperature is not None:
+                    config.temperature = request.temperature
+                if request.max_tokens is not None:
+                    config.max_output_tokens = request.max_tokens
+
+                logger.info(f"Starting streaming chat with model: {model}")
+                logger.info(
+                    f"Messages count: {len(request.messages)} "
+                    f"({history.summarized_count} summarized)"
+                )
+                logger.info(f"Last message: {request.messages[-1].content[:100]}...")
+
+                # 使用 SDK 的异步流式方法
+                stream = await client.aio.models.generate_content_stream(
+                    model=model, contents=contents, config=config
+                )
+                try:
+                    async for chunk in stream:
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        if hasattr(chunk, "text") and chunk.text:
+                            if first_token_at is None:
+                                first_token_at = time.monotonic()
+                            texts.append(chunk.text)
+                            yield {"text": chunk.text}
+                finally:
+                    # 客户端断开时立即关闭上游流，不再继续生成
+                    aclose = getattr(stream, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
 
             # 流结束标记
             logger.info("Stream completed successfully")
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            chat_response_cache.put(chat_response_cache.make_key(request, model), texts)
+            # 写库放到后台，结束标记不等待用量记录
+            self._record_usage_in_background(
+                self._record_usage(
+                    model,
+                    usage,
+                    started_at,
+                    user_key,
+                    True,
+                    first_token_at,
+                    client_reused,
+                    finished_at=time.monotonic(),
+                )
+            )
+            usage_recorded = True
+            yield {"done": True}
+
+        except (asyncio.CancelledError, GeneratorExit):
+            # 客户端断开，接口层取消了本次流
+            logger.info("Chat stream cancelled by client disconnect")
+            if not usage_recorded:
+                await self._record_usage(
+                    model,
+                    usage,
+                    started_at,
+                    user_key,
+                    False,
+                    first_token_at,
+                    client_reused,
+                )
+            raise
 
         except Exception as e:
             error_str = str(e)
             logger.error(f"Error in SDK streaming: {error_str}")
+            await self._record_usage(
+                model, usage, started_at, user_key, False, first_token_at, client_reused
+            )
 
             # 检查是否是速率限制错误
             if (
@@ -167,13 +384,13 @@ class ChatService:
                 or "rate limit" in error_str.lower()
                 or "quota" in error_str.lower()
             ):
-                yield f"data: {json.dumps({'error': 'API 速率限制，请稍后再试', 'code': 'RATE_LIMIT'})}\n\n"
+                yield {"error": "API 速率限制，请稍后再试", "code": "RATE_LIMIT"}
             elif "403" in error_str or "forbidden" in error_str.lower():
-                yield f"data: {json.dumps({'error': 'API 密钥无效或权限不足', 'code': 'AUTH_ERROR'})}\n\n"
+                yield {"error": "API 密钥无效或权限不足", "code": "AUTH_ERROR"}
             elif "400" in error_str or "bad request" in error_str.lower():
-                yield f"data: {json.dumps({'error': '请求格式错误', 'code': 'BAD_REQUEST'})}\n\n"
+                yield {"error": "请求格式错误", "code": "BAD_REQUEST"}
             else:
-                yield f"data: {json.dumps({'error': f'服务器错误: {error_str}', 'code': 'SERVER_ERROR'})}\n\n"
+                yield {"error": f"服务器错误: {error_str}", "code": "SERVER_ERROR"}
 
 
 # 全局实例
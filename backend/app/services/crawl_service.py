@@ -1,17 +1,21 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone, timedelta
 
-from sqlalchemy import select, exists, func
+from sqlalchemy import select, exists, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import AsyncSessionLocal
 from ..core.config import get_settings
+from ..core.events import ITEMS_CREATED, event_bus
 from ..core.logging import get_logger
 from ..models.source import Source
 from ..models.item import Item
-from ..models.summary import Summary, SummaryStatus
+from ..models.summary import Summary, SummaryMode, SummaryStatus
 from ..crawlers.base import BaseCrawler, CrawledItem
 from ..crawlers.hackernews import HackerNewsCrawler
+from .dedup import DUPLICATE_SKIP_REASON, duplicate_index
+from .summary_filter import summary_filter
+from .summary_priority import priority_for_item
 
 logger = get_logger(__name__)
 
@@ -88,13 +92,14 @@ class CrawlService:
             return []
 
     async def crawl_all_sources(
-        self, limit_per_source: int = 30
+        self, limit_per_source: int = 30, progress: Optional[Dict[str, int]] = None
     ) -> Dict[str, List[Item]]:
         """
         爬取所有启用的数据源
 
         Args:
             limit_per_source: 每个数据源的抓取条目数量限制
+            progress: 可选的进度计数，每爬完一个数据源更新一次
 
         Returns:
             各数据源新创建的条目字典
@@ -104,14 +109,21 @@ class CrawlService:
 
         # 获取启用的数据源
         enabled_sources = await self._get_enabled_sources()
+        if progress is not None:
+            progress.update(sources_total=len(enabled_sources), sources_done=0)
+            progress.setdefault("new_items", 0)
 
         results: Dict[str, List[Item]] = {}
         for source_id in enabled_sources:
             if source_id in self.crawlers:
                 new_items = await self.crawl_single_source(source_id, limit_per_source)
                 results[source_id] = new_items
+                if progress is not None:
+                    progress["new_items"] += len(new_items)
             else:
                 logger.warning(f"No crawler available for enabled source: {source_id}")
+            if progress is not None:
+                progress["sources_done"] += 1
 
         return results
 
@@ -137,23 +149,26 @@ class CrawlService:
 
         async with AsyncSessionLocal() as db:
             new_items: list[Item] = []
+            refreshed_items: list[Item] = []
 
             for crawled_item in crawled_items:
                 try:
                     # 检查条目是否已存在（基于 source_id + external_id）
-                    stmt = select(
-                        exists().where(
-                            (Item.source_id == crawled_item.source_id)
-                            & (Item.external_id == crawled_item.external_id)
-                        )
+                    stmt = select(Item).where(
+                        (Item.source_id == crawled_item.source_id)
+                        & (Item.external_id == crawled_item.external_id)
                     )
                     result = await db.execute(stmt)
-                    item_exists = result.scalar()
-
-                    if item_exists:
-                        logger.debug(
-                            f"Item {crawled_item.external_id} already exists, skipping"
-                        )
+                    existing = result.scalar_one_or_none()
+
+                    if existing is not None:
+                        # 已存在的文章只更新分数和评论数
+                        if self._refresh_engagement(existing, crawled_item):
+                            refreshed_items.append(existing)
+                        else:
+                            logger.debug(
+                                f"Item {crawled_item.external_id} already exists, skipping"
+                            )
                         continue
 
                     # 创建新的条目
@@ -177,6 +192,9 @@ class CrawlService:
                     logger.error(f"Error saving item {crawled_item.external_id}: {e}")
                     continue
 
+            # 热度变化后，尚未生成摘要的任务按新的分数重新排序
+            await self._refresh_summary_priority(db, refreshed_items)
+
             # 提交所有更改
             await db.commit()
 
@@ -184,11 +202,56 @@ class CrawlService:
             for item in new_items:
                 await db.refresh(item)
 
-            # 为新文章创建摘要任务
-            await self._create_summary_tasks(db, new_items)
-
-            logger.info(f"Successfully saved {len(new_items)} new items to database")
-            return new_items
+            # 近似重复聚类，同簇文章共享一份摘要
+            if new_items:
+                try:
+                    duplicates = await duplicate_index.assign_clusters(db, new_items)
+                    await db.commit()
+                    if duplicates:
+                        logger.info(f"Found {duplicates} near-duplicate items")
+                except Exception as e:
+                    logger.error(f"Error assigning duplicate clusters: {e}")
+                    await db.rollback()
+
+        # 为新文章创建摘要任务（过滤规则可能发送 HEAD 请求，不在入库会话中进行）
+        await self._create_summary_tasks(new_items)
+
+        # 通知摘要生成器立即处理新文章，不必等到下一次定时任务
+        if new_items:
+            event_bus.publish(ITEMS_CREATED, [item.id for item in new_items])
+
+        logger.info(f"Successfully saved {len(new_items)} new items to database")
+        return new_items
+
+    def _refresh_engagement(self, item: Item, crawled_item: CrawledItem) -> bool:
+        """用本次爬取的分数和评论数更新已存在的文章，有变化时返回 True"""
+        changed = False
+        if crawled_item.score is not None and crawled_item.score != item.score:
+            item.score = crawled_item.score
+            changed = True
+        if (
+            crawled_item.comments_count is not None
+            and crawled_item.comments_count != item.comments_count
+        ):
+            item.comments_count = crawled_item.comments_count
+            changed = True
+        return changed
+
+    async def _refresh_summary_priority(
+        self, db: AsyncSession, items: List[Item]
+    ) -> None:
+        """重新计算待处理摘要任务的优先级（已完成或进行中的任务不受影响）"""
+        for item in items:
+            await db.execute(
+                update(Summary)
+                .where(Summary.item_id == item.id)
+                .where(
+                    Summary.status.in_([SummaryStatus.PENDING, SummaryStatus.FAILED])
+                )
+                .values(priority=priority_for_item(item))
+            )
+        if items:
+            logger.info(f"Refreshed engagement and priority for {len(items)} items")
 
     async def get_recent_items(
         self, source_id: Optional[str] = None, limit: int = 50
@@ -247,41 +310,105 @@ class CrawlService:
 
             return stats
 
-    async def _create_summary_tasks(self, db: AsyncSession, items: List[Item]) -> None:
-        """为新文章创建摘要任务"""
+    async def _create_summary_tasks(self, items: List[Item]) -> None:
+        """
+        为新文章创建摘要任务
+
+        先用短会话查出已有摘要的文章，关闭会话后再按过滤规则分类（可能发送 HEAD
+        请求），最后用新的短会话写入摘要任务，网络请求期间不占用数据库连接。
+        """
         if not items:
             return
 
         try:
-            summary_tasks: list[Summary] = []
-            for item in items:
-                # 检查是否已存在摘要
-                existing = await db.execute(
-                    select(Summary).where(Summary.item_id == item.id)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Summary.item_id).where(
+                        Summary.item_id.in_([item.id for item in items])
+                    )
                 )
-                if existing.first():
-                    continue
+                existing = set(result.scalars())
+            new_items = [item for item in items if item.id not in existing]
+            if not new_items:
+                return
+
+            # 按过滤规则决定跳过、只翻译标题还是完整摘要
+            decisions = await summary_filter.classify_many(
+                [(item.title, item.url) for item in new_items]
+            )
 
-                # 创建摘要任务
-                summary = Summary(
-                    item_id=item.id,
-                    model=self.settings.gemini_model,
-                    lang="zh-CN",
-                    status=SummaryStatus.PENDING,
-                    created_at=func.now(),
-                    retry_count=0,
-                    max_retries=self.settings.ai_summary_max_retries,
-                )
-                summary_tasks.append(summary)
+            async with AsyncSessionLocal() as db:
+                summary_tasks: list[Summary] = []
+                created: dict[int, Summary] = {}  # 本批创建的摘要，文章ID -> 摘要
+                for item, decision in zip(new_items, decisions, strict=True):
+                    # 创建摘要任务
+                    summary = Summary(
+                        item_id=item.id,
+                        model=self.settings.gemini_model,
+                        lang="zh-CN",
+                        created_at=func.now(),
+                        retry_count=0,
+                        max_retries=self.settings.ai_summary_max_retries,
+                        priority=priority_for_item(item),
+                        **decision.summary_fields(),
+                    )
+                    await self._share_cluster_summary(db, item, summary, created)
+                    created[item.id] = summary
+                    summary_tasks.append(summary)
 
-            if summary_tasks:
                 db.add_all(summary_tasks)
                 await db.commit()
-                logger.info(f"Created {len(summary_tasks)} summary tasks for new items")
+            skipped = sum(
+                1 for task in summary_tasks if task.status == SummaryStatus.SKIPPED
+            )
+            shared = sum(
+                1 for task in summary_tasks if task.skip_reason == DUPLICATE_SKIP_REASON
+            )
+            logger.info(
+                f"Created {len(summary_tasks)} summary tasks for new items "
+                f"({skipped} skipped by filter rules, {shared} shared with "
+                f"duplicate clusters)"
+            )
 
         except Exception as e:
+            # 会话退出时自动回滚未提交的更改
             logger.error(f"Error creating summary tasks: {e}")
-            await db.rollback()
+
+    async def _share_cluster_summary(
+        self,
+        db: AsyncSession,
+        item: Item,
+        summary: Summary,
+        created: dict[int, Summary],
+    ) -> None:
+        """重复文章不单独生成摘要正文，等待或直接复用簇代表文章的正文，只翻译标题"""
+        if item.cluster_id is None or item.cluster_id == item.id:
+            return
+        if summary.status == SummaryStatus.SKIPPED:
+            return
+
+        representative = created.get(item.cluster_id)
+        if representative is None:
+            result = await db.execute(
+                select(Summary).where(Summary.item_id == item.cluster_id)
+            )
+            representative = result.scalars().first()
+        if representative is None or representative.status in (
+            SummaryStatus.SKIPPED,
+            SummaryStatus.PERMANENTLY_FAILED,
+        ):
+            return
+
+        summary.skip_reason = DUPLICATE_SKIP_REASON
+        summary.mode = representative.mode
+        if representative.status == SummaryStatus.COMPLETED:
+            # 标题与代表文章不同，由只翻译标题的任务单独翻译
+            summary.status = SummaryStatus.PENDING
+            summary.mode = SummaryMode.TITLE_ONLY.value
+            summary.content = representative.content
+        else:
+            # 代表文章的摘要完成时一并写入
+            summary.status = SummaryStatus.SKIPPED
 
 
 # 全局爬虫服务实例
@@ -0,0 +1,281 @@
+"""
+近似重复文章聚类
+
+同一条新闻经常以标题、链接略有不同的多篇 HN 帖子出现。对规范化后的标题和 URL 路径
+计算 MinHash 签名，用 LSH 分桶快速找到候选，估算 Jaccard 相似度超过阈值即归入同一簇。
+簇 ID 为簇中第一篇文章的 ID，同簇文章共享代表文章的摘要正文，标题各自翻译。
+
+索引保存在各进程的内存中。多进程部署时其他进程也会写入文章，因此每次分配前都从数据库
+增量加载最近入库的文章，各进程看到的簇保持一致。
+"""
+
+import asyncio
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from itertools import pairwise
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
+from urllib.parse import urlsplit
+
+from sqlalchemy import ColumnElement, CursorResult, and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..models.item import Item
+from ..models.summary import Summary, SummaryMode, SummaryStatus
+from .summary_cache import hash_url
+
+logger = get_logger(__name__)
+
+NUM_PERM = 64  # MinHash 签名长度
+BANDS = 16  # LSH 分段数，每段 NUM_PERM // BANDS 行
+ROWS = NUM_PERM // BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 同簇摘要的 skip_reason
+DUPLICATE_SKIP_REASON = "duplicate"
+
+# 增量加载时与上次加载重叠的时间，覆盖提交较晚的事务和时钟偏差
+REFRESH_OVERLAP = timedelta(minutes=10)
+
+# 标题中与内容无关的前缀和常见词
+TITLE_PREFIX_PATTERN = re.compile(r"^(show|ask|tell|launch) hn\s*[:\-–]\s*")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]")
+STOPWORDS = {
+    "a",
+    "an",
+    "the",
+    "and",
+    "or",
+    "of",
+    "to",
+    "in",
+    "on",
+    "for",
+    "with",
+    "is",
+    "are",
+    "by",
+    "at",
+    "from",
+    "www",
+    "com",
+    "html",
+    "htm",
+    "index",
+}
+
+
+def _permutations() -> List[Tuple[int, int]]:
+    """固定种子生成的哈希置换参数 (a, b)，保证重启后签名一致"""
+    params: List[Tuple[int, int]] = []
+    for i in range(NUM_PERM):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+        params.append((a, b))
+    return params
+
+
+_PERMUTATIONS = _permutations()
+
+
+def shingles(title: str, url: str) -> Set[str]:
+    """规范化标题和 URL 路径，生成词及相邻词对组成的特征集合"""
+    title = TITLE_PREFIX_PATTERN.sub("", title.lower().strip())
+    title_tokens = [t for t in TOKEN_PATTERN.findall(title) if t not in STOPWORDS]
+
+    parts = urlsplit(url.lower())
+    host = (parts.hostname or "").removeprefix("www.")
+    path_tokens = [t for t in TOKEN_PATTERN.findall(parts.path) if t not in STOPWORDS]
+
+    features = set(title_tokens)
+    features.update(f"{a} {b}" for a, b in pairwise(title_tokens))
+    features.update(f"path:{t}" for t in path_tokens)
+    if host:
+        features.add(f"host:{host}")
+    return features
+
+
+def minhash(features: Set[str]) -> Tuple[int, ...]:
+    """计算特征集合的 MinHash 签名"""
+    if not features:
+        return tuple([_MAX_HASH] * NUM_PERM)
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode(), digest_size=4).digest(), "big")
+        for f in features
+    ]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """用签名中相同位置相等的比例估算 Jaccard 相似度"""
+    return sum(1 for x, y in zip(sig_a, sig_b, strict=True) if x == y) / NUM_PERM
+
+
+class DuplicateIndex:
+    """MinHash/LSH 近似重复索引"""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self._signatures: Dict[int, Tuple[int, ...]] = {}
+        self._clusters: Dict[int, int] = {}  # 文章ID -> 簇ID
+        self._url_hashes: Dict[str, int] = {}  # 规范化 URL 哈希 -> 簇ID
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [
+            {} for _ in range(BANDS)
+        ]
+        self._refreshed_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self, session: AsyncSession, exclude: Set[int]) -> None:
+        """
+        从数据库加载索引中还没有的文章（不含本次待分配的文章）
+
+        首次加载去重窗口内的全部文章，之后只加载上次加载以来入库的文章，包括其他进程
+        写入的文章；已在索引中的文章同步其他进程分配的簇ID。
+        """
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(days=self.settings.dedup_window_days)
+        if self._refreshed_at is not None:
+            since = max(since, self._refreshed_at - REFRESH_OVERLAP)
+        stmt = (
+            select(Item.id, Item.title, Item.url, Item.cluster_id)
+            .where(Item.fetched_at >= since)
+            .order_by(Item.id)
+        )
+        added = 0
+        for row in (await session.execute(stmt)).all():
+            if row.id in exclude:
+                continue
+            if row.id in self._signatures:
+                if row.cluster_id is not None:
+                    self._clusters[row.id] = row.cluster_id
+                continue
+            self._add(row.id, row.title, row.url, row.cluster_id or row.id)
+            added += 1
+        if self._refreshed_at is None:
+            logger.info(f"Duplicate index loaded with {added} recent items")
+        elif added:
+            logger.info(f"Duplicate index refreshed with {added} new items")
+        self._refreshed_at = now
+
+    def _add(self, item_id: int, title: str, url: str, cluster_id: int) -> None:
+        signature = minhash(shingles(title, url))
+        self._signatures[item_id] = signature
+        self._clusters[item_id] = cluster_id
+        self._url_hashes.setdefault(hash_url(url), cluster_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(item_id)
+
+    @staticmethod
+    def _band_keys(signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        return [signature[i * ROWS : (i + 1) * ROWS] for i in range(BANDS)]
+
+    def _find_cluster(self, title: str, url: str) -> Optional[int]:
+        """查找最相似的已有文章所在的簇"""
+        url_match = self._url_hashes.get(hash_url(url))
+        if url_match is not None:
+            return url_match
+
+        signature = minhash(shingles(title, url))
+        candidates: Set[int] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, []))
+
+        best_id, best_score = None, 0.0
+        for candidate in candidates:
+            score = estimate_similarity(signature, self._signatures[candidate])
+            if score > best_score:
+                best_id, best_score = candidate, score
+
+        if best_id is not None and best_score >= self.settings.dedup_threshold:
+            return self._clusters[best_id]
+        return None
+
+    async def assign_clusters(self, session: AsyncSession, items: List[Item]) -> int:
+        """
+        为新入库的文章分配簇ID并写入数据库（由调用方提交事务）
+
+        Returns:
+            归入已有簇的文章数
+        """
+        if not self.settings.dedup_enabled or not items:
+            return 0
+
+        duplicates = 0
+        async with self._lock:
+            await self._refresh(session, {item.id for item in items})
+            for item in items:
+                cluster_id = self._find_cluster(item.title, item.url)
+                if cluster_id is None:
+                    cluster_id = item.id
+                else:
+                    duplicates += 1
+                    logger.info(f"Item {item.id} is a near-duplicate of {cluster_id}")
+                self._add(item.id, item.title, item.url, cluster_id)
+                item.cluster_id = cluster_id
+        return duplicates
+
+
+async def propagate_to_duplicates(
+    session: AsyncSession, representative_item_id: int, content: Optional[str]
+) -> None:
+    """
+    将代表文章的摘要正文复制给同簇的重复文章（由调用方提交事务）
+
+    标题不共享：重复文章的标题与代表文章不同，复制正文后改为只翻译标题的任务，
+    由摘要生成任务翻译各自的标题。
+    """
+    await session.execute(
+        update(Summary)
+        .where(_parked_duplicates(representative_item_id))
+        .values(
+            status=SummaryStatus.PENDING,
+            mode=SummaryMode.TITLE_ONLY.value,
+            content=content,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def release_duplicates(
+    session: AsyncSession, representative_item_id: int
+) -> None:
+    """代表文章永久失败时，等待共享的重复文章改为各自生成摘要（由调用方提交事务）"""
+    result = cast(
+        CursorResult[Any],
+        await session.execute(
+            update(Summary)
+            .where(_parked_duplicates(representative_item_id))
+            .values(status=SummaryStatus.PENDING, skip_reason=None)
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    if result.rowcount:
+        logger.info(
+            f"Representative item {representative_item_id} failed permanently, "
+            f"released {result.rowcount} duplicate summaries"
+        )
+
+
+def _parked_duplicates(representative_item_id: int) -> ColumnElement[bool]:
+    """等待代表文章摘要的重复文章摘要"""
+    duplicate_ids = select(Item.id).where(
+        Item.cluster_id == representative_item_id,
+        Item.id != representative_item_id,
+    )
+    return and_(
+        Summary.item_id.in_(duplicate_ids),
+        Summary.status == SummaryStatus.SKIPPED,
+        Summary.skip_reason == DUPLICATE_SKIP_REASON,
+    )
+
+
+# 全局近似重复索引实例
+duplicate_index = DuplicateIndex()
@@ -0,0 +1,168 @@
+"""
+Gemini 客户端池
+
+聊天接口按 API key 复用 genai.Client，避免每条消息都重新创建客户端和建立连接。
+以 API key 的哈希为键（不在内存中以明文作为键保存），容量有限，按最近最少使用淘汰，
+空闲超过 TTL 的客户端在下次取用时清理。被淘汰但仍在使用中的客户端等使用结束后再关闭。
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from google import genai
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def hash_api_key(api_key: str) -> str:
+    """API key 的 SHA-256 哈希"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _PooledClient:
+    client: genai.Client
+    last_used: float
+    active: int = 0  # 正在使用该客户端的请求数
+    evicted: bool = False
+
+
+class GenaiClientPool:
+    """按 API key 缓存的 genai 客户端池（LRU + 空闲 TTL）"""
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        client_factory: Optional[Callable[[str], genai.Client]] = None,
+    ) -> None:
+        settings = get_settings()
+        self.max_size = max(1, max_size or settings.chat_client_pool_size)
+        self.idle_ttl_seconds = (
+            idle_ttl_seconds
+            if idle_ttl_seconds is not None
+            else settings.chat_client_idle_ttl_seconds
+        )
+        self._client_factory = client_factory or (
+            lambda api_key: genai.Client(api_key=api_key)
+        )
+        self._clients: OrderedDict[str, _PooledClient] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @asynccontextmanager
+    async def client(self, api_key: str) -> AsyncIterator[genai.Client]:
+        """
+        取用 API key 对应的客户端
+
+        Yields:
+            可复用的 genai 客户端（使用结束后归还，不要自行关闭）
+        """
+        entry = await self._acquire(api_key)
+        try:
+            yield entry.client
+        finally:
+            await self._release(entry)
+
+    def is_cached(self, api_key: str) -> bool:
+        """客户端是否已在池中（用于区分冷启动和复用的请求）"""
+        return hash_api_key(api_key) in self._clients
+
+    async def _acquire(self, api_key: str) -> _PooledClient:
+        key = hash_api_key(api_key)
+        to_close: list[_PooledClient] = []
+        async with self._lock:
+            now = time.monotonic()
+            to_close.extend(self._evict_idle(now))
+
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._clients.move_to_end(key)
+            else:
+                self.misses += 1
+                entry = _PooledClient(self._client_factory(api_key), now)
+                self._clients[key] = entry
+                while len(self._clients) > self.max_size:
+                    _, oldest = self._clients.popitem(last=False)
+                    to_close.extend(self._evict(oldest))
+
+            entry.active += 1
+            entry.last_used = now
+
+        for evicted in to_close:
+            await self._close(evicted)
+        return entry
+
+    async def _release(self, entry: _PooledClient) -> None:
+        async with self._lock:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+            should_close = entry.evicted and entry.active == 0
+        if should_close:
+            await self._close(entry)
+
+    def _evict_idle(self, now: float) -> list[_PooledClient]:
+        """移除空闲超时的客户端，返回可以立即关闭的客户端"""
+        expired = [
+            key
+            for key, entry in self._clients.items()
+            if entry.active == 0 and now - entry.last_used > self.idle_ttl_seconds
+        ]
+        to_close: list[_PooledClient] = []
+        for key in expired:
+            to_close.extend(self._evict(self._clients.pop(key)))
+        return to_close
+
+    def _evict(self, entry: _PooledClient) -> list[_PooledClient]:
+        self.evictions += 1
+        entry.evicted = True
+        return [entry] if entry.active == 0 else []
+
+    async def _close(self, entry: _PooledClient) -> None:
+        # 旧版本 SDK 没有 aclose
+        aclose = getattr(entry.client.aio, "aclose", None)
+        if aclose is None:
+            return
+        try:
+            await aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close genai client: {e}")
+
+    async def close_all(self) -> None:
+        """关闭所有客户端，使用中的归还后关闭（应用关闭时调用）"""
+        async with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+            to_close = [e for entry in entries for e in self._evict(entry)]
+        for entry in to_close:
+            await self._close(entry)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态（用于状态接口）"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._clients),
+            "max_size": self.max_size,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "in_use": sum(entry.active for entry in self._clients.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 全局聊天客户端池实例
+chat_client_pool = GenaiClientPool()
@@ -0,0 +1,239 @@
+"""
+基于数据库的领导者选举
+
+多进程部署（如 uvicorn --workers N）时只让一个进程运行定时爬取和摘要任务：
+
+- PostgreSQL：在专用连接上持有会话级 advisory lock。进程退出或连接断开时锁自动释放，
+  其他进程下一轮即可接管；
+- SQLite：leader_leases 表中的租约行。领导者每 lease/3 秒续约一次，续约失败立即让位；
+  租约过期后其他进程才能抢占，因此不会同时存在两个领导者。
+"""
+
+import asyncio
+import hashlib
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, cast
+
+from sqlalchemy import CursorResult, case, delete, func, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..core.config import get_settings
+from ..core.database import AsyncSessionLocal, engine
+from ..core.logging import get_logger
+from ..models.leader_lease import LeaderLease
+
+logger = get_logger(__name__)
+
+Callback = Callable[[], Awaitable[None]]
+
+
+def advisory_lock_key(name: str) -> int:
+    """角色名对应的 64 位 advisory lock 键"""
+    digest = hashlib.sha256(f"leader:{name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class LeaderElector:
+    """领导者选举（后台任务周期性地获取 / 续约领导权）"""
+
+    def __init__(self, name: str) -> None:
+        self.settings = get_settings()
+        self.name = name
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = self.settings.leader_lease_seconds
+        self.renew_interval = self.lease_seconds / 3
+        self.is_leader = False
+        self.elected_at: Optional[datetime] = None
+        self.transitions = 0
+
+        self._task: Optional[asyncio.Task[None]] = None
+        self._pg_conn: Optional[AsyncConnection] = None
+        self._on_elected: Optional[Callback] = None
+        self._on_demoted: Optional[Callback] = None
+
+    @property
+    def backend(self) -> str:
+        if not self.settings.leader_election_enabled:
+            return "disabled"
+        if engine.dialect.name == "postgresql":
+            return "advisory_lock"
+        return "lease"
+
+    async def start(self, on_elected: Callback, on_demoted: Callback) -> None:
+        """开始参与选举，成为领导者时调用 on_elected，失去领导权时调用 on_demoted"""
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        if self.backend == "disabled":
+            # 未启用选举时本进程始终是领导者（单进程部署）
+            await self._set_leader(True)
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止选举并主动释放领导权，其他进程无需等待租约过期"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            await self._set_leader(False)
+        try:
+            await self._release()
+        except Exception as e:
+            logger.warning(f"Failed to release leadership: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                held = await self._try_acquire()
+            except Exception as e:
+                logger.warning(f"Leader election for {self.name} failed: {e}")
+                held = False
+            if held != self.is_leader:
+                await self._set_leader(held)
+            await asyncio.sleep(self.renew_interval)
+
+    async def _set_leader(self, leader: bool) -> None:
+        self.is_leader = leader
+        self.elected_at = datetime.now(timezone.utc) if leader else None
+        self.transitions += 1
+        callback = self._on_elected if leader else self._on_demoted
+        logger.info(
+            f"{self.holder_id} {'became' if leader else 'is no longer'} "
+            f"the {self.name} leader ({self.backend})"
+        )
+        if callback is None:
+            return
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Leader callback for {self.name} failed: {e}")
+
+    async def _try_acquire(self) -> bool:
+        if self.backend == "advisory_lock":
+            return await self._acquire_advisory_lock()
+        return await self._acquire_lease()
+
+    async def _acquire_advisory_lock(self) -> bool:
+        """在专用连接上获取 / 确认 advisory lock"""
+        if self._pg_conn is not None:
+            try:
+                await self._pg_conn.execute(text("SELECT 1"))
+                await self._pg_conn.commit()
+                return True
+            except Exception:
+                # 连接已断开，锁随之释放，重新参与竞争
+                await self._close_pg_conn()
+                raise
+
+        conn = await engine.connect()
+        try:
+            acquired = await conn.scalar(
+                select(func.pg_try_advisory_lock(advisory_lock_key(self.name)))
+            )
+            # 会话级锁在事务提交后仍然保留，避免连接一直处于事务中
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._pg_conn = conn
+        return True
+
+    async def _close_pg_conn(self) -> None:
+        conn, self._pg_conn = self._pg_conn, None
+        if conn is None:
+            return
+        try:
+            await conn.invalidate()
+        except Exception:
+            pass
+
+    async def _acquire_lease(self) -> bool:
+        """获取或续约租约行"""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                update(LeaderLease)
+                .where(
+                    LeaderLease.name == self.name,
+                    or_(
+                        LeaderLease.holder_id == self.holder_id,
+                        LeaderLease.expires_at < now,
+                    ),
+                )
+                .values(
+                    holder_id=self.holder_id,
+                    expires_at=expires_at,
+                    acquired_at=case(
+                        (
+                            LeaderLease.holder_id == self.holder_id,
+                            LeaderLease.acquired_at,
+                        ),
+                        else_=now,
+                    ),
+                )
+            )
+            result = cast(CursorResult[Any], await session.execute(stmt))
+            if result.rowcount:
+                await session.commit()
+                return True
+
+            # 租约行不存在时插入，主键冲突说明其他进程抢先一步
+            exists = await session.scalar(
+                select(LeaderLease.name).where(LeaderLease.name == self.name)
+            )
+            if exists is not None:
+                return False
+            session.add(
+                LeaderLease(
+                    name=self.name,
+                    holder_id=self.holder_id,
+                    expires_at=expires_at,
+                    acquired_at=now,
+                )
+            )
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                return False
+            return True
+
+    async def _release(self) -> None:
+        if self.backend == "advisory_lock":
+            # 关闭连接即释放会话级锁
+            await self._close_pg_conn()
+        elif self.backend == "lease":
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    delete(LeaderLease).where(
+                        LeaderLease.name == self.name,
+                        LeaderLease.holder_id == self.holder_id,
+                    )
+                )
+                await session.commit()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态（用于状态接口）"""
+        return {
+            "name": self.name,
+            "backend": self.backend,
+            "holder_id": self.holder_id,
+            "is_leader": self.is_leader,
+            "elected_at": self.elected_at.isoformat() if self.elected_at else None,
+            "lease_seconds": self.lease_seconds,
+            "transitions": self.transitions,
+        }
+
+
+# 全局调度器选主实例
+scheduler_leader = LeaderElector("scheduler")
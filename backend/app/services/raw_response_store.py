@@ -0,0 +1,119 @@
+"""
+Gemini 原始响应存储
+
+原始响应元数据只用于排查问题，不随摘要一起查询。压缩后写入 summary_raw_responses 表，
+列表和详情查询不再读取这部分数据。
+"""
+
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.summary_raw_response import SummaryRawResponse
+
+COMPRESSION_LEVEL = 6
+
+
+def compress_response(data: Dict[str, Any]) -> tuple[bytes, int]:
+    """
+    压缩响应字典
+
+    Returns:
+        (压缩后的数据, 压缩前的字节数)
+    """
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(raw, COMPRESSION_LEVEL), len(raw)
+
+
+def decompress_response(blob: bytes) -> Dict[str, Any]:
+    """解压响应字典"""
+    data: Dict[str, Any] = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return data
+
+
+class RawResponseStore:
+    """压缩存储的原始响应"""
+
+    async def save_many(
+        self, session: AsyncSession, responses: Dict[int, Optional[Dict[str, Any]]]
+    ) -> None:
+        """写入或覆盖多条摘要的原始响应，值为 None 的跳过（由调用方提交事务）"""
+        now = datetime.now(timezone.utc)
+        rows = []
+        for summary_id, data in responses.items():
+            if data is None:
+                continue
+            blob, raw_size = compress_response(data)
+            rows.append(
+                {
+                    "summary_id": summary_id,
+                    "data": blob,
+                    "raw_size": raw_size,
+                    "updated_at": now,
+                }
+            )
+        if not rows:
+            return
+
+        insert = (
+            pg_insert
+            if session.get_bind().dialect.name == "postgresql"
+            else sqlite_insert
+        )
+        stmt = insert(SummaryRawResponse).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["summary_id"],
+            set_={
+                "data": stmt.excluded.data,
+                "raw_size": stmt.excluded.raw_size,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await session.execute(stmt)
+
+    async def save(
+        self,
+        session: AsyncSession,
+        summary_id: int,
+        data: Optional[Dict[str, Any]],
+    ) -> None:
+        """写入或覆盖单条摘要的原始响应（由调用方提交事务）"""
+        await self.save_many(session, {summary_id: data})
+
+    async def load(
+        self, session: AsyncSession, summary_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """读取并解压原始响应"""
+        blob = await session.scalar(
+            select(SummaryRawResponse.data).where(
+                SummaryRawResponse.summary_id == summary_id
+            )
+        )
+        return decompress_response(blob) if blob is not None else None
+
+    async def get_stats(self, session: AsyncSession) -> Dict[str, Any]:
+        """获取存储统计"""
+        result = await session.execute(
+            select(
+                func.count(SummaryRawResponse.summary_id),
+                func.coalesce(func.sum(SummaryRawResponse.raw_size), 0),
+                func.coalesce(func.sum(func.length(SummaryRawResponse.data)), 0),
+            )
+        )
+        entries, raw_bytes, stored_bytes = result.one()
+        return {
+            "entries": entries,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "ratio": round(stored_bytes / raw_bytes, 4) if raw_bytes else None,
+        }
+
+
+# 全局原始响应存储实例
+raw_response_store = RawResponseStore()
@@ -0,0 +1,70 @@
+"""
+摘要失败重试策略
+
+按错误类型做指数退避：网络抖动很快重试，限流等配额恢复，
+无法访问的页面间隔数小时且提前放弃，避免反复消耗每日配额。
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import ColumnElement, or_
+
+from ..models.summary import Summary, SummaryStatus
+
+# 各错误类型的退避参数: (首次重试延迟分钟, 最大延迟分钟)
+RETRY_BACKOFF_MINUTES = {
+    "NETWORK_ERROR": (5, 120),
+    "RATE_LIMIT_ERROR": (30, 360),
+    "API_ERROR": (15, 240),
+    "AUTH_ERROR": (60, 720),
+    "CONTENT_ERROR": (360, 1440),
+    "BATCH_ERROR": (15, 240),
+    "UNKNOWN_ERROR": (15, 240),
+}
+
+# 这些错误重试也很难恢复，失败次数达到该值即标记为永久失败
+EARLY_GIVE_UP_RETRIES = {
+    "CONTENT_ERROR": 2,
+}
+
+
+def retry_delay(error_type: str, retry_count: int) -> timedelta:
+    """第 retry_count 次失败后的重试延迟（每次翻倍，不超过上限）"""
+    base, cap = RETRY_BACKOFF_MINUTES.get(
+        error_type, RETRY_BACKOFF_MINUTES["UNKNOWN_ERROR"]
+    )
+    minutes = min(cap, base * 2 ** max(0, retry_count - 1))
+    return timedelta(minutes=minutes)
+
+
+def schedule_retry(
+    error_type: str,
+    retry_count: int,
+    max_retries: int,
+    now: Optional[datetime] = None,
+) -> Tuple[SummaryStatus, Optional[datetime]]:
+    """
+    根据错误类型决定失败后的状态和下次重试时间
+
+    Args:
+        error_type: 错误分类
+        retry_count: 本次失败后的重试次数
+        max_retries: 最大重试次数
+        now: 当前时间
+
+    Returns:
+        (新状态, 下次重试时间)，永久失败时下次重试时间为 None
+    """
+    limit = min(max_retries, EARLY_GIVE_UP_RETRIES.get(error_type, max_retries))
+    if retry_count >= limit:
+        return SummaryStatus.PERMANENTLY_FAILED, None
+
+    now = now or datetime.now(timezone.utc)
+    return SummaryStatus.FAILED, now + retry_delay(error_type, retry_count)
+
+
+def retry_due(now: Optional[datetime] = None) -> ColumnElement[bool]:
+    """待处理查询条件：未设置重试时间或已到重试时间"""
+    now = now or datetime.now(timezone.utc)
+    return or_(Summary.next_retry_at.is_(None), Summary.next_retry_at <= now)
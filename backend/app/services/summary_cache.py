@@ -0,0 +1,193 @@
+"""
+摘要内容缓存
+
+同一篇文章经常以不同的 external_id 出现（重复提交、多个数据源），
+按规范化 URL 哈希 + 模型 + 语言缓存已生成的摘要，命中时直接复用，节省 Gemini 配额。
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.logging import get_logger
+from ..models.summary import Summary, SummaryMode, SummaryStatus
+from ..models.summary_cache import SummaryCacheEntry
+
+logger = get_logger(__name__)
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "ref_src",
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化 URL：忽略协议、www 前缀、默认端口、片段、跟踪参数和末尾斜杠，
+    并对查询参数排序
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    while "//" in path:
+        path = path.replace("//", "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query_pairs = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ]
+    query = urlencode(sorted(query_pairs))
+
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+def hash_url(url: str) -> str:
+    """规范化 URL 的 SHA-256 哈希"""
+    return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """基于数据库的摘要缓存（带命中统计）"""
+
+    def __init__(self) -> None:
+        # 进程内统计（自启动以来）
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    async def lookup(
+        self, session: AsyncSession, url: str, model: str, lang: str
+    ) -> Optional[SummaryCacheEntry]:
+        """查找缓存，命中时更新命中计数（由调用方提交事务）"""
+        stmt = select(SummaryCacheEntry).where(
+            SummaryCacheEntry.url_hash == hash_url(url),
+            SummaryCacheEntry.model == model,
+            SummaryCacheEntry.lang == lang,
+        )
+        entry = (await session.execute(stmt)).scalar_one_or_none()
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        await session.execute(
+            update(SummaryCacheEntry)
+            .where(SummaryCacheEntry.id == entry.id)
+            .values(
+                hit_count=SummaryCacheEntry.hit_count + 1,
+                last_hit_at=datetime.now(timezone.utc),
+            )
+        )
+        logger.info(f"Summary cache hit for {entry.canonical_url} ({model}, {lang})")
+        return entry
+
+    async def reuse_content(
+        self, session: AsyncSession, summary_id: int, url: str, model: str, lang: str
+    ) -> Optional[SummaryCacheEntry]:
+        """
+        命中缓存时把正文复制给摘要任务，并改为只翻译标题的待处理任务（由调用方提交事务）
+
+        标题不复用：命中的可能是另一篇标题不同的文章，与同簇重复文章的处理方式相同。
+        """
+        entry = await self.lookup(session, url, model, lang)
+        if entry is None:
+            return None
+
+        await session.execute(
+            update(Summary)
+            .where(Summary.id == summary_id)
+            .values(
+                status=SummaryStatus.PENDING,
+                mode=SummaryMode.TITLE_ONLY.value,
+                content=entry.content,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return entry
+
+    async def store(
+        self,
+        session: AsyncSession,
+        url: str,
+        model: str,
+        lang: str,
+        content: Optional[str],
+        translated_title: Optional[str],
+        source_summary_id: Optional[int] = None,
+    ) -> None:
+        """写入缓存（空摘要不缓存，已存在的键保持不变）"""
+        if not content or not content.strip():
+            return
+
+        # 并发写入同一个键时保留先写入的内容
+        insert = (
+            pg_insert
+            if session.get_bind().dialect.name == "postgresql"
+            else sqlite_insert
+        )
+        stmt = (
+            insert(SummaryCacheEntry)
+            .values(
+                url_hash=hash_url(url),
+                model=model,
+                lang=lang,
+                canonical_url=canonicalize_url(url),
+                content=content,
+                translated_title=translated_title,
+                source_summary_id=source_summary_id,
+                hit_count=0,
+            )
+            .on_conflict_do_nothing(index_elements=["url_hash", "model", "lang"])
+        )
+        await session.execute(stmt)
+        self.stores += 1
+
+    async def get_stats(self, session: AsyncSession) -> Dict[str, Any]:
+        """获取缓存统计"""
+        result = await session.execute(
+            select(
+                func.count(SummaryCacheEntry.id),
+                func.coalesce(func.sum(SummaryCacheEntry.hit_count), 0),
+            )
+        )
+        entries, total_hits = result.one()
+        lookups = self.hits + self.misses
+
+        return {
+            "entries": entries,
+            # 持久化的累计命中数，即累计节省的 Gemini 请求数
+            "total_hits": total_hits,
+            "process": {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            },
+        }
+
+
+# 全局摘要缓存实例
+summary_cache = SummaryCache()
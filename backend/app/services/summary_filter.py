@@ -0,0 +1,149 @@
+"""
+摘要前置过滤规则
+
+在创建摘要任务时对文章分类，避免把 Gemini 配额花在无法或无需摘要的内容上：
+- 标题已经是目标语言（中文）的文章直接跳过
+- PDF、视频、付费墙站点、没有外部链接的讨论帖等只翻译标题
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Pattern, Sequence
+from urllib.parse import urlsplit
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..models.summary import SummaryMode, SummaryStatus
+from .article_extractor import article_extractor
+
+logger = get_logger(__name__)
+
+HAN_PATTERN = re.compile(r"[\u4e00-\u9fff]")
+KANA_PATTERN = re.compile(r"[\u3040-\u30ff]")
+LETTER_PATTERN = re.compile(r"[^\W\d_]")
+
+# HEAD 请求返回这些类型时不是可摘要的网页
+NON_ARTICLE_CONTENT_TYPES = ("application/pdf", "video/", "audio/", "image/")
+
+
+class FilterAction(str, Enum):
+    """过滤结果"""
+
+    SUMMARIZE = "summarize"
+    TITLE_ONLY = "title_only"
+    SKIP = "skip"
+
+
+@dataclass
+class FilterDecision:
+    """单篇文章的过滤结果"""
+
+    action: FilterAction
+    reason: Optional[str] = None
+
+    def summary_fields(self) -> Dict[str, Any]:
+        """创建摘要任务时对应的 status / mode / skip_reason 字段"""
+        if self.action == FilterAction.SKIP:
+            status = SummaryStatus.SKIPPED
+        else:
+            status = SummaryStatus.PENDING
+        if self.action == FilterAction.TITLE_ONLY:
+            mode = SummaryMode.TITLE_ONLY
+        else:
+            mode = SummaryMode.FULL
+        return {"status": status, "mode": mode.value, "skip_reason": self.reason}
+
+
+def _split_list(raw: str) -> List[str]:
+    return [entry.strip() for entry in raw.split(",") if entry.strip()]
+
+
+def is_chinese_title(title: str) -> bool:
+    """标题是否已经是中文（汉字占字母类字符的多数且不含假名）"""
+    letters = LETTER_PATTERN.findall(title)
+    if not letters or KANA_PATTERN.search(title):
+        return False
+    return len(HAN_PATTERN.findall(title)) / len(letters) >= 0.5
+
+
+class SummaryFilter:
+    """摘要任务过滤规则引擎"""
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.title_only_patterns: List[Pattern[str]] = []
+        for pattern in _split_list(self.settings.summary_title_only_url_patterns):
+            try:
+                self.title_only_patterns.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as e:
+                logger.warning(f"Invalid title-only URL pattern {pattern!r}: {e}")
+        self.title_only_domains = {
+            domain.lower()
+            for domain in _split_list(self.settings.summary_title_only_domains)
+        }
+        self.skip_domains = {
+            domain.lower() for domain in _split_list(self.settings.summary_skip_domains)
+        }
+
+    @staticmethod
+    def _matches_domain(host: str, domains: set[str]) -> bool:
+        """域名或其子域名是否在列表中"""
+        return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+    async def classify(self, title: str, url: str) -> FilterDecision:
+        """
+        对文章分类
+
+        Args:
+            title: 文章标题
+            url: 文章链接
+
+        Returns:
+            过滤结果及原因
+        """
+        if not self.settings.summary_filter_enabled:
+            return FilterDecision(FilterAction.SUMMARIZE)
+
+        if self.settings.summary_skip_target_lang_titles and is_chinese_title(title):
+            return FilterDecision(FilterAction.SKIP, "title_in_target_lang")
+
+        host = (urlsplit(url).hostname or "").lower()
+        if self._matches_domain(host, self.skip_domains):
+            return FilterDecision(FilterAction.SKIP, f"domain:{host}")
+        if self._matches_domain(host, self.title_only_domains):
+            return FilterDecision(FilterAction.TITLE_ONLY, f"domain:{host}")
+
+        for pattern in self.title_only_patterns:
+            if pattern.search(url):
+                return FilterDecision(
+                    FilterAction.TITLE_ONLY, f"url_pattern:{pattern.pattern}"
+                )
+
+        if self.settings.summary_filter_head_check:
+            content_type = await article_extractor.head_content_type(url)
+            if content_type and content_type.startswith(NON_ARTICLE_CONTENT_TYPES):
+                return FilterDecision(
+                    FilterAction.TITLE_ONLY, f"content_type:{content_type}"
+                )
+
+        return FilterDecision(FilterAction.SUMMARIZE)
+
+    async def classify_many(
+        self, entries: Sequence[tuple[str, str]], concurrency: int = 10
+    ) -> List[FilterDecision]:
+        """批量分类 (title, url) 列表，HEAD 请求并发执行"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def classify_one(title: str, url: str) -> FilterDecision:
+            async with semaphore:
+                return await self.classify(title, url)
+
+        return list(
+            await asyncio.gather(*(classify_one(title, url) for title, url in entries))
+        )
+
+
+# 全局摘要过滤器实例
+summary_filter = SummaryFilter()
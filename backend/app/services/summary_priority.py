@@ -0,0 +1,88 @@
+"""
+摘要任务优先级
+
+参考 Reddit "hot" 排序，把热度（分数、评论数、数据源权重）和发布时间合成一个
+不随时间变化的分数：
+
+    priority = source_weight * log10(1 + score + comment_weight * comments)
+               + (created_at - EPOCH) / decay_seconds
+
+发布时间每晚 decay_seconds，需要热度高 10 倍才能排到同样的位置。
+分数只依赖文章本身，创建摘要任务时计算，配合 (status, priority) 索引排序；
+爬虫再次抓到已有文章时更新分数和评论数，并为尚未生成摘要的任务重新计算。
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Optional
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+if TYPE_CHECKING:
+    from ..models.item import Item
+
+logger = get_logger(__name__)
+
+# 时间项的基准时间点，保持分数在较小的数值范围内
+PRIORITY_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_source_weights(raw: str) -> Dict[str, float]:
+    """解析 "hackernews:1.0,reddit:0.8" 格式的数据源权重配置"""
+    weights: Dict[str, float] = {}
+    for entry in raw.split(","):
+        if not entry.strip():
+            continue
+        source_id, _, weight = entry.partition(":")
+        try:
+            weights[source_id.strip()] = float(weight)
+        except ValueError:
+            logger.warning(f"Invalid source weight entry: {entry!r}")
+    return weights
+
+
+def compute_priority(
+    source_id: str,
+    score: Optional[int],
+    comments_count: Optional[int],
+    created_at: Optional[datetime],
+) -> float:
+    """
+    计算摘要任务的优先级分数（越大越优先）
+
+    Args:
+        source_id: 数据源ID
+        score: 文章分数
+        comments_count: 评论数
+        created_at: 文章发布时间，缺失时按当前时间计算
+
+    Returns:
+        优先级分数
+    """
+    settings = get_settings()
+    weight = parse_source_weights(settings.summary_priority_source_weights).get(
+        source_id, 1.0
+    )
+
+    engagement = max(score or 0, 0) + settings.summary_priority_comment_weight * max(
+        comments_count or 0, 0
+    )
+
+    if created_at is None:
+        created_at = datetime.now(timezone.utc)
+    elif created_at.tzinfo is None:
+        # SQLite 读出的时间不带时区，按 UTC 处理
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age_term = (created_at - PRIORITY_EPOCH).total_seconds() / (
+        settings.summary_priority_decay_hours * 3600
+    )
+
+    return round(weight * math.log10(1 + engagement) + age_term, 6)
+
+
+def priority_for_item(item: "Item") -> float:
+    """计算文章对应摘要任务的优先级"""
+    return compute_priority(
+        item.source_id, item.score, item.comments_count, item.created_at
+    )
@@ -8,7 +8,7 @@ import asyncio
 import json
 import textwrap
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from enum import Enum
 from collections import deque
 
@@ -19,6 +19,7 @@ from pydantic import BaseModel, Field
 from ..core.config import get_settings
 from ..core.logging import get_logger
 from ..models.item import Item
+from .article_extractor import article_extractor
 
 logger = get_logger(__name__)
 
@@ -38,32 +39,180 @@ class URLRetrievalStatus(str, Enum):
     SUCCESS = "SUCCESS"
     FAILURE = "FAILURE"
     UNKNOWN = "UNKNOWN"
+    LOCAL_FETCH = "LOCAL_FETCH"  # 正文由本地抓取后放入提示词
+
+
+# url_context 工具单次请求最多支持 20 个 URL
+BATCH_MAX_URLS = 20
+# 批内同时抓取正文的页面数上限
+BATCH_FETCH_CONCURRENCY = 8
+
+
+def usage_tokens(usage: Any, share: int = 1) -> Dict[str, Optional[int]]:
+    """
+    提取 token 用量，写入 prompt_tokens / output_tokens / total_tokens 列
+
+    Args:
+        usage: SDK 的 usage_metadata 对象或批处理结果中的 usage 字典
+        share: 一次请求包含的条目数，批量请求按条目平摊
+    """
+
+    def get(name: str) -> Optional[int]:
+        if isinstance(usage, dict):
+            value = usage.get(name)
+        else:
+            value = getattr(usage, name, None)
+        return round(value / share) if value is not None else None
+
+    return {
+        "prompt_tokens": get("prompt_token_count"),
+        "output_tokens": get("candidates_token_count"),
+        "total_tokens": get("total_token_count"),
+    }
+
+
+class AdaptiveBatchSizer:
+    """根据实际 token 用量自适应调整批量摘要的条目数"""
+
+    def __init__(
+        self, max_size: int, max_output_tokens: int, initial_tokens_per_item: int
+    ) -> None:
+        self.max_size = max(1, min(max_size, BATCH_MAX_URLS))
+        self.max_output_tokens = max_output_tokens
+        # 每篇文章输出 token 数的指数移动平均
+        self.tokens_per_item = float(initial_tokens_per_item)
+        self.smoothing = 0.3
+        # 截断或解析失败时的乘性收缩上限
+        self.size_cap = self.max_size
+
+    def next_size(self) -> int:
+        """计算下一批的条目数"""
+        by_budget = int(self.max_output_tokens * 0.8 // max(self.tokens_per_item, 1))
+        return max(1, min(self.size_cap, by_budget))
+
+    def record_success(self, item_count: int, output_tokens: int) -> None:
+        """记录一次成功批次的输出 token 数，逐步放开收缩上限"""
+        if item_count > 0 and output_tokens > 0:
+            observed = output_tokens / item_count
+            self.tokens_per_item = (
+                self.smoothing * observed + (1 - self.smoothing) * self.tokens_per_item
+            )
+        if self.size_cap < self.max_size:
+            self.size_cap += 1
+
+    def record_failure(self) -> None:
+        """批次被截断或解析失败时减半"""
+        self.size_cap = max(1, self.size_cap // 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "next_size": self.next_size(),
+            "max_size": self.max_size,
+            "size_cap": self.size_cap,
+            "tokens_per_item": round(self.tokens_per_item, 1),
+            "max_output_tokens": self.max_output_tokens,
+        }
+
+
+class ResponseStats:
+    """按解析方式统计单篇摘要响应的格式错误率和每次成功消耗的 token"""
+
+    MODES = ("prompt", "structured")
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Dict[str, int]] = {
+            mode: {"responses": 0, "malformed": 0, "successes": 0, "tokens": 0}
+            for mode in self.MODES
+        }
+
+    def record(self, mode: str, response: Any, malformed: bool, success: bool) -> None:
+        stats = self._stats[mode]
+        stats["responses"] += 1
+        stats["malformed"] += int(malformed)
+        stats["successes"] += int(success)
+        usage = getattr(response, "usage_metadata", None)
+        stats["tokens"] += getattr(usage, "total_token_count", None) or 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for mode, stats in self._stats.items():
+            responses, successes = stats["responses"], stats["successes"]
+            result[mode] = {
+                **stats,
+                "malformed_rate": (
+                    round(stats["malformed"] / responses, 4) if responses else None
+                ),
+                "tokens_per_success": (
+                    round(stats["tokens"] / successes, 1) if successes else None
+                ),
+            }
+        return result
 
 
 class GeminiSummaryService:
     """Google Gemini AI 服务（使用官方异步 SDK）"""
 
-    def __init__(self):
+    def __init__(
+        self, client_factory: Optional[Callable[[str], genai.Client]] = None
+    ) -> None:
         self.settings = get_settings()
+        # 所有并发任务共享同一个客户端，由 startup()/shutdown() 管理生命周期
         self.client: Optional[genai.Client] = None
+        self._client_factory = client_factory or (
+            lambda api_key: genai.Client(api_key=api_key)
+        )
+        self._client_lock = asyncio.Lock()
 
         # 速率限制状态
         self.request_times_minute: deque[datetime] = deque()  # 每分钟请求记录
         self.request_times_day: deque[datetime] = deque()  # 每天请求记录
         self._rate_limit_lock = asyncio.Lock()  # 防止并发检查冲突
+        self.throttle_count = 0  # 上游返回 429 / 配额错误的累计次数
+        self.request_count = 0  # 实际发出的 Gemini 请求累计次数
+
+        # 批量摘要的自适应批大小
+        self.batch_sizer = AdaptiveBatchSizer(
+            max_size=self.settings.summary_batch_max_size,
+            max_output_tokens=self.settings.summary_batch_max_output_tokens,
+            initial_tokens_per_item=self.settings.ai_summary_max_length * 2,
+        )
+        # 单篇摘要响应的解析统计
+        self.response_stats = ResponseStats()
 
-    async def __aenter__(self):
-        """异步上下文管理器入口"""
+    async def startup(self) -> None:
+        """创建共享客户端（应用启动时调用，未配置 API key 时跳过）"""
         if not self.settings.google_api_key:
-            raise ValueError("Google API key not configured")
+            logger.warning("Google API key not configured, summary service disabled")
+            return
+        await self.get_client()
+
+    async def shutdown(self) -> None:
+        """释放共享客户端（应用关闭时调用）"""
+        async with self._client_lock:
+            client, self.client = self.client, None
+        if client is None:
+            return
+
+        # 旧版本 SDK 没有 aclose
+        aclose = getattr(client.aio, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    async def get_client(self) -> genai.Client:
+        """
+        获取共享客户端，首次使用时创建（未调用 startup() 的脚本也可直接使用）
 
-        # 初始化客户端
-        self.client = genai.Client(api_key=self.settings.google_api_key)
-        return self
+        批处理后端也通过这里取客户端，不要缓存返回值：shutdown() 后会重新创建。
+        """
+        if self.client is not None:
+            return self.client
 
-    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        """异步上下文管理器出口"""
-        self.client = None
+        async with self._client_lock:
+            if self.client is None:
+                if not self.settings.google_api_key:
+                    raise ValueError("Google API key not configured")
+                self.client = self._client_factory(self.settings.google_api_key)
+            return self.client
 
     async def _check_and_record_rate_limit(self) -> bool:
         """检查速率限制并记录请求（原子操作）"""
@@ -108,6 +257,13 @@ class GeminiSummaryService:
         while self.request_times_day and self.request_times_day[0] <= day_ago:
             self.request_times_day.popleft()
 
+    def remaining_daily_quota(self) -> Optional[int]:
+        """剩余的每日请求配额（未启用速率限制时返回 None）"""
+        if not self.settings.ai_enable_rate_limiting:
+            return None
+        self._cleanup_expired_requests(datetime.now())
+        return max(0, self.settings.ai_rate_limit_per_day - len(self.request_times_day))
+
     async def _wait_for_rate_limit_reset(self) -> None:
         """等待速率限制重置"""
         logger.info(
@@ -125,10 +281,209 @@ class GeminiSummaryService:
         Returns:
             (成功标志, 结果数据)
         """
-        if not self.client:
-            raise RuntimeError(
-                "Service not initialized. Use 'async with' context manager."
+        article_text = await self._get_article_text(
+            item, self.settings.summary_article_token_budget
+        )
+        prompt = self._build_summary_prompt(item, article_text)
+        # response_schema 不能与 url_context 工具同时使用，只在本地抓取正文时启用
+        structured = (
+            self.settings.summary_structured_output_enabled and article_text is not None
+        )
+        config = types.GenerateContentConfig(
+            # 已在本地抓取正文时不再让 Gemini 访问页面
+            tools=None if article_text else [{"url_context": {}}],  # URL 上下文工具
+            max_output_tokens=self.settings.ai_summary_max_length * 10,  # 预留空间
+            temperature=0.3,  # 保持一致性
+            thinking_config=types.ThinkingConfig(
+                thinking_budget=0, include_thoughts=False
+            ),
+            response_mime_type="application/json" if structured else None,
+            response_schema=SummaryResult if structured else None,
+        )
+
+        response, generation_duration, error = await self._generate_content(
+            prompt, config, f"item {item.id}"
+        )
+        if error is not None:
+            return False, error
+
+        # 处理响应
+        return await self._process_gemini_response(
+            response,
+            generation_duration,
+            local_content=article_text is not None,
+            structured=structured,
+        )
+
+    async def generate_summaries_batch(
+        self, items: List[Item], article_texts: Optional[Dict[int, str]] = None
+    ) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        在一次请求中为多篇文章生成摘要
+
+        Args:
+            items: 需要生成摘要的条目列表（最多 BATCH_MAX_URLS 条）
+            article_texts: 已通过 fetch_batch_texts 抓取的正文（文章ID -> 正文），
+                缺少的文章使用 url_context 工具；为 None 时在这里抓取
+
+        Returns:
+            与 items 顺序一致的 (成功标志, 结果数据) 列表。响应解析成功但缺少某篇
+            结果时，该条目的结果数据带 batch_missing 标记，由调用方回退为单条重试；
+            整个请求失败（异常、限流、响应无法解析）时所有条目都不带该标记
+        """
+        if not items:
+            return []
+        if len(items) > BATCH_MAX_URLS:
+            raise ValueError(f"Batch size {len(items)} exceeds {BATCH_MAX_URLS}")
+
+        if article_texts is None:
+            article_texts = await self.fetch_batch_texts(items)
+        else:
+            article_texts = {
+                item.id: article_texts[item.id]
+                for item in items
+                if item.id in article_texts
+            }
+
+        prompt = self._build_batch_prompt(items, article_texts)
+        needs_url_context = len(article_texts) < len(items)
+        config = types.GenerateContentConfig(
+            tools=[{"url_context": {}}] if needs_url_context else None,
+            max_output_tokens=self.batch_sizer.max_output_tokens,
+            temperature=0.3,
+            thinking_config=types.ThinkingConfig(
+                thinking_budget=0, include_thoughts=False
+            ),
+        )
+
+        label = f"batch of {len(items)} items"
+        response, generation_duration, error = await self._generate_content(
+            prompt, config, label
+        )
+        if error is not None:
+            return [(False, dict(error)) for _ in items]
+
+        return self._process_batch_response(
+            response, items, generation_duration, set(article_texts)
+        )
+
+    async def translate_titles(
+        self, items: List[Item]
+    ) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        只翻译标题（用于 PDF、视频、付费墙等无法摘要的文章）
+
+        一次请求翻译多篇标题，不使用 url_context 工具，输出 token 很少。
+
+        Returns:
+            与 items 顺序一致的 (成功标志, 结果数据) 列表
+        """
+        if not items:
+            return []
+
+        titles = "\n".join(f"- id: {item.id}\n  title: {item.title}" for item in items)
+        prompt = (
+            "Translate each title below into CHINESE. Return a JSON array with exactly "
+            'one object per title: [{"id": title id, "translated_title": "Chinese '
+            'title"}]. DO NOT RETURN ANY OTHER TEXT, DO NOT RETURN MARKDOWN EITHER.'
+            f"\n\nTitles:\n{titles}"
+        )
+        config = types.GenerateContentConfig(
+            max_output_tokens=100 * len(items) + 200,
+            temperature=0.3,
+            thinking_config=types.ThinkingConfig(
+                thinking_budget=0, include_thoughts=False
+            ),
+        )
+
+        response, generation_duration, error = await self._generate_content(
+            prompt, config, f"{len(items)} titles"
+        )
+        if error is not None:
+            return [(False, error) for _ in items]
+
+        per_item_duration = generation_duration // len(items)
+        raw_content = (getattr(response, "text", None) or "").strip()
+        try:
+            parsed = json.loads(self._extract_json_text(raw_content))
+        except json.JSONDecodeError as e:
+            error = {"error": f"Title response parse error: {e}"}
+            return [(False, error) for _ in items]
+
+        by_id: Dict[int, str] = {}
+        for entry in parsed if isinstance(parsed, list) else []:
+            if not isinstance(entry, dict) or not entry.get("translated_title"):
+                continue
+            try:
+                by_id[int(entry["id"])] = str(entry["translated_title"]).strip()
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        response_json = self._response_to_dict(response)
+        response_json["mode"] = "title_only"
+        response_json["batch_size"] = len(items)
+        results: List[Tuple[bool, Dict[str, Any]]] = []
+        for item in items:
+            translated_title = by_id.get(item.id)
+            if not translated_title:
+                results.append((False, {"error": "Missing title in response"}))
+                continue
+            results.append(
+                (
+                    True,
+                    {
+                        "content": None,
+                        "translated_title": translated_title,
+                        "generation_duration_ms": per_item_duration,
+                        "url_retrieval_status": None,
+                        "response_json": response_json,
+                        **usage_tokens(response.usage_metadata, len(items)),
+                    },
+                )
             )
+        return results
+
+    async def fetch_batch_texts(self, items: List[Item]) -> Dict[int, str]:
+        """
+        并发抓取一批文章的正文（文章ID -> 正文），批内每篇平分正文 token 预算
+
+        调用方应在占用并发名额之前调用，抓取页面期间不占用 Gemini 的并发名额。
+        """
+        if not items or not self.settings.summary_local_fetch_enabled:
+            return {}
+
+        per_item_budget = max(
+            500, self.settings.summary_article_token_budget // len(items)
+        )
+        semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+
+        async def fetch(item: Item) -> Optional[str]:
+            async with semaphore:
+                return await self._get_article_text(item, per_item_budget)
+
+        texts = await asyncio.gather(*(fetch(item) for item in items))
+        return {item.id: text for item, text in zip(items, texts, strict=True) if text}
+
+    async def _get_article_text(self, item: Item, max_tokens: int) -> Optional[str]:
+        """本地抓取正文（未启用或失败时返回 None，回退到 url_context 工具）"""
+        if not self.settings.summary_local_fetch_enabled:
+            return None
+        try:
+            return await article_extractor.get_prompt_text(item.url, max_tokens)
+        except Exception as e:
+            logger.warning(f"Local article fetch failed for item {item.id}: {e}")
+            return None
+
+    async def _generate_content(
+        self, contents: Any, config: types.GenerateContentConfig, label: str
+    ) -> Tuple[Any, int, Optional[Dict[str, Any]]]:
+        """
+        调用 Gemini 生成内容（带速率限制和 429 重试）
+
+        Returns:
+            (响应对象, 生成耗时毫秒, 错误数据)，成功时错误数据为 None
+        """
+        client = await self.get_client()
 
         max_retries = 3  # 429错误最大重试次数
         retry_count = 0
@@ -147,25 +502,17 @@ class GeminiSummaryService:
                         await self._wait_for_rate_limit_reset()
                         continue
                     else:
-                        return False, {"error": "Rate limit exceeded after max retries"}
+                        error = {"error": "Rate limit exceeded after max retries"}
+                        return None, 0, error
 
-                # 构建提示词
-                prompt = self._build_summary_prompt(item)
                 start_time = datetime.now()
+                self.request_count += 1
 
                 # 使用原生异步 API 调用 Gemini（手动JSON解析）
-                response = await self.client.aio.models.generate_content(
+                response = await client.aio.models.generate_content(
                     model=self.settings.gemini_model,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        tools=[{"url_context": {}}],  # URL 上下文工具
-                        max_output_tokens=self.settings.ai_summary_max_length
-                        * 10,  # 预留空间
-                        temperature=0.3,  # 保持一致性
-                        thinking_config=types.ThinkingConfig(
-                            thinking_budget=0, include_thoughts=False
-                        ),
-                    ),
+                    contents=contents,
+                    config=config,
                 )
 
                 logger.info(f"Gemini response: {response}")
@@ -173,11 +520,7 @@ class GeminiSummaryService:
                 generation_duration = int(
                     (datetime.now() - start_time).total_seconds() * 1000
                 )
-
-                # 处理响应
-                return await self._process_gemini_response(
-                    response, generation_duration
-                )
+                return response, generation_duration, None
 
             except Exception as e:
                 error_str = str(e)
@@ -188,6 +531,7 @@ class GeminiSummaryService:
                     or "rate limit" in error_str.lower()
                     or "quota" in error_str.lower()
                 ):
+                    self.throttle_count += 1
                     logger.warning(
                         f"遇到速率限制错误 (重试 {retry_count + 1}/{max_retries + 1}): "
                     )
@@ -200,39 +544,212 @@ class GeminiSummaryService:
                         continue
                     else:
                         logger.error(f"达到最大重试次数，放弃生成摘要: {error_str}")
-                        return False, {
+                        error = {
                             "error": f"Rate limit exceeded after {max_retries} retries: {error_str}"
                         }
+                        return None, 0, error
                 else:
                     # 其他错误不重试
-                    logger.error(
-                        f"Error generating summary for item {item.id}:"
-                    )
+                    logger.error(f"Error generating summary for {label}:")
                     logger.exception(e)
-                    return False, {"error": error_str}
+                    return None, 0, {"error": error_str}
 
         # 不应该到达这里
-        return False, {"error": "Unexpected error in retry loop"}
+        return None, 0, {"error": "Unexpected error in retry loop"}
 
-    def _build_summary_prompt(self, item: Item) -> str:
-        """构建摘要生成的提示词"""
+    def _build_summary_prompt(
+        self, item: Item, article_text: Optional[str] = None
+    ) -> str:
+        """构建摘要生成的提示词（提供正文时不再要求访问页面）"""
         max_length = self.settings.ai_summary_max_length
+        if article_text:
+            source = "the article content below"
+        else:
+            source = "the content of the page"
 
         # 基础提示词
-        base_prompt = f"""Please analyze the content of the page and generate a summary in CHINESE. The summary should be concise and highlight the key technical points and core content. The summary should be no more than {max_length} words. The summary should be objective and accurate. The summary should be returned in JSON format: {{"translated_title": "Chinese title", "summary": "Chinese summary"}}. If you cannot generate a summary, return null for summary, but you must return a valid JSON text with translated_title. YOU MUST RETURN A SINGLE JSON TEXT IN A SINGLE PART. DO NOT RETURN ANY OTHER TEXT, DO NOT RETURN MARKDOWN EITHER.
+        base_prompt = f"""Please analyze {source} and generate a summary in CHINESE. The summary should be concise and highlight the key technical points and core content. The summary should be no more than {max_length} words. The summary should be objective and accurate. The summary should be returned in JSON format: {{"translated_title": "Chinese title", "summary": "Chinese summary"}}. If you cannot generate a summary, return null for summary, but you must return a valid JSON text with translated_title. YOU MUST RETURN A SINGLE JSON TEXT IN A SINGLE PART. DO NOT RETURN ANY OTHER TEXT, DO NOT RETURN MARKDOWN EITHER.
 
         Original title: {item.title}
         Page link: {item.url}"""
 
-        return textwrap.dedent(base_prompt)
+        prompt = textwrap.dedent(base_prompt)
+        if article_text:
+            prompt += f"\n\nArticle content:\n{article_text}"
+        return prompt
+
+    def _build_batch_prompt(
+        self, items: List[Item], article_texts: Optional[Dict[int, str]] = None
+    ) -> str:
+        """构建批量摘要的提示词（有正文的文章直接附带正文）"""
+        max_length = self.settings.ai_summary_max_length
+        article_texts = article_texts or {}
+
+        blocks: List[str] = []
+        for item in items:
+            block = f"- id: {item.id}\n  Original title: {item.title}\n  Page link: {item.url}"
+            if item.id in article_texts:
+                content = textwrap.indent(article_texts[item.id], "    ")
+                block += f"\n  Article content:\n{content}"
+            blocks.append(block)
+        articles = "\n".join(blocks)
+
+        base_prompt = f"""Please analyze the content of each article below (use the provided article content when present, otherwise the page link) and generate a summary in CHINESE for every article. Each summary should be concise and highlight the key technical points and core content, no more than {max_length} words, objective and accurate. Return a JSON array with exactly one object per article, in the same order: [{{"id": article id, "translated_title": "Chinese title", "summary": "Chinese summary"}}]. If you cannot generate a summary for an article, return null for its summary, but you must still return its id and translated_title. YOU MUST RETURN A SINGLE JSON ARRAY IN A SINGLE PART. DO NOT RETURN ANY OTHER TEXT, DO NOT RETURN MARKDOWN EITHER.
+
+Articles:
+"""
+
+        return textwrap.dedent(base_prompt) + articles
+
+    def build_batch_job_request(self, item: Item) -> Dict[str, Any]:
+        """构建离线批处理任务中单篇文章的请求体（与 generate_summary 参数一致）"""
+        return {
+            "contents": [
+                {"role": "user", "parts": [{"text": self._build_summary_prompt(item)}]}
+            ],
+            "tools": [{"url_context": {}}],
+            "generationConfig": {
+                "maxOutputTokens": self.settings.ai_summary_max_length * 10,
+                "temperature": 0.3,
+                "thinkingConfig": {"thinkingBudget": 0, "includeThoughts": False},
+            },
+        }
+
+    @staticmethod
+    def _extract_json_text(raw_content: str) -> str:
+        """清理可能的 markdown 代码块标记"""
+        if not raw_content.startswith("```"):
+            return raw_content
+
+        lines = raw_content.split("\n")
+        json_lines = []
+        in_json = False
+        for line in lines:
+            if line.strip().startswith("```") and not in_json:
+                in_json = True
+                continue
+            elif line.strip() == "```":
+                break
+            elif in_json:
+                json_lines.append(line)
+        return "\n".join(json_lines)
+
+    def _process_batch_response(
+        self,
+        response: Any,
+        items: List[Item],
+        generation_duration: int,
+        local_item_ids: Optional[set[int]] = None,
+    ) -> List[Tuple[bool, Dict[str, Any]]]:
+        """解析批量响应，将 JSON 数组中的结果映射回对应条目"""
+        per_item_duration = generation_duration // len(items)
+        response_json = self._response_to_dict(response)
+        response_json["batch_size"] = len(items)
+
+        def failed(error: str) -> List[Tuple[bool, Dict[str, Any]]]:
+            self.batch_sizer.record_failure()
+            return [
+                (False, {"error": error, "generation_duration_ms": per_item_duration})
+                for _ in items
+            ]
+
+        raw_content = (getattr(response, "text", None) or "").strip()
+        if not response.candidates or not raw_content:
+            return failed("Empty batch response")
+
+        try:
+            parsed = json.loads(self._extract_json_text(raw_content))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse batch JSON response: {e}")
+            return failed(f"Batch response parse error: {e}")
+
+        if not isinstance(parsed, list):
+            return failed("Batch response is not a JSON array")
+
+        # 优先按 id 匹配，缺少 id 且数量一致时按顺序匹配
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for entry in parsed:
+            if isinstance(entry, dict) and "id" in entry:
+                try:
+                    by_id[int(entry["id"])] = entry
+                except (TypeError, ValueError):
+                    continue
+        if not by_id and len(parsed) == len(items):
+            by_id = {
+                item.id: entry
+                for item, entry in zip(items, parsed, strict=True)
+                if isinstance(entry, dict)
+            }
+
+        results: List[Tuple[bool, Dict[str, Any]]] = []
+        for item in items:
+            entry = by_id.get(item.id)
+            summary_content = (entry or {}).get("summary") or ""
+            if not entry or not summary_content.strip():
+                results.append(
+                    (
+                        False,
+                        {
+                            "error": "Missing summary in batch response",
+                            "generation_duration_ms": per_item_duration,
+                            "batch_missing": True,
+                        },
+                    )
+                )
+                continue
+
+            results.append(
+                (
+                    True,
+                    {
+                        "content": summary_content,
+                        "translated_title": entry.get("translated_title") or "",
+                        "generation_duration_ms": per_item_duration,
+                        "url_retrieval_status": (
+                            URLRetrievalStatus.LOCAL_FETCH.value
+                            if item.id in (local_item_ids or set())
+                            else URLRetrievalStatus.UNKNOWN.value
+                        ),
+                        "response_json": response_json,
+                        **usage_tokens(response.usage_metadata, len(items)),
+                    },
+                )
+            )
+
+        # 被截断时即使部分解析成功也需要收缩批大小
+        candidate = response.candidates[0]
+        finish_reason = str(getattr(candidate, "finish_reason", ""))
+        truncated = finish_reason.endswith("MAX_TOKENS")
+        succeeded = sum(1 for ok, _ in results if ok)
+        if truncated or succeeded < len(items):
+            self.batch_sizer.record_failure()
+        else:
+            usage = response_json.get("usage", {})
+            self.batch_sizer.record_success(
+                len(items), usage.get("candidates_token_count") or 0
+            )
+
+        logger.info(f"Batch summary parsed: {succeeded}/{len(items)} succeeded")
+        return results
 
     async def _process_gemini_response(
-        self, response: Any, generation_duration: int
+        self,
+        response: Any,
+        generation_duration: int,
+        local_content: bool = False,
+        structured: bool = False,
     ) -> Tuple[bool, Dict[str, Any]]:
-        """处理 Gemini API 响应"""
+        """
+        处理 Gemini API 响应
+
+        structured 为 True 时按 SummaryResult 校验，否则按提示词约定的 JSON 解析；
+        两种方式下格式不符都按失败处理（计入重试），不把原始文本当作摘要保存。
+        """
+        mode = "structured" if structured else "prompt"
         try:
             # 检查是否有候选结果
             if not response.candidates:
+                self.response_stats.record(mode, response, False, False)
                 return False, {
                     "error": "No candidates in response",
                     "generation_duration_ms": generation_duration,
@@ -242,6 +759,7 @@ class GeminiSummaryService:
 
             # 提取文本内容并手动解析JSON
             if not hasattr(response, "text") or not response.text:
+                self.response_stats.record(mode, response, False, False)
                 return False, {
                     "error": "No text content in response",
                     "generation_duration_ms": generation_duration,
@@ -250,72 +768,33 @@ class GeminiSummaryService:
             raw_content = response.text.strip()
 
             if not raw_content:
+                self.response_stats.record(mode, response, False, False)
                 return False, {
                     "error": "Empty response content",
                     "generation_duration_ms": generation_duration,
                 }
 
-            # 尝试解析JSON响应
-            try:
-                # 清理可能的markdown格式
-                json_content = raw_content
-                if raw_content.startswith("```json"):
-                    # 移除markdown代码块标记
-                    lines = raw_content.split("\n")
-                    json_lines = []
-                    in_json = False
-                    for line in lines:
-                        if line.strip() == "```json":
-                            in_json = True
-                            continue
-                        elif line.strip() == "```":
-                            break
-                        elif in_json:
-                            json_lines.append(line)
-                    json_content = "\n".join(json_lines)
-
-                # 解析JSON
-                parsed_data = json.loads(json_content)
-
-                # 验证必需的字段
-                if not isinstance(parsed_data, dict):
-                    raise ValueError("Response is not a JSON object")
-
-                if (
-                    "translated_title" not in parsed_data
-                    or "summary" not in parsed_data
-                ):
-                    raise ValueError(
-                        "Missing required fields: translated_title or summary"
-                    )
-
-                translated_title = parsed_data.get("translated_title", "")
-                summary_content = parsed_data.get("summary", "")
-
-                # 处理null值
-                if translated_title is None:
-                    translated_title = ""
-                if summary_content is None:
-                    summary_content = ""
-
-                # 至少要有摘要内容才算成功
-                if not summary_content.strip():
-                    logger.warning("AI returned empty summary content")
-                    summary_content = ""  # 允许空摘要，但记录警告
-
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.warning(
-                    f"Failed to parse JSON response, using raw content as summary: {e}"
-                )
-                # 回退到原始内容作为摘要，translated_title为空
-                translated_title = ""
-                summary_content = raw_content
+            if structured:
+                parsed = self._parse_structured_result(response, raw_content)
+            else:
+                parsed = self._parse_summary_json(raw_content)
+            if parsed is None:
+                # 格式错误直接失败，不把原始文本当作摘要
+                self.response_stats.record(mode, response, True, False)
+                return False, {
+                    "error": f"Malformed {mode} response",
+                    "generation_duration_ms": generation_duration,
+                }
+            translated_title, summary_content = parsed
+            self.response_stats.record(mode, response, False, True)
 
             # 提取 URL 检索状态（从候选结果的元数据中）
             url_retrieval_status = URLRetrievalStatus.UNKNOWN
 
             # 检查是否有 URL 上下文元数据
-            if hasattr(candidate, "grounding_metadata"):
+            if local_content:
+                url_retrieval_status = URLRetrievalStatus.LOCAL_FETCH
+            elif hasattr(candidate, "grounding_metadata"):
                 grounding_metadata = candidate.grounding_metadata
                 if grounding_metadata and hasattr(
                     grounding_metadata, "grounding_chunks"
@@ -333,6 +812,7 @@ class GeminiSummaryService:
                 "generation_duration_ms": generation_duration,
                 "url_retrieval_status": url_retrieval_status.value,
                 "response_json": self._response_to_dict(response),
+                **usage_tokens(response.usage_metadata),
             }
 
         except Exception as e:
@@ -342,6 +822,80 @@ class GeminiSummaryService:
                 "generation_duration_ms": generation_duration,
             }
 
+    @staticmethod
+    def _parse_structured_result(
+        response: Any, raw_content: str
+    ) -> Optional[Tuple[str, str]]:
+        """按 SummaryResult 校验结构化输出，不符合时返回 None"""
+        result = getattr(response, "parsed", None)
+        if not isinstance(result, SummaryResult):
+            try:
+                result = SummaryResult.model_validate_json(raw_content)
+            except ValueError as e:
+                logger.warning(f"Structured response failed validation: {e}")
+                return None
+        return result.translated_title or "", result.summary or ""
+
+    def _parse_summary_json(self, raw_content: str) -> Optional[Tuple[str, str]]:
+        """解析提示词约定的 JSON 文本，格式不符时返回 None"""
+        try:
+            parsed_data = json.loads(self._extract_json_text(raw_content))
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(parsed_data, dict):
+            return None
+        if "translated_title" not in parsed_data or "summary" not in parsed_data:
+            return None
+        fields = (parsed_data["translated_title"], parsed_data["summary"])
+        if not all(value is None or isinstance(value, str) for value in fields):
+            return None
+        return fields[0] or "", fields[1] or ""
+
+    def parse_summary_text(self, raw_content: str) -> Tuple[str, str]:
+        """
+        解析模型返回的摘要 JSON 文本
+
+        Returns:
+            (翻译标题, 摘要内容)，解析失败时回退为原始文本作为摘要
+        """
+        try:
+            # 清理可能的markdown格式
+            json_content = self._extract_json_text(raw_content)
+
+            # 解析JSON
+            parsed_data = json.loads(json_content)
+
+            # 验证必需的字段
+            if not isinstance(parsed_data, dict):
+                raise ValueError("Response is not a JSON object")
+
+            if "translated_title" not in parsed_data or "summary" not in parsed_data:
+                raise ValueError("Missing required fields: translated_title or summary")
+
+            translated_title = parsed_data.get("translated_title", "")
+            summary_content = parsed_data.get("summary", "")
+
+            # 处理null值
+            if translated_title is None:
+                translated_title = ""
+            if summary_content is None:
+                summary_content = ""
+
+            # 至少要有摘要内容才算成功
+            if not summary_content.strip():
+                logger.warning("AI returned empty summary content")
+                summary_content = ""  # 允许空摘要，但记录警告
+
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(
+                f"Failed to parse JSON response, using raw content as summary: {e}"
+            )
+            # 回退到原始内容作为摘要，translated_title为空
+            translated_title = ""
+            summary_content = raw_content
+
+        return translated_title, summary_content
+
     async def generate_chat_response(
         self, message: str, context_url: Optional[str] = None
     ) -> Tuple[bool, Dict[str, Any]]:
@@ -355,10 +909,7 @@ class GeminiSummaryService:
         Returns:
             (成功标志, 结果数据)
         """
-        if not self.client:
-            raise RuntimeError(
-                "Service not initialized. Use 'async with' context manager."
-            )
+        client = await self.get_client()
 
         try:
             # 构建提示词
@@ -377,7 +928,7 @@ class GeminiSummaryService:
                 config.tools = [{"url_context": {}}]
 
             # 使用原生异步 API
-            response = await self.client.aio.models.generate_content(
+            response = await client.aio.models.generate_content(
                 model=self.settings.gemini_model, contents=prompt, config=config
             )
 
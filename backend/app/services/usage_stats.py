@@ -0,0 +1,126 @@
+"""
+Token 用量统计
+
+按天、按模型聚合摘要和聊天的 token 用量，并计算生成耗时的 p50 / p95，
+全部在 SQL 中完成，不解析原始响应 JSON。
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import ColumnElement, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.chat_usage import ChatUsage
+from ..models.summary import Summary, SummaryStatus
+
+PERCENTILES = {"p50": 0.5, "p95": 0.95}
+
+
+async def _percentiles(
+    session: AsyncSession, column: Any, *conditions: ColumnElement[bool]
+) -> Dict[str, Optional[int]]:
+    """按排序后的偏移量取分位数（SQLite 没有 percentile_cont）"""
+    conditions = (*conditions, column.is_not(None))
+    count = await session.scalar(select(func.count()).where(*conditions))
+    result: Dict[str, Optional[int]] = {name: None for name in PERCENTILES}
+    if not count:
+        return result
+
+    for name, fraction in PERCENTILES.items():
+        offset = int(fraction * (count - 1))
+        result[name] = await session.scalar(
+            select(column).where(*conditions).order_by(column).offset(offset).limit(1)
+        )
+    return result
+
+
+def _token_totals(model: Any) -> List[Any]:
+    return [
+        func.count().label("requests"),
+        func.coalesce(func.sum(model.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(model.output_tokens), 0).label("output_tokens"),
+        func.coalesce(func.sum(model.total_tokens), 0).label("total_tokens"),
+    ]
+
+
+def _rows(result: Any) -> List[Dict[str, Any]]:
+    return [dict(row._mapping) for row in result]
+
+
+async def summary_usage(session: AsyncSession, since: datetime) -> Dict[str, Any]:
+    """已完成摘要的 token 用量和生成耗时"""
+    conditions = (
+        Summary.status == SummaryStatus.COMPLETED,
+        Summary.completed_at >= since,
+    )
+    day = func.date(Summary.completed_at).label("day")
+
+    by_day = await session.execute(
+        select(day, *_token_totals(Summary))
+        .where(*conditions)
+        .group_by(day)
+        .order_by(day)
+    )
+    by_model = await session.execute(
+        select(Summary.model, *_token_totals(Summary))
+        .where(*conditions)
+        .group_by(Summary.model)
+        .order_by(Summary.model)
+    )
+    return {
+        "by_day": _rows(by_day),
+        "by_model": _rows(by_model),
+        "generation_duration_ms": await _percentiles(
+            session, Summary.generation_duration_ms, *conditions
+        ),
+    }
+
+
+async def chat_usage(session: AsyncSession, since: datetime) -> Dict[str, Any]:
+    """聊天请求的 token 用量和响应耗时"""
+    conditions = (ChatUsage.created_at >= since,)
+    day = func.date(ChatUsage.created_at).label("day")
+
+    by_day = await session.execute(
+        select(day, *_token_totals(ChatUsage))
+        .where(*conditions)
+        .group_by(day)
+        .order_by(day)
+    )
+    by_model = await session.execute(
+        select(ChatUsage.model, *_token_totals(ChatUsage))
+        .where(*conditions)
+        .group_by(ChatUsage.model)
+        .order_by(ChatUsage.model)
+    )
+    return {
+        "by_day": _rows(by_day),
+        "by_model": _rows(by_model),
+        "duration_ms": await _percentiles(session, ChatUsage.duration_ms, *conditions),
+        # 首个分块耗时，分别统计新建客户端和复用客户端的请求
+        "first_token_ms": {
+            "new_client": await _percentiles(
+                session,
+                ChatUsage.first_token_ms,
+                *conditions,
+                ChatUsage.client_reused.is_(False),
+            ),
+            "reused_client": await _percentiles(
+                session,
+                ChatUsage.first_token_ms,
+                *conditions,
+                ChatUsage.client_reused.is_(True),
+            ),
+        },
+    }
+
+
+async def get_usage(session: AsyncSession, days: int) -> Dict[str, Any]:
+    """最近 days 天的摘要和聊天用量"""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    return {
+        "since": since.isoformat(),
+        "summaries": await summary_usage(session, since),
+        "chat": await chat_usage(session, since),
+    }
@@ -0,0 +1,500 @@
+"""
+积压摘要的离线批处理模块
+
+将待处理的摘要任务导出为 JSONL 文件，通过批处理后端提交，
+轮询完成后按块批量写回 summaries 表，不占用实时请求的速率配额。
+
+提交后的任务标识和领取的摘要记录在 summary_batch_jobs 表中，进程在轮询期间重启时
+由新的领导者（或下一次手动触发）恢复该任务，领取的摘要不会一直停留在进行中。
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import AsyncSessionLocal
+from ..core.logging import get_logger
+from ..models.item import Item
+from ..models.summary import Summary, SummaryMode, SummaryStatus
+from ..models.summary_batch_job import SummaryBatchJob
+from ..services.batch_backend import (
+    BatchBackend,
+    BatchJobState,
+    BatchResult,
+    create_batch_backend,
+    wait_for_batch,
+)
+from ..services.dedup import propagate_to_duplicates, release_duplicates
+from ..services.raw_response_store import raw_response_store
+from ..services.retry_policy import retry_due, schedule_retry
+from ..services.summary_cache import summary_cache
+from ..services.summary_service import (
+    URLRetrievalStatus,
+    summary_service,
+    usage_tokens,
+)
+
+logger = get_logger(__name__)
+
+
+class BacklogBatchProcessor:
+    """积压摘要批处理器"""
+
+    KEY_PREFIX = "summary-"
+
+    def __init__(self, backend: Optional[BatchBackend] = None) -> None:
+        self.settings = get_settings()
+        self.backend = backend
+        self.is_running = False
+        self.last_run: Dict[str, Any] = {}
+        self._task: Optional["asyncio.Task[Dict[str, Any]]"] = None
+
+    def _get_backend(self) -> BatchBackend:
+        if self.backend is None:
+            self.backend = create_batch_backend(
+                self.settings.summary_backlog_backend, self.settings.gemini_model
+            )
+        return self.backend
+
+    def start_in_background(self, limit: Optional[int] = None) -> bool:
+        """在后台启动一次批处理，已有任务运行时返回 False"""
+        if self.is_running or (self._task is not None and not self._task.done()):
+            return False
+        self._task = asyncio.create_task(self.run(limit))
+        return True
+
+    async def resume_unfinished(self) -> bool:
+        """数据库中有未完成的批处理任务时在后台恢复（成为领导者时调用）"""
+        try:
+            async with AsyncSessionLocal() as session:
+                job = await self._load_unfinished_job(session)
+        except Exception as e:
+            logger.error(f"Failed to check unfinished backlog batches: {e}")
+            return False
+        if job is None:
+            return False
+        return self.start_in_background()
+
+    async def run(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        执行一次积压批处理：领取 -> 导出 -> 提交 -> 轮询 -> 导入
+
+        数据库中有未完成的任务（进程在轮询期间重启）时先恢复该任务，不领取新任务。
+        """
+        if self.is_running:
+            logger.info("Backlog batch already running, skipping")
+            return {"success": False, "error": "Backlog batch already running"}
+
+        self.is_running = True
+        started_at = datetime.now(timezone.utc)
+        self.last_run = {"state": "running", "started_at": started_at.isoformat()}
+        claimed: Dict[int, SummaryStatus] = {}
+        job_id: Optional[str] = None
+        backend: Optional[BatchBackend] = None
+        try:
+            backend = self._get_backend()
+            async with AsyncSessionLocal() as session:
+                job = await self._load_unfinished_job(session)
+
+            if job is None:
+                claimed_rows, original_status = await self._claim_pending(
+                    limit or self.settings.summary_backlog_max_jobs
+                )
+                if not claimed_rows:
+                    logger.info("No pending summaries for backlog batch")
+                    self.last_run.update(state="idle", claimed=0)
+                    return {"success": True, "claimed": 0}
+
+                claimed = dict(original_status)
+                input_path = self._export_jsonl(claimed_rows, started_at)
+                job_id = await backend.submit(input_path)
+                submitted_at = await self._record_job(job_id, backend.name, claimed)
+                logger.info(
+                    f"Backlog batch {job_id} submitted with {len(claimed)} jobs"
+                )
+            else:
+                job_id = job.job_id
+                claimed = {
+                    int(summary_id): SummaryStatus(status)
+                    for summary_id, status in job.claimed.items()
+                }
+                submitted_at = job.submitted_at
+                if submitted_at.tzinfo is None:
+                    # SQLite 不保存时区
+                    submitted_at = submitted_at.replace(tzinfo=timezone.utc)
+                logger.info(f"Resuming backlog batch {job_id} ({len(claimed)} jobs)")
+            self.last_run.update(job_id=job_id, claimed=len(claimed))
+
+            # 等待时限从提交时算起，恢复的任务不重新计时
+            elapsed = (datetime.now(timezone.utc) - submitted_at).total_seconds()
+            state = await wait_for_batch(
+                backend,
+                job_id,
+                poll_interval=self.settings.summary_backlog_poll_interval_seconds,
+                timeout=max(
+                    0.0, self.settings.summary_backlog_timeout_hours * 3600 - elapsed
+                ),
+            )
+            if state != BatchJobState.SUCCEEDED:
+                if state == BatchJobState.TIMED_OUT:
+                    await self._cancel(backend, job_id)
+                await self._release(list(claimed.items()))
+                claimed.clear()
+                await self._finish_job(job_id, state)
+                self.last_run.update(state="failed")
+                return {
+                    "success": False,
+                    "job_id": job_id,
+                    "error": f"Job {state.value}",
+                }
+
+            results = await backend.fetch_results(job_id)
+            retry_budget, item_ids = await self._load_claims(claimed)
+            stats = await self._import_results(results, claimed, retry_budget, item_ids)
+            await self._finish_job(job_id, state)
+            self.last_run.update(state="completed", **stats)
+            logger.info(f"Backlog batch {job_id} imported: {stats}")
+            return {"success": True, "job_id": job_id, **stats}
+
+        except Exception as e:
+            logger.error(f"Backlog batch failed: {e}")
+            # 放弃任务：取消远端任务，未写回的摘要恢复原状态
+            if backend is not None and job_id is not None:
+                await self._cancel(backend, job_id)
+            if claimed:
+                await self._release(list(claimed.items()))
+            if job_id is not None:
+                await self._finish_job(job_id, BatchJobState.FAILED, str(e))
+            self.last_run.update(state="failed", error=str(e))
+            return {"success": False, "error": str(e)}
+        finally:
+            self.last_run["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self.is_running = False
+
+    async def _load_unfinished_job(
+        self, session: AsyncSession
+    ) -> Optional[SummaryBatchJob]:
+        stmt = (
+            select(SummaryBatchJob)
+            .where(SummaryBatchJob.state == BatchJobState.RUNNING.value)
+            .order_by(SummaryBatchJob.submitted_at)
+            .limit(1)
+        )
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def held_summary_ids(self, session: AsyncSession) -> Set[int]:
+        """未完成的批处理任务领取的摘要ID（不能当作中断遗留回收）"""
+        stmt = select(SummaryBatchJob.claimed).where(
+            SummaryBatchJob.state == BatchJobState.RUNNING.value
+        )
+        return {
+            int(summary_id)
+            for claimed in (await session.execute(stmt)).scalars()
+            for summary_id in claimed
+        }
+
+    async def _record_job(
+        self, job_id: str, backend_name: str, claimed: Dict[int, SummaryStatus]
+    ) -> datetime:
+        """记录已提交的任务，返回提交时间"""
+        submitted_at = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as session:
+            session.add(
+                SummaryBatchJob(
+                    job_id=job_id,
+                    backend=backend_name,
+                    state=BatchJobState.RUNNING.value,
+                    claimed={
+                        str(summary_id): status.value
+                        for summary_id, status in claimed.items()
+                    },
+                    submitted_at=submitted_at,
+                )
+            )
+            await session.commit()
+        return submitted_at
+
+    async def _finish_job(
+        self, job_id: str, state: BatchJobState, error: Optional[str] = None
+    ) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(SummaryBatchJob)
+                    .where(SummaryBatchJob.job_id == job_id)
+                    .values(
+                        state=state.value,
+                        error=error,
+                        finished_at=datetime.now(timezone.utc),
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to record backlog batch {job_id} as {state}: {e}")
+
+    async def _cancel(self, backend: BatchBackend, job_id: str) -> None:
+        try:
+            await backend.cancel(job_id)
+        except Exception as e:
+            logger.warning(f"Failed to cancel backlog batch {job_id}: {e}")
+
+    async def _load_claims(
+        self, claimed: Dict[int, SummaryStatus]
+    ) -> tuple[Dict[int, tuple[int, int]], Dict[int, int]]:
+        """
+        读取仍处于进行中的领取任务的重试次数和文章ID，
+        已被回收或处理的任务从 claimed 中移除
+
+        Returns:
+            (摘要ID -> (重试次数, 最大重试次数), 摘要ID -> 文章ID)
+        """
+        async with AsyncSessionLocal() as session:
+            stmt = select(
+                Summary.id, Summary.retry_count, Summary.max_retries, Summary.item_id
+            ).where(
+                Summary.id.in_(list(claimed)),
+                Summary.status == SummaryStatus.IN_PROGRESS,
+            )
+            rows = (await session.execute(stmt)).all()
+        retry_budget = {row.id: (row.retry_count, row.max_retries) for row in rows}
+        for summary_id in set(claimed) - set(retry_budget):
+            del claimed[summary_id]
+        return retry_budget, {row.id: row.item_id for row in rows}
+
+    async def _claim_pending(
+        self, limit: int
+    ) -> tuple[List[Any], Dict[int, SummaryStatus]]:
+        """
+        领取待处理任务并标记为进行中，避免实时路径重复处理
+
+        命中内容缓存的任务不导出，复用正文后改为只翻译标题，由实时路径处理。
+
+        Returns:
+            ((Summary, Item) 列表, 摘要ID -> 领取前的状态)
+        """
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(Summary, Item)
+                .join(Item, Summary.item_id == Item.id)
+                .where(
+                    Summary.status.in_([SummaryStatus.PENDING, SummaryStatus.FAILED])
+                )
+                .where(Summary.retry_count < Summary.max_retries)
+                .where(Summary.mode == SummaryMode.FULL.value)
+                .where(retry_due())
+                .order_by(Summary.priority.desc(), Summary.created_at)
+                .limit(limit)
+            )
+            rows = []
+            cache_hits = 0
+            for summary, item in (await session.execute(stmt)).all():
+                if await summary_cache.reuse_content(
+                    session,
+                    summary.id,
+                    item.url,
+                    self.settings.gemini_model,
+                    summary.lang,
+                ):
+                    cache_hits += 1
+                else:
+                    rows.append((summary, item))
+            if cache_hits:
+                logger.info(f"Reused cached summary content for {cache_hits} jobs")
+            if not rows:
+                await session.commit()
+                return [], {}
+            original_status = {summary.id: summary.status for summary, _ in rows}
+
+            await session.execute(
+                update(Summary)
+                .where(Summary.id.in_([summary.id for summary, _ in rows]))
+                .values(
+                    status=SummaryStatus.IN_PROGRESS,
+                    started_at=datetime.now(timezone.utc),
+                )
+            )
+            await session.commit()
+            return rows, original_status
+
+    async def _store_in_cache(
+        self, session: AsyncSession, rows: List[Dict[str, Any]]
+    ) -> None:
+        """将成功导入的摘要写入内容缓存（由调用方提交事务）"""
+        completed = {
+            row["id"]: row for row in rows if row["status"] == SummaryStatus.COMPLETED
+        }
+        if not completed:
+            return
+        stmt = (
+            select(Summary.id, Summary.lang, Item.url)
+            .join(Item, Summary.item_id == Item.id)
+            .where(Summary.id.in_(list(completed)))
+        )
+        for target in (await session.execute(stmt)).all():
+            row = completed[target.id]
+            await summary_cache.store(
+                session,
+                target.url,
+                self.settings.gemini_model,
+                target.lang,
+                row["content"],
+                row["translated_title"],
+                source_summary_id=target.id,
+            )
+
+    def _export_jsonl(self, rows: List[Any], started_at: datetime) -> Path:
+        """导出批处理 JSONL 文件"""
+        work_dir = Path(self.settings.summary_backlog_work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        path = work_dir / f"backlog-{started_at.strftime('%Y%m%d%H%M%S')}.jsonl"
+
+        with path.open("w", encoding="utf-8") as f:
+            for summary, item in rows:
+                line = {
+                    "key": f"{self.KEY_PREFIX}{summary.id}",
+                    "request": summary_service.build_batch_job_request(item),
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+        logger.info(f"Exported {len(rows)} backlog jobs to {path}")
+        return path
+
+    async def _import_results(
+        self,
+        results: List[BatchResult],
+        claimed: Dict[int, SummaryStatus],
+        retry_budget: Dict[int, tuple[int, int]],
+        item_ids: Dict[int, int],
+    ) -> Dict[str, int]:
+        """按块批量写回结果，每块一个事务；提交成功的块才从 claimed 中移除"""
+        now = datetime.now(timezone.utc)
+        rows: List[Dict[str, Any]] = []
+        raw_responses: Dict[int, Dict[str, Any]] = {}
+        succeeded = failed = 0
+        seen: Set[int] = set()
+
+        for result in results:
+            summary_id = self._parse_key(result.key)
+            if summary_id is None or summary_id not in retry_budget:
+                continue
+            # 同一个键出现多次时只取第一条
+            if summary_id in seen:
+                continue
+            seen.add(summary_id)
+
+            if result.text and not result.error:
+                translated_title, content = summary_service.parse_summary_text(
+                    result.text
+                )
+                rows.append(
+                    {
+                        "id": summary_id,
+                        "status": SummaryStatus.COMPLETED,
+                        "content": content,
+                        "translated_title": translated_title,
+                        "completed_at": now,
+                        "url_retrieval_status": URLRetrievalStatus.UNKNOWN.value,
+                        **usage_tokens(result.usage),
+                        "error_message": None,
+                        "error_type": None,
+                        "next_retry_at": None,
+                    }
+                )
+                raw_responses[summary_id] = {
+                    "model_used": self.settings.gemini_model,
+                    "batch_backend": self._get_backend().name,
+                    "usage": result.usage,
+                }
+                succeeded += 1
+            else:
+                retry_count, max_retries = retry_budget[summary_id]
+                new_retry_count = retry_count + 1
+                status, next_retry_at = schedule_retry(
+                    "BATCH_ERROR", new_retry_count, max_retries, now
+                )
+                rows.append(
+                    {
+                        "id": summary_id,
+                        "status": status,
+                        "retry_count": new_retry_count,
+                        "last_retry_at": now,
+                        "next_retry_at": next_retry_at,
+                        "error_message": result.error,
+                        "error_type": "BATCH_ERROR",
+                    }
+                )
+                failed += 1
+
+        chunk_size = self.settings.summary_backlog_import_chunk_size
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            # 按字段集合分组，ORM 按主键批量 UPDATE 需要每组字段一致
+            groups: Dict[tuple[str, ...], List[Dict[str, Any]]] = {}
+            for row in chunk:
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+            async with AsyncSessionLocal() as session:
+                for group in groups.values():
+                    await session.execute(update(Summary), group)
+                await raw_response_store.save_many(
+                    session,
+                    {row["id"]: raw_responses.get(row["id"]) for row in chunk},
+                )
+                await self._store_in_cache(session, chunk)
+                # 同簇的重复文章共享成功的摘要正文，代表文章永久失败时改为各自生成
+                for row in chunk:
+                    if row["status"] == SummaryStatus.COMPLETED:
+                        await propagate_to_duplicates(
+                            session, item_ids[row["id"]], row["content"]
+                        )
+                    elif row["status"] == SummaryStatus.PERMANENTLY_FAILED:
+                        await release_duplicates(session, item_ids[row["id"]])
+                await session.commit()
+            for row in chunk:
+                claimed.pop(row["id"], None)
+
+        # 结果中缺失的任务恢复原状态，等待下一轮
+        missing = list(claimed.items())
+        if missing:
+            await self._release(missing)
+
+        return {"succeeded": succeeded, "failed": failed, "missing": len(missing)}
+
+    async def _release(self, entries: List[tuple[int, SummaryStatus]]) -> None:
+        """将领取的任务恢复为原状态（只处理仍在进行中的任务）"""
+        async with AsyncSessionLocal() as session:
+            for status in {status for _, status in entries}:
+                ids = [summary_id for summary_id, s in entries if s == status]
+                await session.execute(
+                    update(Summary)
+                    .where(Summary.id.in_(ids))
+                    .where(Summary.status == SummaryStatus.IN_PROGRESS)
+                    .values(status=status)
+                )
+            await session.commit()
+        logger.info(f"Released {len(entries)} backlog jobs")
+
+    def _parse_key(self, key: str) -> Optional[int]:
+        if not key.startswith(self.KEY_PREFIX):
+            return None
+        try:
+            return int(key[len(self.KEY_PREFIX) :])
+        except ValueError:
+            return None
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取批处理状态"""
+        return {
+            "is_running": self.is_running,
+            "backend": self.settings.summary_backlog_backend,
+            "last_run": self.last_run,
+        }
+
+
+# 全局积压批处理器实例
+backlog_processor = BacklogBatchProcessor()
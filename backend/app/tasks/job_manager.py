@@ -0,0 +1,361 @@
+"""
+后台任务管理
+
+手动触发的爬取和摘要生成可能持续数小时（包含限流等待），不能在 HTTP 请求中等待。
+接口提交任务后立即返回任务 ID，通过任务状态接口查看进度；同一类任务（相同的合并键）
+排队或运行中时，重复提交会合并到已有任务，不会再启动一次。
+
+任务保存在 background_jobs 表中，任何进程（包括 APP_MODE=api 的 API 进程）都只负责
+入队和查询。调度器的领导者进程（worker.py 或 APP_MODE=all 的进程）轮询领取排队的任务
+并执行，执行期间定期把进度计数写回数据库；执行进程退出后心跳不再更新，超时的任务标记为
+失败，合并键随之释放。
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, cast
+
+from sqlalchemy import CursorResult, delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..core.config import get_settings
+from ..core.database import AsyncSessionLocal
+from ..core.logging import get_logger
+from ..models.background_job import BackgroundJob
+
+logger = get_logger(__name__)
+
+# 任务函数：接收提交时的参数和进度计数字典，返回结果；结果中 success 为 False 视为失败
+JobHandler = Callable[[Dict[str, Any], Dict[str, int]], Awaitable[Dict[str, Any]]]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+HEARTBEAT_SECONDS = 5.0  # 运行中任务写回进度和心跳的间隔
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite 不保存时区，读出的时间按 UTC 处理"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def job_to_dict(job: BackgroundJob) -> Dict[str, Any]:
+    """任务状态（用于任务接口）"""
+    created_at = _aware(job.created_at) or _now()
+    finished_at = _aware(job.finished_at)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "params": job.params,
+        "state": job.state,
+        "progress": dict(job.progress or {}),
+        "result": job.result,
+        "error": job.error,
+        "coalesced": job.coalesced,
+        "holder_id": job.holder_id,
+        "created_at": created_at.isoformat(),
+        "finished_at": finished_at.isoformat() if finished_at else None,
+        "duration_seconds": round(
+            ((finished_at or _now()) - created_at).total_seconds(), 3
+        ),
+    }
+
+
+class JobManager:
+    """后台任务管理器（任务持久化在数据库，由领导者进程执行）"""
+
+    def __init__(self, max_history: int = 100) -> None:
+        self.settings = get_settings()
+        self.max_history = max_history
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        # 任务ID -> 本进程执行中的任务
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._runner: Optional["asyncio.Task[None]"] = None
+        self._wakeup = asyncio.Event()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """注册任务类型的执行函数"""
+        self._handlers[kind] = handler
+
+    async def submit(
+        self, kind: str, key: str, params: Dict[str, Any]
+    ) -> Tuple[BackgroundJob, bool]:
+        """
+        提交任务（只入队，由领导者进程执行）
+
+        Args:
+            kind: 任务类型，需已通过 register 注册
+            key: 合并键
+            params: 任务参数，原样传给执行函数
+
+        Returns:
+            (任务, 是否新建)。同键任务排队或运行中时返回已有任务
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        # 已有任务恰好在两步之间结束，或并发提交撞上唯一约束时重试
+        for _ in range(3):
+            async with AsyncSessionLocal() as session:
+                existing = await session.scalar(
+                    select(BackgroundJob).where(BackgroundJob.active_key == key)
+                )
+                if existing is not None:
+                    result = cast(
+                        CursorResult[Any],
+                        await session.execute(
+                            update(BackgroundJob)
+                            .where(
+                                BackgroundJob.id == existing.id,
+                                BackgroundJob.active_key == key,
+                            )
+                            .values(coalesced=BackgroundJob.coalesced + 1)
+                            .execution_options(synchronize_session=False)
+                        ),
+                    )
+                    await session.commit()
+                    if not result.rowcount:
+                        continue
+                    await session.refresh(existing)
+                    logger.info(
+                        f"Job {existing.id} ({key}) already {existing.state}, "
+                        f"request coalesced"
+                    )
+                    return existing, False
+
+                job = BackgroundJob(
+                    id=uuid.uuid4().hex,
+                    kind=kind,
+                    key=key,
+                    active_key=key,
+                    params=params,
+                    state=QUEUED,
+                    progress={},
+                    coalesced=0,
+                    created_at=_now(),
+                )
+                session.add(job)
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()
+                    continue
+
+            self._wakeup.set()
+            logger.info(f"Job {job.id} ({key}) queued")
+            return job, True
+
+        raise RuntimeError(f"Failed to submit job {key}")
+
+    async def get(self, job_id: str) -> Optional[BackgroundJob]:
+        async with AsyncSessionLocal() as session:
+            return await session.get(BackgroundJob, job_id)
+
+    async def recent(
+        self, limit: int = 20, kind: Optional[str] = None
+    ) -> List[BackgroundJob]:
+        """最近提交的任务，新的在前"""
+        stmt = select(BackgroundJob).order_by(BackgroundJob.created_at.desc())
+        if kind is not None:
+            stmt = stmt.where(BackgroundJob.kind == kind)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(stmt.limit(limit))
+            return list(result.scalars())
+
+    def start(self) -> None:
+        """开始领取并执行排队的任务（成为调度器领导者时调用）"""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._poll())
+            logger.info("Job runner started")
+
+    async def stop(self) -> None:
+        """停止领取新任务，已在执行的任务继续跑完（失去领导权时调用）"""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+            logger.info("Job runner stopped")
+
+    async def shutdown(self) -> None:
+        """停止领取并取消本进程执行中的任务（进程关闭时调用）"""
+        await self.stop()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _poll(self) -> None:
+        interval = self.settings.job_poll_interval_seconds
+        while True:
+            try:
+                await self._fail_stale()
+                await self._claim_queued()
+            except Exception as e:
+                logger.warning(f"Job runner poll failed: {e}")
+            # 本进程提交任务时立即唤醒，否则按间隔轮询其他进程入队的任务
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_queued(self) -> None:
+        """领取排队的任务，每个任务在独立的协程中执行"""
+        async with AsyncSessionLocal() as session:
+            rows = (
+                await session.execute(
+                    select(BackgroundJob.id, BackgroundJob.kind, BackgroundJob.params)
+                    .where(BackgroundJob.state == QUEUED)
+                    .order_by(BackgroundJob.created_at)
+                )
+            ).all()
+            for row in rows:
+                now = _now()
+                # 多个进程同时领取时只有一个能把状态从 queued 改为 running
+                result = cast(
+                    CursorResult[Any],
+                    await session.execute(
+                        update(BackgroundJob)
+                        .where(
+                            BackgroundJob.id == row.id,
+                            BackgroundJob.state == QUEUED,
+                        )
+                        .values(
+                            state=RUNNING,
+                            holder_id=self.holder_id,
+                            started_at=now,
+                            heartbeat_at=now,
+                        )
+                    ),
+                )
+                await session.commit()
+                if result.rowcount:
+                    logger.info(f"Job {row.id} ({row.kind}) started")
+                    self._tasks[row.id] = asyncio.create_task(
+                        self._run(row.id, row.kind, row.params or {})
+                    )
+
+    async def _run(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        progress: Dict[str, int] = {}
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, progress))
+        state, result, error = FAILED, None, None
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {kind}")
+            result = await handler(params, progress)
+            if result.get("success", True):
+                state = SUCCEEDED
+            else:
+                error = result.get("error")
+        except asyncio.CancelledError:
+            state, error = CANCELLED, "Cancelled on shutdown"
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} ({kind}) failed: {e}")
+            error = str(e)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+            self._tasks.pop(job_id, None)
+            try:
+                await self._finish(job_id, state, progress, result, error)
+            except Exception as e:
+                logger.error(f"Failed to record result of job {job_id}: {e}")
+
+    async def _heartbeat(self, job_id: str, progress: Dict[str, int]) -> None:
+        """定期写回进度计数和心跳"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(
+                        update(BackgroundJob)
+                        .where(
+                            BackgroundJob.id == job_id,
+                            BackgroundJob.holder_id == self.holder_id,
+                        )
+                        .values(progress=dict(progress), heartbeat_at=_now())
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Failed to update progress of job {job_id}: {e}")
+
+    async def _finish(
+        self,
+        job_id: str,
+        state: str,
+        progress: Dict[str, int],
+        result: Optional[Dict[str, Any]],
+        error: Optional[str],
+    ) -> None:
+        """记录结果并释放合并键，只保留最近的 max_history 个已结束任务"""
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .values(
+                    state=state,
+                    progress=dict(progress),
+                    result=result,
+                    error=error,
+                    finished_at=_now(),
+                    active_key=None,
+                )
+            )
+            keep = (
+                select(BackgroundJob.id)
+                .where(BackgroundJob.finished_at.is_not(None))
+                .order_by(BackgroundJob.finished_at.desc())
+                .limit(self.max_history)
+            )
+            await session.execute(
+                delete(BackgroundJob).where(
+                    BackgroundJob.finished_at.is_not(None),
+                    BackgroundJob.id.not_in(keep),
+                )
+            )
+            await session.commit()
+        logger.info(f"Job {job_id} {state}")
+
+    async def _fail_stale(self) -> None:
+        """执行进程退出（心跳超时）的任务标记为失败，释放合并键"""
+        now = _now()
+        cutoff = now - timedelta(seconds=self.settings.job_stale_seconds)
+        async with AsyncSessionLocal() as session:
+            result = cast(
+                CursorResult[Any],
+                await session.execute(
+                    update(BackgroundJob)
+                    .where(
+                        BackgroundJob.state == RUNNING,
+                        BackgroundJob.heartbeat_at < cutoff,
+                    )
+                    .values(
+                        state=FAILED,
+                        error="Job runner stopped before completion",
+                        finished_at=now,
+                        active_key=None,
+                    )
+                ),
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.warning(f"Marked {result.rowcount} stale jobs as failed")
+
+
+# 全局后台任务管理器实例
+job_manager = JobManager()
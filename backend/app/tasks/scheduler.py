@@ -8,18 +8,29 @@ from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 from ..core.config import get_settings
 from ..core.logging import get_logger
 from ..services.crawl_service import crawl_service
+from ..services.leader_election import scheduler_leader
+from .backlog_processor import backlog_processor
+from .job_manager import job_manager
 from .summary_generator import summary_generator
 
 logger = get_logger(__name__)
 
 
+CRAWL_JOB_ID = "crawl_all_sources"
+SUMMARY_JOB_ID = "generate_summaries"
+
+
 class TaskScheduler:
-    """任务调度器，管理定时爬取任务"""
+    """任务调度器，管理定时爬取任务（多进程部署时只有选举出的领导者运行定时任务）"""
 
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
         self.settings = get_settings()
         self._setup_event_listeners()
+        # 手动提交的后台任务，由领导者进程执行
+        job_manager.register("crawl", self._run_crawl_job)
+        job_manager.register("summaries", self._run_summaries_job)
+        job_manager.register("backlog", self._run_backlog_job)
 
     def _setup_event_listeners(self) -> None:
         """设置事件监听器"""
@@ -37,11 +48,16 @@ class TaskScheduler:
     async def start(self) -> None:
         """启动调度器"""
         try:
-            # 添加定时任务
-            await self._add_crawl_jobs()
-
-            # 启动调度器
+            # 新文章入库后立即触发摘要生成
+            if (
+                self.settings.enable_summary_scheduler
+                and self.settings.summary_event_driven_enabled
+            ):
+                summary_generator.start_event_consumer()
+
+            # 启动调度器，成为领导者后再添加定时任务
             self.scheduler.start()
+            await scheduler_leader.start(self._add_crawl_jobs, self._remove_crawl_jobs)
             logger.info("调度器启动成功")
 
         except Exception as e:
@@ -51,6 +67,9 @@ class TaskScheduler:
     async def stop(self) -> None:
         """停止调度器"""
         try:
+            await scheduler_leader.stop()
+            await job_manager.shutdown()
+            await summary_generator.stop_event_consumer()
             self.scheduler.shutdown(wait=True)
             logger.info("调度器停止成功")
         except Exception as e:
@@ -66,7 +85,7 @@ class TaskScheduler:
             self.scheduler.add_job(
                 self.crawl_all_sources_job,
                 trigger=IntervalTrigger(minutes=crawl_interval),
-                id="crawl_all_sources",
+                id=CRAWL_JOB_ID,
                 name="Crawl All Sources",
                 max_instances=1,  # 防止重复执行
                 replace_existing=True,
@@ -83,7 +102,7 @@ class TaskScheduler:
             self.scheduler.add_job(
                 self.generate_summaries_job,
                 trigger=IntervalTrigger(minutes=crawl_interval),
-                id="generate_summaries",
+                id=SUMMARY_JOB_ID,
                 name="Generate AI Summaries",
                 max_instances=1,  # 防止重复执行
                 replace_existing=True,
@@ -95,12 +114,27 @@ class TaskScheduler:
         else:
             logger.info("❌ 定时AI摘要任务已禁用 (ENABLE_SUMMARY_SCHEDULER=false)")
 
+        # 恢复进程重启前未完成的离线批处理任务
+        if await backlog_processor.resume_unfinished():
+            logger.info("已恢复未完成的积压摘要批处理任务")
+
+        # 领取其他进程（包括 APP_MODE=api 的 API 进程）提交的后台任务
+        job_manager.start()
+
         # 汇总信息
         if added_jobs:
             logger.info(f"📅 已添加定时任务: {', '.join(added_jobs)}")
         else:
             logger.warning("⚠️  所有定时任务都已禁用，调度器将空运行")
 
+    async def _remove_crawl_jobs(self) -> None:
+        """失去领导权时移除定时任务（正在执行的任务会继续跑完）"""
+        for job_id in (CRAWL_JOB_ID, SUMMARY_JOB_ID):
+            if self.scheduler.get_job(job_id) is not None:
+                self.scheduler.remove_job(job_id)
+        await job_manager.stop()
+        logger.info("本进程不再是领导者，已移除定时任务")
+
     async def crawl_all_sources_job(self) -> None:
         """爬取所有数据源的定时任务"""
         try:
@@ -143,13 +177,17 @@ class TaskScheduler:
             logger.error(f"定时生成摘要失败: {e}")
 
     async def trigger_manual_crawl(
-        self, source_id: str | None = None, limit: int = 30
+        self,
+        source_id: str | None = None,
+        limit: int = 30,
+        progress: Dict[str, int] | None = None,
     ) -> Dict[str, Any]:
         """
         手动触发爬取任务
 
         Args:
             source_id: 可选的特定数据源ID，为None时爬取所有源
+            progress: 可选的进度计数（后台任务传入）
 
         Returns:
             执行结果统计
@@ -161,9 +199,13 @@ class TaskScheduler:
                 logger.info(f"手动触发爬取任务，数据源: {source_id}")
                 new_items = await crawl_service.crawl_single_source(source_id, limit)
                 results = {source_id: new_items}
+                if progress is not None:
+                    progress.update(
+                        sources_total=1, sources_done=1, new_items=len(new_items)
+                    )
             else:
                 logger.info("手动触发爬取任务，所有数据源")
-                results = await crawl_service.crawl_all_sources(limit)
+                results = await crawl_service.crawl_all_sources(limit, progress)
 
             total_new_items = sum(len(items) for items in results.values())
             end_time = datetime.now()
@@ -188,10 +230,15 @@ class TaskScheduler:
                 "details": {},
             }
 
-    async def trigger_manual_summary_generation(self) -> Dict[str, Any]:
+    async def trigger_manual_summary_generation(
+        self, progress: Dict[str, int] | None = None
+    ) -> Dict[str, Any]:
         """
         手动触发摘要生成任务
 
+        Args:
+            progress: 可选的进度计数（后台任务传入），已有生成循环在运行时等待其结束
+
         Returns:
             执行结果统计
         """
@@ -199,7 +246,7 @@ class TaskScheduler:
             logger.info("手动触发摘要生成任务")
             start_time = datetime.now()
 
-            await summary_generator.start_generation_cycle()
+            await summary_generator.start_generation_cycle(progress)
 
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
@@ -219,6 +266,23 @@ class TaskScheduler:
                 "message": "Summary generation failed",
             }
 
+    async def _run_crawl_job(
+        self, params: Dict[str, Any], progress: Dict[str, int]
+    ) -> Dict[str, Any]:
+        return await self.trigger_manual_crawl(
+            params.get("source_id"), params.get("limit", 30), progress
+        )
+
+    async def _run_summaries_job(
+        self, params: Dict[str, Any], progress: Dict[str, int]
+    ) -> Dict[str, Any]:
+        return await self.trigger_manual_summary_generation(progress)
+
+    async def _run_backlog_job(
+        self, params: Dict[str, Any], progress: Dict[str, int]
+    ) -> Dict[str, Any]:
+        return await backlog_processor.run(params.get("limit"))
+
     def get_job_status(self) -> Dict[str, Any]:
         """获取任务状态信息"""
         jobs: list[dict[str, Any]] = []
@@ -237,6 +301,8 @@ class TaskScheduler:
         return {
             "scheduler_running": self.scheduler.running,
             "jobs": jobs,
+            "summary_concurrency": summary_generator.limiter.snapshot(),
+            "leader": scheduler_leader.snapshot(),
             "configuration": {
                 "crawl_scheduler_enabled": self.settings.enable_crawl_scheduler,
                 "summary_scheduler_enabled": self.settings.enable_summary_scheduler,
@@ -5,145 +5,579 @@
 """
 
 import asyncio
-from datetime import datetime, timezone
-from typing import Any, List, Optional
-
-from sqlalchemy import func, select, update
+import math
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from sqlalchemy import CursorResult, func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.concurrency import AIMDConcurrencyLimiter
 from ..core.config import get_settings
+from ..core.events import ITEMS_CREATED, event_bus
 from ..core.database import AsyncSessionLocal
 from ..core.logging import get_logger
 from ..models.item import Item
-from ..models.summary import Summary, SummaryStatus
+from ..models.summary import Summary, SummaryMode, SummaryStatus
+from ..services.dedup import propagate_to_duplicates, release_duplicates
+from ..services.raw_response_store import raw_response_store
+from ..services.retry_policy import retry_due, schedule_retry
+from ..services.summary_cache import summary_cache
+from ..services.summary_filter import summary_filter
+from ..services.summary_priority import compute_priority, priority_for_item
 from ..services.summary_service import summary_service
+from .backlog_processor import backlog_processor
 
 logger = get_logger(__name__)
 
+# 只翻译标题时单次请求合并的文章数
+TITLE_BATCH_SIZE = 20
+
 
 class SummaryGenerator:
     """异步摘要生成器"""
 
-    def __init__(self):
+    def __init__(self) -> None:
         self.settings = get_settings()
-        # 使用信号量控制并发度
-        self.semaphore = asyncio.Semaphore(self.settings.summary_concurrency)
+        # 根据上游 429 反馈自适应调整并发度
+        self.limiter = AIMDConcurrencyLimiter(
+            initial_limit=self.settings.summary_concurrency,
+            min_limit=self.settings.summary_concurrency_min,
+            max_limit=self.settings.summary_concurrency_max,
+        )
         self.is_running = False
+        # 运行期间再次被触发时，本轮结束后立即补跑一轮
+        self._rerun_requested = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # 手动任务的进度计数；运行中挂上来的任务从补跑的下一轮开始计数
+        self._progress: List[Dict[str, int]] = []
+        self._pending_progress: List[Dict[str, int]] = []
+        self._consumer_task: Optional["asyncio.Task[None]"] = None
+
+        # 每日配额令牌桶：按 每日配额/天 的速率恢复，容量为一个调度间隔的份额，
+        # 事件触发的多轮生成共享同一份配额节奏
+        self._quota_tokens: Optional[float] = None
+        self._quota_refilled_at = 0.0
+
+    def start_event_consumer(self) -> None:
+        """订阅新文章入库事件，收到后立即启动摘要生成"""
+        if self._consumer_task is not None and not self._consumer_task.done():
+            return
+        queue = event_bus.subscribe(ITEMS_CREATED)
+        self._consumer_task = asyncio.create_task(self._consume_item_events(queue))
+        logger.info("Summary generator subscribed to item ingestion events")
 
-    async def start_generation_cycle(self) -> None:
-        """启动一轮摘要生成循环"""
-        if self.is_running:
-            logger.info("Summary generation already running, skipping")
+    async def stop_event_consumer(self) -> None:
+        """停止事件消费"""
+        if self._consumer_task is None:
             return
+        self._consumer_task.cancel()
+        try:
+            await self._consumer_task
+        except asyncio.CancelledError:
+            pass
+        self._consumer_task = None
+
+    async def _consume_item_events(self, queue: "asyncio.Queue[List[int]]") -> None:
+        """消费新文章事件，短时间内的多次通知合并为一轮生成"""
+        try:
+            while True:
+                item_ids = await queue.get()
+                # 稍作等待，合并同一次爬取中多个数据源的通知
+                await asyncio.sleep(self.settings.summary_event_debounce_seconds)
+                count = len(item_ids)
+                while not queue.empty():
+                    count += len(queue.get_nowait())
+
+                logger.info(f"{count} new items ingested, starting summary generation")
+                try:
+                    await self.start_generation_cycle()
+                except Exception as e:
+                    logger.error(f"Event-triggered summary generation failed: {e}")
+        finally:
+            event_bus.unsubscribe(ITEMS_CREATED, queue)
 
-        self.is_running = True
+    async def start_generation_cycle(
+        self, progress: Optional[Dict[str, int]] = None
+    ) -> None:
+        """
+        启动一轮摘要生成循环
+
+        Args:
+            progress: 进度计数（手动任务传入）。已有循环在运行时挂到该循环上，
+                等它（包括补跑的一轮）结束后再返回
+        """
+        try:
+            if self.is_running:
+                self._rerun_requested = True
+                logger.info("Summary generation already running, rerun scheduled")
+                if progress is not None:
+                    self._pending_progress.append(progress)
+                    await self._idle.wait()
+                return
+
+            if progress is not None:
+                self._progress.append(progress)
+            self.is_running = True
+            self._idle.clear()
+            try:
+                while True:
+                    self._rerun_requested = False
+                    self._progress.extend(self._pending_progress)
+                    self._pending_progress.clear()
+                    await self._run_generation_cycle()
+                    if not self._rerun_requested:
+                        break
+            finally:
+                self.is_running = False
+                self._idle.set()
+        finally:
+            # 按对象身份移除，不同任务的进度字典可能内容相同
+            if progress is not None:
+                for trackers in (self._progress, self._pending_progress):
+                    trackers[:] = [p for p in trackers if p is not progress]
+
+    def _add_progress(self, **counts: int) -> None:
+        for progress in self._progress:
+            for key, value in counts.items():
+                progress[key] = progress.get(key, 0) + value
+
+    async def _run_generation_cycle(self) -> None:
+        """执行一轮摘要生成"""
+        requests_before = summary_service.request_count
+        self._add_progress(cycles=1)
         try:
             logger.info("Starting summary generation cycle")
+            await self._reclaim_stale_claims()
+
+            # 按本轮配额决定处理多少篇，优先级最高的先处理
+            budget = self._cycle_request_budget()
+            if budget == 0:
+                logger.info("No request budget left, skipping summary generation")
+                return
 
             async with AsyncSessionLocal() as session:
+                # 只翻译标题的任务多篇合并为一次请求，先处理
+                title_only_ids = await self._get_pending_summaries(
+                    session,
+                    None if budget is None else budget * TITLE_BATCH_SIZE,
+                    mode=SummaryMode.TITLE_ONLY,
+                )
+                if budget is not None:
+                    budget -= math.ceil(len(title_only_ids) / TITLE_BATCH_SIZE)
+
                 # 获取待处理的摘要任务
-                pending_summaries = await self._get_pending_summaries(session)
+                pending_summaries: List[int] = []
+                if budget != 0:
+                    pending_summaries = await self._get_pending_summaries(
+                        session, self._budget_to_item_limit(budget)
+                    )
 
-                if not pending_summaries:
+                if not pending_summaries and not title_only_ids:
                     logger.info("No pending summaries found")
                     return
 
-                logger.info(f"Found {len(pending_summaries)} pending summaries")
-
+                logger.info(
+                    f"Found {len(pending_summaries)} pending summaries and "
+                    f"{len(title_only_ids)} title-only tasks"
+                )
+                self._add_progress(planned=len(pending_summaries) + len(title_only_ids))
+
+            results: List[Any] = []
+            if title_only_ids:
+                results.extend(await self._generate_title_only(title_only_ids))
+                self._record_results(results)
+
+            if pending_summaries and self.settings.summary_batch_enabled:
+                # 批量模式：多篇文章合并到一次请求
+                batch_results = await self._generate_in_batches(pending_summaries)
+                self._record_results(batch_results)
+                results.extend(batch_results)
+            elif pending_summaries:
                 # 并发生成摘要
                 tasks = [
                     self._generate_single_summary(summary_id)
                     for summary_id in pending_summaries
                 ]
+                single_results = await asyncio.gather(*tasks, return_exceptions=True)
+                self._record_results(single_results)
+                results.extend(single_results)
 
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # 统计结果
-                success_count = sum(1 for r in results if r is True)
-                error_count = sum(1 for r in results if isinstance(r, Exception))
+            # 统计结果
+            success_count = sum(1 for r in results if r is True)
+            error_count = sum(1 for r in results if isinstance(r, Exception))
 
-                logger.info(
-                    f"Generation cycle completed: {success_count} success, {error_count} errors"
-                )
+            logger.info(
+                f"Generation cycle completed: {success_count} success, {error_count} errors"
+            )
 
         except Exception as e:
             logger.error(f"Error in summary generation cycle: {e}")
         finally:
-            self.is_running = False
+            used = summary_service.request_count - requests_before
+            self._add_progress(requests=used)
+            if self._quota_tokens is not None:
+                self._quota_tokens = max(0.0, self._quota_tokens - used)
+
+    async def _reclaim_stale_claims(self) -> None:
+        """
+        回收进程中断遗留的进行中任务
+
+        领取后进程崩溃或重启时，任务会一直停留在进行中。started_at 超过
+        summary_claim_timeout_minutes 的任务放回队列（未完成的离线批处理任务领取的除外），
+        不计入重试次数。
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            minutes=self.settings.summary_claim_timeout_minutes
+        )
+        reclaimed = 0
+        async with AsyncSessionLocal() as session:
+            held = await backlog_processor.held_summary_ids(session)
+            # 重试过的任务恢复为失败，保留退避时间；否则恢复为待处理
+            for status, retried in (
+                (SummaryStatus.PENDING, Summary.retry_count == 0),
+                (SummaryStatus.FAILED, Summary.retry_count > 0),
+            ):
+                stmt = (
+                    update(Summary)
+                    .where(Summary.status == SummaryStatus.IN_PROGRESS)
+                    .where((Summary.started_at < cutoff) | Summary.started_at.is_(None))
+                    .where(retried)
+                    .values(status=status)
+                )
+                if held:
+                    stmt = stmt.where(Summary.id.not_in(held))
+                result = cast(CursorResult[Any], await session.execute(stmt))
+                reclaimed += result.rowcount
+            await session.commit()
+        if reclaimed:
+            logger.warning(f"Reclaimed {reclaimed} stale in-progress summaries")
+
+    def _record_results(self, results: List[Any]) -> None:
+        succeeded = sum(1 for r in results if r is True)
+        self._add_progress(succeeded=succeeded, failed=len(results) - succeeded)
+
+    def _cycle_request_budget(self) -> Optional[int]:
+        """
+        计算本轮最多发起的 Gemini 请求数
+
+        启用配额平摊时，按令牌桶把每日配额平摊到一天中，避免配额在早上就被
+        低分文章耗尽；同时不超过剩余的每日配额。None 表示不限制。
+        """
+        budget = summary_service.remaining_daily_quota()
+        if budget is not None and self.settings.summary_quota_pacing_enabled:
+            budget = min(budget, int(self._refill_quota_tokens()))
+
+        if budget is not None:
+            logger.info(f"Summary request budget for this cycle: {budget}")
+        return budget
+
+    def _refill_quota_tokens(self) -> float:
+        """按流逝时间补充配额令牌，返回当前令牌数"""
+        per_day = self.settings.ai_rate_limit_per_day
+        capacity = math.ceil(per_day * self.settings.crawl_interval_minutes / (24 * 60))
+        now = time.monotonic()
+        if self._quota_tokens is None:
+            self._quota_tokens = float(capacity)
+        else:
+            elapsed = now - self._quota_refilled_at
+            self._quota_tokens = min(
+                float(capacity), self._quota_tokens + elapsed * per_day / 86400
+            )
+        self._quota_refilled_at = now
+        return self._quota_tokens
+
+    def _budget_to_item_limit(self, budget: Optional[int]) -> Optional[int]:
+        """将请求数换算为本轮最多处理的摘要数"""
+        if budget is None:
+            return None
+        if self.settings.summary_batch_enabled:
+            # 批量模式下一个请求可以处理多篇文章
+            return budget * summary_service.batch_sizer.next_size()
+        return budget
 
-    async def _get_pending_summaries(self, session: AsyncSession) -> List[int]:
-        """获取待处理的摘要ID列表"""
+    async def _get_pending_summaries(
+        self,
+        session: AsyncSession,
+        limit: Optional[int] = None,
+        mode: SummaryMode = SummaryMode.FULL,
+    ) -> List[int]:
+        """获取待处理的摘要ID列表（按优先级从高到低）"""
         stmt = (
             select(Summary.id)
             .where(Summary.status.in_([SummaryStatus.PENDING, SummaryStatus.FAILED]))
             .where(Summary.retry_count < Summary.max_retries)
-            .order_by(Summary.created_at)
+            .where(Summary.mode == mode.value)
+            .where(retry_due())
+            .order_by(Summary.priority.desc(), Summary.created_at)
         )
+        if limit is not None:
+            stmt = stmt.limit(limit)
 
         result = await session.execute(stmt)
         return [row[0] for row in result.fetchall()]
 
     async def _generate_single_summary(self, summary_id: int) -> bool:
         """生成单个摘要（带并发控制）"""
-        async with self.semaphore:
+        async with self.limiter.slot() as epoch:
             logger.info(f"Generating summary for {summary_id}")
+            throttles_before = summary_service.throttle_count
             result = await self._process_summary(summary_id)
+            await self._report_throttling(epoch, throttles_before)
+            await self._rate_limit_delay()
+            return result
 
-            # 为了避免突破速率限制，在任务之间添加短暂延迟
-            # 当前配置为每分钟10个请求，所以至少间隔6秒
-            if self.settings.ai_enable_rate_limiting:
-                delay = 60 / self.settings.ai_rate_limit_per_minute + 1  # 添加1秒缓冲
-                logger.debug(f"Waiting {delay} seconds before next summary generation")
-                await asyncio.sleep(delay)
+    async def _report_throttling(self, epoch: int, throttles_before: int) -> None:
+        """根据调用期间是否遇到上游限流调整并发上限"""
+        if summary_service.throttle_count > throttles_before:
+            await self.limiter.record_throttle(epoch)
+        else:
+            await self.limiter.record_success()
+
+    async def _rate_limit_delay(self) -> None:
+        """为了避免突破速率限制，在任务之间添加短暂延迟"""
+        # 当前配置为每分钟10个请求，所以至少间隔6秒
+        if self.settings.ai_enable_rate_limiting:
+            delay = 60 / self.settings.ai_rate_limit_per_minute + 1  # 添加1秒缓冲
+            logger.debug(f"Waiting {delay} seconds before next summary generation")
+            await asyncio.sleep(delay)
+
+    async def _generate_in_batches(self, summary_ids: List[int]) -> List[bool]:
+        """按自适应批大小分批生成摘要，每取一批都重新计算批大小"""
+        queue = deque(summary_ids)
+        outcomes: dict[int, bool] = {}
+
+        async def worker() -> None:
+            while queue:
+                size = summary_service.batch_sizer.next_size()
+                batch = [queue.popleft() for _ in range(min(size, len(queue)))]
+                try:
+                    results = await self._generate_batch(batch)
+                except Exception as e:
+                    logger.error(f"Error generating summary batch {batch}: {e}")
+                    results = [False] * len(batch)
+                outcomes.update(zip(batch, results, strict=True))
+
+        # 实际并发由 limiter 控制，按上限启动 worker
+        workers = self.limiter.max_limit
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        return [outcomes.get(summary_id, False) for summary_id in summary_ids]
+
+    async def _generate_batch(self, summary_ids: List[int]) -> List[bool]:
+        """生成一批摘要（带并发控制），响应中缺失的条目回退为单条重试"""
+        # 抓取正文不占用并发名额，拿到名额后只剩 Gemini 调用
+        article_texts = await self._fetch_article_texts(summary_ids)
+        async with self.limiter.slot() as epoch:
+            logger.info(f"Generating batch summaries for {summary_ids}")
+            throttles_before = summary_service.throttle_count
+            outcomes = await self._process_summary_batch(summary_ids, article_texts)
+            await self._report_throttling(epoch, throttles_before)
+            await self._rate_limit_delay()
+
+        fallback_ids = [sid for sid, ok in outcomes.items() if ok is None]
+        if fallback_ids:
+            logger.info(
+                f"Falling back to single-item generation for {len(fallback_ids)} "
+                f"summaries: {fallback_ids}"
+            )
+        for summary_id in fallback_ids:
+            outcomes[summary_id] = await self._generate_single_summary(summary_id)
 
-            return result
+        return [bool(outcomes.get(summary_id)) for summary_id in summary_ids]
 
-    async def _process_summary(self, summary_id: int) -> bool:
-        """处理单个摘要生成"""
+    async def _fetch_article_texts(self, summary_ids: List[int]) -> Dict[int, str]:
+        """并发抓取一批摘要对应文章的正文（文章ID -> 正文），失败时返回空字典"""
+        if not self.settings.summary_local_fetch_enabled:
+            return {}
         try:
             async with AsyncSessionLocal() as session:
-                # 获取摘要记录和关联的文章
                 stmt = (
-                    select(Summary, Item)
-                    .join(Item, Summary.item_id == Item.id)
-                    .where(Summary.id == summary_id)
+                    select(Item)
+                    .join(Summary, Summary.item_id == Item.id)
+                    .where(Summary.id.in_(summary_ids))
                 )
-                result = await session.execute(stmt)
-                row = result.first()
+                items = list((await session.execute(stmt)).scalars())
+            return await summary_service.fetch_batch_texts(items)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch article texts for {summary_ids}: {e}")
+            return {}
+
+    async def _generate_title_only(self, summary_ids: List[int]) -> List[bool]:
+        """只翻译标题，每 TITLE_BATCH_SIZE 篇合并为一次请求"""
+        results: List[bool] = []
+        for start in range(0, len(summary_ids), TITLE_BATCH_SIZE):
+            chunk = summary_ids[start : start + TITLE_BATCH_SIZE]
+            async with self.limiter.slot() as epoch:
+                throttles_before = summary_service.throttle_count
+                try:
+                    results.extend(await self._process_title_only(chunk))
+                except Exception as e:
+                    logger.error(f"Error translating titles for {chunk}: {e}")
+                    results.extend([False] * len(chunk))
+                await self._report_throttling(epoch, throttles_before)
+                await self._rate_limit_delay()
+        return results
+
+    async def _process_title_only(self, summary_ids: List[int]) -> List[bool]:
+        """处理一批只翻译标题的任务（领取、调用、写回三个阶段）"""
+        # 阶段一：领取
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(Summary, Item)
+                .join(Item, Summary.item_id == Item.id)
+                .where(Summary.id.in_(summary_ids))
+                .where(Summary.retry_count < Summary.max_retries)
+            )
+            claimed: List[Tuple[Summary, Item]] = []
+            started_at = datetime.now(timezone.utc)
+            for summary, item in (await session.execute(stmt)).all():
+                if await self._try_claim(session, summary, started_at):
+                    claimed.append((summary, item))
+            await session.commit()
 
-                if not row:
-                    logger.error(f"Summary {summary_id} not found")
-                    return False
+        if not claimed:
+            return []
 
-                summary, item = row
+        # 阶段二：调用 Gemini（不持有数据库会话）
+        try:
+            results = await summary_service.translate_titles(
+                [item for _, item in claimed]
+            )
+        except Exception as e:
+            # 已领取的行必须写回失败，否则会一直停留在 IN_PROGRESS
+            logger.error(f"Error translating titles {summary_ids}: {e}")
+            results = [(False, {"error": str(e)}) for _ in claimed]
+
+        # 阶段三：写回
+        outcomes: List[bool] = []
+        async with AsyncSessionLocal() as session:
+            for (summary, _), (success, result_data) in zip(
+                claimed, results, strict=True
+            ):
+                if success:
+                    # 同簇重复文章的正文复制自代表文章，这里只写入翻译的标题
+                    result_data = {**result_data, "content": summary.content}
+                    await self._update_summary_success(session, summary, result_data)
+                else:
+                    await self._update_summary_failure(session, summary, result_data)
+                outcomes.append(success)
+        logger.info(f"Translated {sum(outcomes)}/{len(claimed)} titles")
+        return outcomes
+
+    async def _process_summary_batch(
+        self,
+        summary_ids: List[int],
+        article_texts: Optional[Dict[int, str]] = None,
+    ) -> dict[int, Optional[bool]]:
+        """
+        处理一批摘要生成
+
+        与单条路径一样分为领取、调用、写回三个阶段，调用 Gemini 期间不持有数据库连接。
+
+        整个请求失败时（异常、429、配额耗尽、响应无法解析）按失败处理，计入重试次数并
+        按错误类型退避，不回退为单条调用——否则一次限流会放大为 N 次单条请求。
+
+        Returns:
+            摘要ID -> 结果 (True 成功, False 失败, None 需要单条重试)
+        """
+        outcomes: dict[int, Optional[bool]] = {}
+
+        # 阶段一：领取
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(Summary, Item)
+                .join(Item, Summary.item_id == Item.id)
+                .where(Summary.id.in_(summary_ids))
+                .where(
+                    Summary.status.in_([SummaryStatus.PENDING, SummaryStatus.FAILED])
+                )
+                .where(Summary.retry_count < Summary.max_retries)
+                .where(retry_due())
+            )
+            rows = (await session.execute(stmt)).all()
+            found = {summary.id for summary, _ in rows}
+            for summary_id in summary_ids:
+                if summary_id not in found:
+                    outcomes[summary_id] = None  # 交给单条路径处理状态检查
+
+            # 命中内容缓存的条目不进入批次
+            claimed: List[Tuple[Summary, Item]] = []
+            # 记录原状态，响应中缺失的条目恢复后再单条重试，不计入重试次数
+            original_status: dict[int, SummaryStatus] = {}
+            started_at = datetime.now(timezone.utc)
+            for summary, item in rows:
+                if await self._apply_cached_summary(session, summary, item):
+                    outcomes[summary.id] = True
+                    continue
+                status = summary.status
+                if await self._try_claim(session, summary, started_at):
+                    original_status[summary.id] = status
+                    claimed.append((summary, item))
+                else:
+                    outcomes[summary.id] = True  # 已被其他任务领取
+            await session.commit()
 
-                # 检查状态是否可以处理
-                if summary.status not in [SummaryStatus.PENDING, SummaryStatus.FAILED]:
-                    logger.info(
-                        f"Summary {summary_id} status is {summary.status}, skipping"
+        if not claimed:
+            return outcomes
+
+        # 阶段二：调用 Gemini（不持有数据库会话）
+        try:
+            results = await summary_service.generate_summaries_batch(
+                [item for _, item in claimed], article_texts
+            )
+        except Exception as e:
+            logger.error(f"Error processing summary batch {summary_ids}: {e}")
+            results = [(False, {"error": str(e)}) for _ in claimed]
+
+        # 阶段三：写回
+        async with AsyncSessionLocal() as session:
+            for (summary, item), (success, result_data) in zip(
+                claimed, results, strict=True
+            ):
+                if success:
+                    await self._store_in_cache(session, summary, item, result_data)
+                    await self._update_summary_success(session, summary, result_data)
+                    outcomes[summary.id] = True
+                    logger.info(f"Successfully generated summary for item {item.id}")
+                elif result_data.get("batch_missing"):
+                    await self._update_summary_status(
+                        session, summary, status=original_status[summary.id]
                     )
-                    return True
+                    outcomes[summary.id] = None
+                else:
+                    await self._update_summary_failure(session, summary, result_data)
+                    outcomes[summary.id] = False
+            await session.commit()
 
-                # 检查重试次数
-                if summary.retry_count >= summary.max_retries:
-                    await self._mark_permanently_failed(session, summary)
-                    return False
+        return outcomes
 
-                # 更新状态为进行中
-                await self._update_summary_status(
-                    session,
-                    summary,
-                    status=SummaryStatus.IN_PROGRESS,
-                    started_at=datetime.now(timezone.utc),
-                )
-                await session.commit()
+    async def _process_summary(self, summary_id: int) -> bool:
+        """
+        处理单个摘要生成
 
-                # 生成摘要
-                async with summary_service:
-                    success, result_data = await summary_service.generate_summary(item)
+        分为领取、调用、写回三个阶段，每个阶段使用独立的短会话，
+        调用 Gemini 的几十秒内不持有数据库连接，避免阻塞爬虫入库和 API 读取。
+        """
+        try:
+            # 阶段一：领取
+            claimed, outcome = await self._claim_summary(summary_id)
+            if claimed is None:
+                return outcome
+            summary, item = claimed
+
+            # 阶段二：生成摘要（不持有数据库会话）
+            success, result_data = await summary_service.generate_summary(item)
 
+            # 阶段三：写回
+            async with AsyncSessionLocal() as session:
                 if success:
-                    # 成功：更新摘要内容
+                    # 成功：写入内容缓存并更新摘要内容
+                    await self._store_in_cache(session, summary, item, result_data)
                     await self._update_summary_success(session, summary, result_data)
                     logger.info(f"Successfully generated summary for item {item.id}")
                     return True
@@ -171,6 +605,111 @@ class SummaryGenerator:
                 )
             return False
 
+    async def _claim_summary(
+        self, summary_id: int
+    ) -> Tuple[Optional[Tuple[Summary, Item]], bool]:
+        """
+        领取单个摘要任务并标记为进行中
+
+        Returns:
+            (领取到的 (Summary, Item)，未领取时为 None, 未领取时的处理结果)
+        """
+        async with AsyncSessionLocal() as session:
+            # 获取摘要记录和关联的文章
+            stmt = (
+                select(Summary, Item)
+                .join(Item, Summary.item_id == Item.id)
+                .where(Summary.id == summary_id)
+            )
+            result = await session.execute(stmt)
+            row = result.first()
+
+            if not row:
+                logger.error(f"Summary {summary_id} not found")
+                return None, False
+
+            summary, item = row
+
+            # 检查状态是否可以处理
+            if summary.status not in [SummaryStatus.PENDING, SummaryStatus.FAILED]:
+                logger.info(
+                    f"Summary {summary_id} status is {summary.status}, skipping"
+                )
+                return None, True
+
+            # 检查重试次数
+            if summary.retry_count >= summary.max_retries:
+                await self._mark_permanently_failed(session, summary)
+                return None, False
+
+            # 命中内容缓存时直接复用，不调用 Gemini
+            if await self._apply_cached_summary(session, summary, item):
+                return None, True
+
+            # 更新状态为进行中
+            if not await self._try_claim(session, summary, datetime.now(timezone.utc)):
+                logger.info(f"Summary {summary_id} already claimed, skipping")
+                return None, True
+            await session.commit()
+
+            # expire_on_commit=False，会话关闭后对象仍可读取
+            return (summary, item), True
+
+    async def _try_claim(
+        self, session: AsyncSession, summary: Summary, started_at: datetime
+    ) -> bool:
+        """条件更新领取任务，状态已被其他任务修改时返回 False（由调用方提交事务）"""
+        stmt = (
+            update(Summary)
+            .where(Summary.id == summary.id)
+            .where(Summary.status.in_([SummaryStatus.PENDING, SummaryStatus.FAILED]))
+            .values(status=SummaryStatus.IN_PROGRESS, started_at=started_at)
+        )
+        # UPDATE 语句返回的是 CursorResult，才有 rowcount
+        result = cast(CursorResult[Any], await session.execute(stmt))
+        return result.rowcount == 1
+
+    async def _apply_cached_summary(
+        self, session: AsyncSession, summary: Summary, item: Item
+    ) -> bool:
+        """
+        查找内容缓存，命中时复用正文并返回 True
+
+        摘要改为只翻译标题的任务，并安排补跑一轮生成翻译标题。
+        """
+        entry = await summary_cache.reuse_content(
+            session, summary.id, item.url, self.settings.gemini_model, summary.lang
+        )
+        if entry is None:
+            return False
+
+        await session.commit()
+        self._rerun_requested = True
+        logger.info(
+            f"Reused cached summary content for item {item.id} "
+            f"(source summary {entry.source_summary_id}), title pending translation"
+        )
+        return True
+
+    async def _store_in_cache(
+        self,
+        session: AsyncSession,
+        summary: Summary,
+        item: Item,
+        result_data: dict[str, Any],
+    ) -> None:
+        """将新生成的摘要写入内容缓存（按实际调用的模型区分）"""
+        response_json = result_data.get("response_json") or {}
+        await summary_cache.store(
+            session,
+            item.url,
+            response_json.get("model_used") or self.settings.gemini_model,
+            summary.lang,
+            result_data.get("content"),
+            result_data.get("translated_title"),
+            source_summary_id=summary.id,
+        )
+
     async def _update_summary_status(
         self,
         session: AsyncSession,
@@ -201,12 +740,22 @@ class SummaryGenerator:
                 completed_at=now,
                 generation_duration_ms=result_data.get("generation_duration_ms"),
                 url_retrieval_status=result_data.get("url_retrieval_status"),
-                response_json=result_data.get("response_json"),
+                prompt_tokens=result_data.get("prompt_tokens"),
+                output_tokens=result_data.get("output_tokens"),
+                total_tokens=result_data.get("total_tokens"),
                 error_message=None,  # 清除之前的错误信息
                 error_type=None,
+                next_retry_at=None,
             )
         )
         await session.execute(stmt)
+        await raw_response_store.save(
+            session, summary.id, result_data.get("response_json")
+        )
+        # 同簇的重复文章共享这份摘要的正文
+        await propagate_to_duplicates(
+            session, summary.item_id, result_data.get("content")
+        )
         await session.commit()
 
     async def _update_summary_failure(
@@ -215,12 +764,12 @@ class SummaryGenerator:
         """更新摘要失败状态"""
         now = datetime.now(timezone.utc)
         new_retry_count = summary.retry_count + 1
+        error_type = self._classify_error(result_data.get("error", ""))
 
-        # 判断是否达到最大重试次数
-        if new_retry_count >= summary.max_retries:
-            status = SummaryStatus.PERMANENTLY_FAILED
-        else:
-            status = SummaryStatus.FAILED
+        # 按错误类型退避，达到最大重试次数（或内容错误提前放弃）时永久失败
+        status, next_retry_at = schedule_retry(
+            error_type, new_retry_count, summary.max_retries, now
+        )
 
         stmt = (
             update(Summary)
@@ -229,13 +778,19 @@ class SummaryGenerator:
                 status=status,
                 retry_count=new_retry_count,
                 last_retry_at=now,
+                next_retry_at=next_retry_at,
                 error_message=result_data.get("error"),
-                error_type=self._classify_error(result_data.get("error", "")),
+                error_type=error_type,
                 generation_duration_ms=result_data.get("generation_duration_ms"),
-                response_json=result_data.get("response_json"),
             )
         )
         await session.execute(stmt)
+        await raw_response_store.save(
+            session, summary.id, result_data.get("response_json")
+        )
+        if status == SummaryStatus.PERMANENTLY_FAILED:
+            # 等待共享这份摘要的重复文章改为各自生成
+            await release_duplicates(session, summary.item_id)
         await session.commit()
 
     async def _mark_permanently_failed(
@@ -248,13 +803,20 @@ class SummaryGenerator:
             .values(status=SummaryStatus.PERMANENTLY_FAILED)
         )
         await session.execute(stmt)
+        await release_duplicates(session, summary.item_id)
         await session.commit()
 
     def _classify_error(self, error_message: str) -> str:
         """分类错误类型"""
         error_lower = error_message.lower()
 
-        if "timeout" in error_lower or "connection" in error_lower:
+        if (
+            "429" in error_lower
+            or "rate limit" in error_lower
+            or "quota" in error_lower
+        ):
+            return "RATE_LIMIT_ERROR"
+        elif "timeout" in error_lower or "connection" in error_lower:
             return "NETWORK_ERROR"
         elif "api key" in error_lower or "unauthorized" in error_lower:
             return "AUTH_ERROR"
@@ -282,19 +844,34 @@ class SummaryGenerator:
                     logger.info(f"Summary already exists for item {item_id}")
                     return None
 
+                item = await session.get(Item, item_id)
+                if item is None:
+                    logger.error(f"Item {item_id} not found")
+                    return None
+
+            # 过滤规则可能发送 HEAD 请求，不持有数据库会话
+            decision = await summary_filter.classify(item.title, item.url)
+
+            async with AsyncSessionLocal() as session:
                 # 创建新摘要任务
                 summary = Summary(
                     item_id=item_id,
                     model=model,
                     lang=lang,
-                    status=SummaryStatus.PENDING,
                     created_at=func.now(),
                     retry_count=0,
                     max_retries=self.settings.ai_summary_max_retries,
+                    priority=priority_for_item(item),
+                    **decision.summary_fields(),
                 )
 
                 session.add(summary)
-                await session.commit()
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    # 分类期间其他请求已为该文章创建了摘要（item_id 唯一）
+                    logger.info(f"Summary already exists for item {item_id}")
+                    return None
                 await session.refresh(summary)
 
                 logger.info(f"Created summary task {summary.id} for item {item_id}")
@@ -318,46 +895,76 @@ class SummaryGenerator:
             async with AsyncSessionLocal() as session:
                 # 查找所有没有摘要的文章
                 subquery = select(Summary.id).where(Summary.item_id == Item.id).exists()
-                stmt = select(Item.id).where(~subquery)
+                stmt = select(
+                    Item.id,
+                    Item.title,
+                    Item.url,
+                    Item.source_id,
+                    Item.score,
+                    Item.comments_count,
+                    Item.created_at,
+                ).where(~subquery)
 
                 # 如果指定了数据源，只处理该数据源的文章
                 if source_id:
                     stmt = stmt.where(Item.source_id == source_id)
 
                 result = await session.execute(stmt)
-                missing_item_ids = [row[0] for row in result.fetchall()]
-
-                if not missing_item_ids:
-                    logger.info("未找到没有摘要的文章")
-                    return {"created_count": 0, "total_missing": 0}
-
-                logger.info(f"找到 {len(missing_item_ids)} 篇文章没有摘要")
-
-                # 批量创建摘要任务
-                summary_tasks: List[Summary] = []
-                for item_id in missing_item_ids:
-                    summary = Summary(
-                        item_id=item_id,
-                        model=model,
-                        lang=lang,
-                        status=SummaryStatus.PENDING,
-                        created_at=func.now(),
-                        retry_count=0,
-                        max_retries=self.settings.ai_summary_max_retries,
-                    )
-                    summary_tasks.append(summary)
+                missing_items = result.fetchall()
+                missing_item_ids = [row.id for row in missing_items]
 
+            if not missing_item_ids:
+                logger.info("未找到没有摘要的文章")
+                return {"created_count": 0, "total_missing": 0}
+
+            logger.info(f"找到 {len(missing_item_ids)} 篇文章没有摘要")
+
+            # 按过滤规则决定跳过、只翻译标题还是完整摘要（可能发送 HEAD 请求，
+            # 此时不持有数据库会话）
+            decisions = await summary_filter.classify_many(
+                [(row.title, row.url) for row in missing_items]
+            )
+
+            # 批量创建摘要任务
+            summary_tasks: List[Summary] = []
+            for row, decision in zip(missing_items, decisions, strict=True):
+                summary = Summary(
+                    item_id=row.id,
+                    model=model,
+                    lang=lang,
+                    created_at=func.now(),
+                    retry_count=0,
+                    max_retries=self.settings.ai_summary_max_retries,
+                    priority=compute_priority(
+                        row.source_id,
+                        row.score,
+                        row.comments_count,
+                        row.created_at,
+                    ),
+                    **decision.summary_fields(),
+                )
+                summary_tasks.append(summary)
+
+            async with AsyncSessionLocal() as session:
+                # 分类期间其他任务可能已为部分文章创建了摘要
+                result = await session.execute(
+                    select(Summary.item_id).where(Summary.item_id.in_(missing_item_ids))
+                )
+                existing_ids = set(result.scalars())
+                summary_tasks = [
+                    task for task in summary_tasks if task.item_id not in existing_ids
+                ]
                 session.add_all(summary_tasks)
                 await session.commit()
 
-                created_count = len(summary_tasks)
-                logger.info(f"创建了 {created_count} 个摘要任务")
+            created_count = len(summary_tasks)
+            logger.info(f"创建了 {created_count} 个摘要任务")
 
-                return {
-                    "created_count": created_count,
-                    "total_missing": len(missing_item_ids),
-                    "source_id": source_id,
-                }
+            return {
+                "created_count": created_count,
+                "total_missing": len(missing_item_ids),
+                "source_id": source_id,
+            }
 
         except Exception as e:
             logger.error(f"创建摘要任务失败: {e}")
@@ -11,25 +11,38 @@ from app.core.database import init_db, close_db
 from app.core.logging import setup_logging
 from app.core.security import get_current_admin
 from app.schemas.common import APIResponse
+from app.services.article_extractor import article_extractor
+from app.services.genai_client_pool import chat_client_pool
+from app.services.summary_service import summary_service
 from app.tasks.scheduler import task_scheduler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """应用生命周期管理"""
+    settings = get_settings()
     # 强制重新配置所有日志器（解决 uvicorn CLI 启动的格式问题）
     setup_logging()
 
     # 启动时初始化数据库
     await init_db()
 
-    # 启动任务调度器
-    await task_scheduler.start()
+    # 创建共享的 Gemini 客户端
+    await summary_service.startup()
+
+    # 启动任务调度器（APP_MODE=api 时由 worker.py 进程运行定时任务）
+    run_scheduler = settings.app_mode != "api"
+    if run_scheduler:
+        await task_scheduler.start()
 
     yield
 
     # 关闭时清理资源
-    await task_scheduler.stop()
+    if run_scheduler:
+        await task_scheduler.stop()
+    await summary_service.shutdown()
+    await chat_client_pool.close_all()
+    await article_extractor.close()
     await close_db()
 
 
@@ -62,6 +75,7 @@ def create_app() -> FastAPI:
         allow_credentials=settings.cors_allow_credentials,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Retry-After"],  # 聊天接口繁忙时前端读取重试时间
     )
 
     @app.middleware("http")
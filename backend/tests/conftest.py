@@ -0,0 +1,149 @@
+"""
+测试公共夹具
+
+app 的配置和数据库引擎在导入时创建，因此先设置环境变量，让测试使用临时 SQLite
+数据库、关闭速率限制，再导入 app。Gemini 客户端通过 client_factory 注入假实现。
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, cast
+
+_TMP_DIR = tempfile.mkdtemp(prefix="programmer-trending-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP_DIR}/test.db"
+os.environ["GOOGLE_API_KEY"] = "test-key"
+os.environ["AI_ENABLE_RATE_LIMITING"] = "false"
+os.environ["SUMMARY_BATCH_ENABLED"] = "false"
+os.environ["SUMMARY_LOCAL_FETCH_ENABLED"] = "false"
+os.environ["LEADER_ELECTION_ENABLED"] = "false"
+os.environ["LOG_LEVEL"] = "WARNING"
+
+import pytest  # noqa: E402
+from google import genai  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models import Item, Source, Summary  # noqa: E402
+
+
+class TimedSessionFactory:
+    """包装 AsyncSessionLocal，记录每个会话的持有时长和各任务当前打开的会话数"""
+
+    def __init__(self) -> None:
+        self.hold_times: List[float] = []
+        self._open: Dict[Optional["asyncio.Task[Any]"], int] = {}
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[AsyncSession]:
+        task = asyncio.current_task()
+        started = time.monotonic()
+        self._open[task] = self._open.get(task, 0) + 1
+        try:
+            async with AsyncSessionLocal() as session:
+                yield session
+        finally:
+            self._open[task] -= 1
+            self.hold_times.append(time.monotonic() - started)
+
+    def held_by_current_task(self) -> bool:
+        return self._open.get(asyncio.current_task(), 0) > 0
+
+
+class FakeGeminiClient:
+    """
+    模拟 genai.Client
+
+    每次 generate_content 固定等待 latency 秒后返回一条合法的摘要 JSON，
+    同时记录同时进行的请求数峰值、发起调用时仍持有数据库会话的次数，以及客户端
+    被关闭的次数。
+    """
+
+    def __init__(
+        self, latency: float, sessions: Optional[TimedSessionFactory] = None
+    ) -> None:
+        self.latency = latency
+        self.sessions = sessions
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.calls_holding_session = 0
+        self.created = 0
+        self.closed = 0
+        self.aio = SimpleNamespace(models=self, aclose=self.aclose)
+
+    def factory(self) -> Callable[[str], genai.Client]:
+        """作为 GeminiSummaryService 的 client_factory 注入，记录创建次数"""
+
+        def create(api_key: str) -> genai.Client:
+            self.created += 1
+            return cast(genai.Client, self)
+
+        return create
+
+    async def aclose(self) -> None:
+        self.closed += 1
+
+    async def generate_content(self, model: str, contents: Any, config: Any) -> Any:
+        if self.sessions is not None and self.sessions.held_by_current_task():
+            self.calls_holding_session += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        self.calls += 1
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(finish_reason="STOP", grounding_metadata=None)],
+            text=json.dumps({"translated_title": "标题", "summary": "摘要内容"}),
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=100,
+                candidates_token_count=50,
+                total_token_count=150,
+            ),
+        )
+
+
+async def _reset_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture
+def database() -> Iterator[None]:
+    """每个测试使用一份空的数据库"""
+    asyncio.run(_reset_schema())
+    yield
+    asyncio.run(engine.dispose())
+
+
+async def seed_pending_summaries(count: int) -> List[int]:
+    """插入 count 篇文章及其待处理的摘要任务，返回摘要ID"""
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        session.add(Source(id="hackernews", name="Hacker News", url="https://hn"))
+        summaries = []
+        for i in range(count):
+            item = Item(
+                source_id="hackernews",
+                title=f"Article {i}",
+                url=f"https://example.com/articles/{i}",
+                external_id=str(i),
+                score=100 - i,
+                comments_count=i,
+                created_at=now,
+                fetched_at=now,
+                tags=[],
+            )
+            summary = Summary(item=item, model="gemini-2.5-flash", lang="zh-CN")
+            session.add_all([item, summary])
+            summaries.append(summary)
+        await session.commit()
+        return [summary.id for summary in summaries]
@@ -0,0 +1,120 @@
+"""
+摘要生成的并发与数据库会话占用
+
+领取、调用、写回三个阶段各自使用短会话：调用 Gemini 期间不持有数据库会话，
+多个摘要按并发上限同时调用，整体耗时接近 数量 / 并发 * 单次延迟。
+摘要生成进行中，爬虫入库新文章不需要等待 Gemini 调用结束。
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+import app.tasks.summary_generator as summary_generator_module
+from app.core.concurrency import AIMDConcurrencyLimiter
+from app.core.database import AsyncSessionLocal
+from app.crawlers.base import CrawledItem
+from app.models import Summary
+from app.models.summary import SummaryStatus
+from app.services.crawl_service import crawl_service
+from app.services.summary_service import GeminiSummaryService
+from app.tasks.summary_generator import SummaryGenerator
+
+from .conftest import FakeGeminiClient, TimedSessionFactory, seed_pending_summaries
+
+LATENCY = 0.5
+CONCURRENCY = 3
+SUMMARY_COUNT = 9
+SLOW_LATENCY = 2.0
+
+
+async def _statuses() -> list[SummaryStatus]:
+    async with AsyncSessionLocal() as session:
+        return list((await session.execute(select(Summary.status))).scalars())
+
+
+@pytest.mark.usefixtures("database")
+def test_summaries_run_concurrently_without_holding_sessions(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sessions = TimedSessionFactory()
+    client = FakeGeminiClient(LATENCY, sessions)
+    service = GeminiSummaryService(client_factory=client.factory())
+    monkeypatch.setattr(summary_generator_module, "summary_service", service)
+    monkeypatch.setattr(summary_generator_module, "AsyncSessionLocal", sessions)
+
+    generator = SummaryGenerator()
+    generator.limiter = AIMDConcurrencyLimiter(
+        initial_limit=CONCURRENCY, min_limit=1, max_limit=CONCURRENCY
+    )
+
+    async def scenario() -> float:
+        await seed_pending_summaries(SUMMARY_COUNT)
+        started = time.monotonic()
+        await generator.start_generation_cycle()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(scenario())
+
+    assert asyncio.run(_statuses()) == [SummaryStatus.COMPLETED] * SUMMARY_COUNT
+    assert client.calls == SUMMARY_COUNT
+    # 并发达到上限且不超过上限
+    assert client.peak_in_flight == CONCURRENCY
+    # 串行需要 9 * 0.5 = 4.5 秒，按 3 并发约 1.5 秒
+    assert elapsed < SUMMARY_COUNT * LATENCY / 2
+    # 调用 Gemini 时不持有数据库会话，单个会话的持有时间远小于一次调用
+    assert client.calls_holding_session == 0
+    assert sessions.hold_times
+    assert max(sessions.hold_times) < LATENCY
+
+
+@pytest.mark.usefixtures("database")
+def test_item_insert_not_blocked_by_slow_gemini_calls(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = FakeGeminiClient(SLOW_LATENCY)
+    service = GeminiSummaryService(client_factory=client.factory())
+    monkeypatch.setattr(summary_generator_module, "summary_service", service)
+
+    generator = SummaryGenerator()
+    generator.limiter = AIMDConcurrencyLimiter(
+        initial_limit=CONCURRENCY, min_limit=1, max_limit=CONCURRENCY
+    )
+
+    async def scenario() -> tuple[float, int, int]:
+        await seed_pending_summaries(CONCURRENCY)
+        cycle = asyncio.create_task(generator.start_generation_cycle())
+        # 等到所有摘要都在调用 Gemini
+        while client.in_flight < CONCURRENCY:
+            await asyncio.sleep(0.01)
+
+        started = time.monotonic()
+        new_items = await crawl_service._save_items_to_db(
+            [
+                CrawledItem(
+                    source_id="hackernews",
+                    title="New article",
+                    url="https://example.com/new",
+                    external_id="new",
+                    score=1,
+                    comments_count=0,
+                    created_at=datetime.now(timezone.utc),
+                )
+            ]
+        )
+        insert_latency = time.monotonic() - started
+        in_flight = client.in_flight
+
+        await cycle
+        return insert_latency, len(new_items), in_flight
+
+    insert_latency, inserted, in_flight = asyncio.run(scenario())
+
+    assert inserted == 1
+    # 入库完成时 Gemini 调用仍在进行，入库没有等待它们结束
+    assert in_flight == CONCURRENCY
+    assert insert_latency < SLOW_LATENCY / 4
+    assert len(asyncio.run(_statuses())) == CONCURRENCY + 1
@@ -0,0 +1,88 @@
+"""
+并发 8 的摘要生成压力测试
+
+所有并发任务共享同一个 Gemini 客户端，并发上限为 8 时同时进行的请求数达到 8
+且不超过 8；在 SQLite 写锁竞争下，调用 Gemini 期间依然不持有数据库会话。
+其中一个任务中途结束时，共享客户端不会被关闭或清空，其余任务继续使用它。
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+import app.tasks.summary_generator as summary_generator_module
+from app.core.concurrency import AIMDConcurrencyLimiter
+from app.core.database import AsyncSessionLocal
+from app.models import Item, Summary
+from app.models.summary import SummaryStatus
+from app.services.summary_service import GeminiSummaryService
+from app.tasks.summary_generator import SummaryGenerator
+
+from .conftest import FakeGeminiClient, TimedSessionFactory, seed_pending_summaries
+
+LATENCY = 0.5
+CONCURRENCY = 8
+SUMMARY_COUNT = 40
+
+
+async def _completed_count() -> int:
+    async with AsyncSessionLocal() as session:
+        stmt = select(func.count(Summary.id)).where(
+            Summary.status == SummaryStatus.COMPLETED
+        )
+        return int((await session.execute(stmt)).scalar_one())
+
+
+@pytest.mark.usefixtures("database")
+def test_concurrency_eight_shares_one_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    sessions = TimedSessionFactory()
+    client = FakeGeminiClient(LATENCY, sessions)
+    service = GeminiSummaryService(client_factory=client.factory())
+    monkeypatch.setattr(summary_generator_module, "summary_service", service)
+    monkeypatch.setattr(summary_generator_module, "AsyncSessionLocal", sessions)
+
+    generator = SummaryGenerator()
+    generator.limiter = AIMDConcurrencyLimiter(
+        initial_limit=CONCURRENCY, min_limit=1, max_limit=CONCURRENCY
+    )
+
+    async def scenario() -> tuple[bool, bool]:
+        await seed_pending_summaries(SUMMARY_COUNT)
+        cycle = asyncio.create_task(generator.start_generation_cycle())
+        while client.in_flight < CONCURRENCY:
+            await asyncio.sleep(0.01)
+
+        # 另一个只生成一篇摘要的任务在生成周期进行中结束
+        item = Item(
+            id=0,
+            source_id="hackernews",
+            title="Standalone article",
+            url="https://example.com/standalone",
+            external_id="standalone",
+            created_at=datetime.now(timezone.utc),
+        )
+        success, _ = await service.generate_summary(item)
+        client_kept = service.client is client and not cycle.done()
+
+        await cycle
+        return success, client_kept
+
+    success, client_kept = asyncio.run(scenario())
+
+    assert success
+    # 中途结束的任务没有关闭或清空共享客户端
+    assert client_kept
+    assert client.closed == 0
+    assert asyncio.run(_completed_count()) == SUMMARY_COUNT
+    assert client.calls == SUMMARY_COUNT + 1
+    # 共享客户端只创建一次
+    assert client.created == 1
+    assert client.peak_in_flight == CONCURRENCY + 1
+    assert client.calls_holding_session == 0
+
+    # 只有应用关闭时才释放共享客户端
+    asyncio.run(service.shutdown())
+    assert client.closed == 1
+    assert service.client is None
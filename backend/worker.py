@@ -0,0 +1,49 @@
+"""
+后台任务进程
+
+不启动 FastAPI，只运行定时爬取、摘要生成（TaskScheduler / CrawlService /
+SummaryGenerator）。配合 APP_MODE=api 的 API 进程使用，两者可以分别扩容：
+
+    uv run python worker.py
+
+多个 worker 同时运行时通过数据库选主，只有领导者执行定时任务，并领取 API 进程提交到
+background_jobs 表的手动任务（爬取、摘要生成、积压批处理）。
+"""
+
+import asyncio
+import signal
+
+from app.core.database import close_db, init_db
+from app.core.logging import get_logger, setup_logging
+from app.services.article_extractor import article_extractor
+from app.services.summary_service import summary_service
+from app.tasks.scheduler import task_scheduler
+
+logger = get_logger(__name__)
+
+
+async def run_worker() -> None:
+    """运行后台任务直到收到 SIGINT / SIGTERM"""
+    setup_logging()
+    await init_db()
+    await summary_service.startup()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await task_scheduler.start()
+    logger.info("Worker started, waiting for scheduled jobs")
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("Worker shutting down")
+        await task_scheduler.stop()
+        await summary_service.shutdown()
+        await article_extractor.close()
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -45,6 +45,11 @@ export default function DiscussionListModal({
     navigate("/chat");
   };
 
+  const handleDiscussItem = (itemId: number) => {
+    onClose();
+    navigate(`/chat?item=${itemId}`);
+  };
+
   const handleClearAll = () => {
     if (window.confirm("确定要清空讨论清单吗？")) {
       clear();
@@ -205,10 +210,32 @@ export default function DiscussionListModal({
                         </div>
                       </div>
 
+                      {/* 围绕这篇文章对话 */}
+                      <button
+                        onClick={() => handleDiscussItem(item.id)}
+                        className="ml-4 text-gray-400 hover:text-blue-600 transition-colors p-1"
+                        aria-label="讨论这篇文章"
+                        title="讨论这篇文章"
+                      >
+                        <svg
+                          className="w-5 h-5"
+                          fill="none"
+                          stroke="currentColor"
+                          viewBox="0 0 24 24"
+                        >
+                          <path
+                            strokeLinecap="round"
+                            strokeLinejoin="round"
+                            strokeWidth={2}
+                            d="M8 12h.01M12 12h.01M16 12h.01M21 12c0 4.418-4.03 8-9 8a9.863 9.863 0 01-4.255-.949L3 20l1.395-3.72C3.512 15.042 3 13.574 3 12c0-4.418 4.03-8 9-8s9 3.582 9 8z"
+                          />
+                        </svg>
+                      </button>
+
                       {/* 删除按钮 */}
                       <button
                         onClick={() => handleRemoveItem(item.id)}
-                        className="ml-4 text-gray-400 hover:text-red-600 transition-colors p-1"
+                        className="ml-1 text-gray-400 hover:text-red-600 transition-colors p-1"
                         aria-label="移除"
                       >
                         <svg
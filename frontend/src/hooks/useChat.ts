@@ -5,6 +5,7 @@ import type { ChatRequest, ChatMessage, ChatStreamChunk } from "../types/api";
 
 interface ChatOptions {
   apiKey?: string | null;
+  itemId?: number | null;
 }
 
 interface ChatHookReturn {
@@ -91,6 +92,9 @@ export function useChat(options: ChatOptions = {}): ChatHookReturn {
         const requestBody: ChatRequest = {
           messages: chatMessages,
         };
+        if (options.itemId != null) {
+          requestBody.item_id = options.itemId;
+        }
 
         // 发起 SSE 请求
         const response = await fetch(`${API_SERVER_URL}${endpoint}`, {
@@ -101,6 +105,10 @@ export function useChat(options: ChatOptions = {}): ChatHookReturn {
         });
 
         if (!response.ok) {
+          const retryAfter = response.headers.get("Retry-After");
+          if (response.status === 503 && retryAfter) {
+            throw new Error(`服务繁忙，请 ${retryAfter} 秒后重试`);
+          }
           throw new Error(`HTTP error! status: ${response.status}`);
         }
 
@@ -204,7 +212,7 @@ export function useChat(options: ChatOptions = {}): ChatHookReturn {
         abortControllerRef.current = null;
       }
     },
-    [isLoading, options.apiKey]
+    [isLoading, options.apiKey, options.itemId]
   );
 
   const clearMessages = useCallback(() => {
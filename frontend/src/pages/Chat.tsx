@@ -1,4 +1,5 @@
 import { useState, useEffect, useRef } from "react";
+import { useSearchParams } from "react-router-dom";
 import { useChat } from "../hooks/useChat";
 import MessageBubble from "../components/MessageBubble";
 import ChatInput from "../components/ChatInput";
@@ -13,8 +14,14 @@ export default function Chat() {
 
   const { count, generateMarkdown } = useDiscussionStorage();
 
+  // 从讨论清单进入时 URL 带 ?item=<文章ID>，由服务端注入该文章的上下文
+  const [searchParams] = useSearchParams();
+  const itemParam = Number(searchParams.get("item"));
+  const itemId = Number.isInteger(itemParam) && itemParam > 0 ? itemParam : null;
+
   const { messages, isLoading, error, sendMessage, clearMessages } = useChat({
     apiKey,
+    itemId,
   });
 
   // 自动滚动到底部
@@ -22,15 +29,15 @@ export default function Chat() {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages]);
 
-  // 获取限流信息
+  // 获取限流信息（每次回复结束后刷新剩余次数）
   useEffect(() => {
-    if (!apiKey) {
+    if (!apiKey && !isLoading) {
       fetch("http://localhost:8000/api/v1/chat/limits")
         .then((res) => res.json())
-        .then((data) => setRateLimitInfo(data.global_limit))
+        .then((data) => setRateLimitInfo(`剩余 ${data.remaining} 次`))
         .catch(() => setRateLimitInfo(""));
     }
-  }, [apiKey]);
+  }, [apiKey, isLoading]);
 
   const handleSendMessage = async (content: string) => {
     await sendMessage(content);
@@ -37,6 +37,7 @@ export interface ItemWithSummary {
   source_internal_id?: string;
   created_at: string;
   fetched_at: string;
+  cluster_id?: number; // 近似重复簇ID，同簇文章共享摘要
   // 摘要相关字段
   summary_content?: string;
   translated_title?: string;
@@ -69,6 +70,7 @@ export interface ChatRequest {
   messages: ChatMessage[];
   temperature?: number;
   max_tokens?: number;
+  item_id?: number; // 围绕某篇文章讨论时由服务端注入文章上下文
 }
 
 export interface ChatResponse {